@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Element Memory Benchmark
+========================
+抽出結果(results / all_elements)が保持するメモリを tracemalloc で計測するベンチマーク
+
+比較対象:
+1. dict: 従来の表現(全キーを持つ dict、値が None のキーも保持)
+2. compact: figma_elements の __slots__ クラス(キー構成を共有し、値のタプルだけを保持)
+
+計測項目:
+- element: 抽出済みの値から要素の入れ物だけを作り直したときのメモリ(値は両者で共有)
+- retained: 抽出を実行して results / all_elements が保持するメモリ(パス文字列などの値を含む)
+
+使用方法:
+    python3 scripts/benchmarks/bench_elements.py [--nodes 50000]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract_figma  # noqa: E402
+from figma_elements import DynamicElement, to_plain  # noqa: E402
+from bench_traversal import build_synthetic_tree, count_nodes  # noqa: E402
+
+
+def retained_bytes(build):
+    """build() が返すオブジェクトが保持しているメモリ量(バイト)と経過時間を返す"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, elapsed, kept
+
+
+def extract(root, whitelist):
+    """traverse_nodes の結果(results と all_elements)"""
+    results, _, _, all_elements = extract_figma.traverse_nodes(root, whitelist=whitelist)
+    return results, all_elements
+
+
+def extract_as_dicts(root, whitelist):
+    """traverse_nodes の結果を従来の dict 表現に変換(同じ要素は同じ dict を共有)"""
+    results, all_elements = extract(root, whitelist)
+    converted = {}
+    plain_results = {}
+    for key, items in results.items():
+        plain_results[key] = [converted.setdefault(id(item), to_plain(item)) for item in items]
+    plain_elements = [converted.setdefault(id(item), to_plain(item)) for item in all_elements]
+    return plain_results, plain_elements
+
+
+def rebuild(elements, convert):
+    """抽出済みの要素を convert で作り直す(値のオブジェクトは共有)"""
+    return [convert(element) for element in elements]
+
+
+def compact_copy(element):
+    """要素と同じ表現のコピーを作成"""
+    if isinstance(element, DynamicElement):
+        return DynamicElement(element.to_dict())
+    return type(element).from_dict(element.to_dict())
+
+
+def main():
+    node_count = 50000
+    if "--nodes" in sys.argv:
+        node_count = int(sys.argv[sys.argv.index("--nodes") + 1])
+
+    root = build_synthetic_tree(node_count)
+    whitelist = extract_figma.load_whitelist()
+    print(f"Nodes: {count_nodes(root)}")
+
+    dict_bytes, _, kept = retained_bytes(lambda: extract_as_dicts(root, whitelist))
+    del kept
+    compact_bytes, elapsed, kept = retained_bytes(lambda: extract(root, whitelist))
+    elements = kept[1]
+
+    # 値を共有したまま入れ物だけを作り直して比較
+    dict_element_bytes, _, dict_copies = retained_bytes(lambda: rebuild(elements, to_plain))
+    del dict_copies
+    compact_element_bytes, _, compact_copies = retained_bytes(lambda: rebuild(elements, compact_copy))
+    del compact_copies
+
+    count = len(elements)
+    print(f"Elements: {count}")
+    print(f"{'measure':<10} {'dict':>16} {'compact':>16} {'reduction':>10}")
+    for label, before, after in [
+        ("element", dict_element_bytes, compact_element_bytes),
+        ("retained", dict_bytes, compact_bytes),
+    ]:
+        print(f"{label:<10} {before / count:>10.0f} B/el {after / count:>10.0f} B/el {before / after:>9.2f}x")
+    print(f"traverse_nodes: {elapsed:.2f}s under tracemalloc")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Incremental Extraction Benchmark
+================================
+figma_synthetic の合成ドキュメントで、差分抽出(--incremental-cache)と通常の抽出を比較するベンチマーク
+
+計測するケース:
+1. fresh: traverse_nodes(キャッシュなし)
+2. cold: キャッシュが空の状態で incremental_traverse_nodes(抽出 + キャッシュの書き込み)
+3. warm: 変更なしで再実行(全サブツリーを再利用)
+4. edit: TEXT ノードを1つ書き換えて再実行(変更のあったサブツリーだけを再抽出)
+
+- 時間はキャッシュを開くところから保存まで(JSON の読み込みは含まない。どのケースも同じため)
+- どのケースも、同じドキュメントに対する traverse_nodes と同一の結果になることを確認する
+  (一致しなければ終了コード 1)
+
+使用方法:
+    python3 scripts/benchmarks/bench_incremental.py [--nodes 50000] [--seed 0] [--repeat 3]
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract_figma  # noqa: E402
+from figma_elements import to_plain  # noqa: E402
+from figma_synthetic import build_document, document_root  # noqa: E402
+from bench_traversal import count_nodes  # noqa: E402
+
+
+def timed(func):
+    """func() の時間(秒)と戻り値"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+    return elapsed, result
+
+
+def snapshot(extracted):
+    """比較用に抽出結果を通常の dict / list に変換"""
+    results, warnings, unknown_props, all_elements = extracted
+    return to_plain(results), warnings, unknown_props, to_plain(all_elements)
+
+
+def find_text(root):
+    """前順で真ん中あたりの TEXT ノード(書き換え対象)"""
+    texts = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.get("type") == "TEXT":
+            texts.append(node)
+        stack.extend(reversed(node.get("children") or ()))
+    return texts[len(texts) // 2]
+
+
+def main():
+    node_count = 50000
+    seed = 0
+    repeat = 3
+    if "--nodes" in sys.argv:
+        node_count = int(sys.argv[sys.argv.index("--nodes") + 1])
+    if "--seed" in sys.argv:
+        seed = int(sys.argv[sys.argv.index("--seed") + 1])
+    if "--repeat" in sys.argv:
+        repeat = int(sys.argv[sys.argv.index("--repeat") + 1])
+
+    root = document_root(build_document(node_count, seed))
+    whitelist = extract_figma.load_whitelist()
+    total = count_nodes(root)
+
+    def fresh():
+        return extract_figma.traverse_nodes(root, whitelist=whitelist)
+
+    rows = []
+    all_same = True
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_file = Path(tmp_dir) / "extract_cache.sqlite"
+
+        def incremental():
+            cache = extract_figma.open_subtree_cache(cache_file, whitelist)
+            extracted = extract_figma.incremental_traverse_nodes(root, cache, whitelist=whitelist)
+            return extracted, cache
+
+        def run_case(name, runs):
+            nonlocal all_same
+            fresh_time, expected = min((timed(fresh) for _ in range(repeat)), key=lambda item: item[0])
+            case_time, (extracted, cache) = min((timed(incremental) for _ in range(runs)), key=lambda item: item[0])
+            same = snapshot(extracted) == snapshot(expected)
+            all_same = all_same and same
+            rows.append((name, fresh_time, case_time, cache.hits, cache.misses, cache_file.stat().st_size, same))
+
+        run_case("cold", 1)
+        run_case("warm", repeat)
+        text = find_text(root)
+        text["characters"] = text.get("characters", "") + " (edited)"
+        # 書き換え後の最初の1回だけが edit のケース(2回目以降は warm と同じ)
+        run_case("edit (1 TEXT)", 1)
+
+    print(f"Nodes: {total:,} (seed {seed}, fresh best of {repeat})")
+    print("")
+    print("| Case | Fresh (s) | Incremental (s) | vs fresh | Hits / misses | Cache (MB) | Identical |")
+    print("|------|-----------|-----------------|----------|---------------|------------|-----------|")
+    for name, fresh_time, case_time, hits, misses, size, same in rows:
+        print(
+            f"| {name} | {fresh_time:.3f} | {case_time:.3f} | {case_time / fresh_time:.2f}x | "
+            f"{hits} / {misses} | {size / 1e6:.1f} | {'✅' if same else '❌'} |"
+        )
+
+    if not all_same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
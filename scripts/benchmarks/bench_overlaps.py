@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Overlap Detection Benchmark
+===========================
+detect_overlaps のスケーリングを計測するベンチマーク
+
+比較対象:
+1. legacy: Y座標ソート後に後続要素を 500px の打ち切りまで総当たりする旧実装
+2. sweep: Yスイープ + X区間木による交差ペア列挙(現在の detect_overlaps、除外判定は純Python)
+3. numpy: sweep と同じ候補ペアに対して除外判定を配列演算で一括実行(NumPy がある場合のみ)
+
+使用方法:
+    python3 scripts/benchmarks/bench_overlaps.py [--sizes 1000,10000,100000] [--legacy-max 10000]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from figma_geometry import numpy_available  # noqa: E402
+from extract_figma import (  # noqa: E402
+    calculate_x_overlap,
+    detect_overlaps,
+    generate_css_suggestion,
+    generate_decorative_css,
+    is_decorative_for_overlap,
+    should_exclude_from_overlap,
+)
+
+REQUIRED_KEYS = ['absoluteX', 'absoluteY', 'width', 'height']
+
+
+def legacy_detect_overlaps(all_elements):
+    """旧実装の detect_overlaps(比較用)"""
+    overlaps = []
+    decorative_overlaps = []
+    sorted_elements = sorted(
+        [e for e in all_elements if e.get('absoluteY') is not None],
+        key=lambda e: e.get('absoluteY', 0)
+    )
+    for i, elem_a in enumerate(sorted_elements):
+        if not all(k in elem_a and elem_a[k] is not None for k in REQUIRED_KEYS):
+            continue
+        a_bottom = elem_a['absoluteY'] + elem_a['height']
+        for elem_b in sorted_elements[i+1:]:
+            if not all(k in elem_b and elem_b[k] is not None for k in REQUIRED_KEYS):
+                continue
+            b_top = elem_b['absoluteY']
+            if b_top - a_bottom > 500:
+                break
+            if should_exclude_from_overlap(elem_a, elem_b):
+                continue
+            if a_bottom > b_top:
+                overlap_y = a_bottom - b_top
+                a_left = elem_a['absoluteX']
+                a_right = a_left + elem_a['width']
+                b_left = elem_b['absoluteX']
+                b_right = b_left + elem_b['width']
+                if not (a_right <= b_left or b_right <= a_left):
+                    overlap_x = calculate_x_overlap(a_left, a_right, b_left, b_right)
+                    overlap_info = {
+                        'element_a_name': elem_a.get('name', 'Unknown'),
+                        'element_a_id': elem_a.get('id', '-'),
+                        'element_b_name': elem_b.get('name', 'Unknown'),
+                        'element_b_id': elem_b.get('id', '-'),
+                        'overlap_y': round(overlap_y, 1),
+                        'overlap_x': round(overlap_x, 1),
+                    }
+                    if is_decorative_for_overlap(elem_a):
+                        overlap_info['css_suggestion'] = generate_decorative_css(elem_a, elem_b)
+                        decorative_overlaps.append(overlap_info)
+                    else:
+                        overlap_info['css_suggestion'] = generate_css_suggestion(elem_a, elem_b, overlap_y, overlap_x)
+                        overlaps.append(overlap_info)
+    return overlaps, decorative_overlaps
+
+
+def build_elements(count, seed=0):
+    """縦長ページを模した要素リストを生成(全高の背景 + セクション + カード + 小アイコン)"""
+    rnd = random.Random(seed)
+    page_height = max(2000, count * 4)
+    elements = [{
+        "id": "0:0", "name": "Page Background", "type": "FRAME", "depth": 0, "parent_id": None,
+        "absoluteX": 0, "absoluteY": 0, "width": 1440, "height": page_height,
+    }]
+    section_count = max(1, count // 200)
+    section_height = page_height / section_count
+    for s in range(section_count):
+        if len(elements) >= count:
+            break
+        section_id = f"s{s}"
+        elements.append({
+            "id": section_id, "name": f"Section {s}", "type": "FRAME", "depth": 1, "parent_id": "0:0",
+            "absoluteX": 0, "absoluteY": s * section_height, "width": 1440, "height": section_height,
+        })
+        while len(elements) < count * (s + 1) / section_count:
+            kind = rnd.choice(["FRAME", "TEXT", "RECTANGLE", "VECTOR", "ELLIPSE", "LINE"])
+            size = rnd.choice([16, 24, 48, 120, 300])
+            elements.append({
+                "id": f"{len(elements)}:1",
+                "name": rnd.choice(["Card", "Title", "Icon", "Badge", "bg shape", "Button"]),
+                "type": kind,
+                "depth": 2,
+                "parent_id": section_id,
+                "absoluteX": rnd.uniform(0, 1400),
+                "absoluteY": s * section_height + rnd.uniform(0, section_height),
+                "width": size * rnd.uniform(0.5, 2),
+                "height": size * rnd.uniform(0.5, 1.5),
+                "layoutPositioning": rnd.choice(["AUTO", "ABSOLUTE"]),
+            })
+    return elements[:count]
+
+
+def timed(func, *args):
+    """実行時間と戻り値を返す"""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    sizes = [1000, 10000, 100000]
+    legacy_max = 10000
+    if "--sizes" in sys.argv:
+        sizes = [int(v) for v in sys.argv[sys.argv.index("--sizes") + 1].split(",")]
+    if "--legacy-max" in sys.argv:
+        legacy_max = int(sys.argv[sys.argv.index("--legacy-max") + 1])
+
+    print("| Elements | legacy (s) | sweep (s) | numpy (s) | Overlaps | Decorative | Identical |")
+    print("|----------|------------|-----------|-----------|----------|------------|-----------|")
+    all_same = True
+    for size in sizes:
+        elements = build_elements(size)
+        sweep_time, (overlaps, decorative) = timed(detect_overlaps, elements, "python")
+        numpy_str = "n/a"
+        if numpy_available():
+            numpy_time, numpy_result = timed(detect_overlaps, elements, "numpy")
+            numpy_str = f"{numpy_time:.3f}"
+            all_same = all_same and numpy_result == (overlaps, decorative)
+            if numpy_result != (overlaps, decorative):
+                numpy_str += " ❌"
+        if size <= legacy_max:
+            legacy_time, legacy_result = timed(legacy_detect_overlaps, elements)
+            same = legacy_result == (overlaps, decorative)
+            all_same = all_same and same
+            legacy_str = f"{legacy_time:.3f}"
+            same_str = "✅" if same else "❌"
+        else:
+            legacy_str = "skipped"
+            same_str = "-"
+        print(f"| {size:,} | {legacy_str} | {sweep_time:.3f} | {numpy_str} | {len(overlaps):,} | {len(decorative):,} | {same_str} |")
+
+    if not all_same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark
+==================
+figma_synthetic の合成ドキュメントで、抽出から構造化出力までの各段階の時間とピークメモリを計測するベンチマーク
+
+計測する段階:
+1. traverse_nodes: ノードの走査・抽出
+2. detect_overlaps: 重なり検出
+3. layout_tree: 階層構造(Layout Tree)の行の生成
+4. generate_markdown: extracted.md の文字列の生成
+5. parse_markdown: ExtractedMarkdownParser.parse(extracted.md を解析)
+6. parse_sidecar: ExtractedMarkdownParser.load_sidecar(extract_figma_structured.py --sidecar の場合)
+7. design_system: DesignSystemExtractor(タイポグラフィ・レイアウト・カラー)
+8. sections: SectionDetector.detect_sections_by_coordinates
+9. structured_files: StructuredOutputGenerator の3ファイル
+
+- 時間は repeat 回の最良値、ピークメモリは tracemalloc 下でもう1回実行したときの、その段階で確保した量の最大値
+- parse_markdown / parse_sidecar / parser_from_results(メモリ上の受け渡し)の3経路で
+  構造化出力が同じになることも確認する(一致しなければ終了コード 1)
+- ストリーミング(--stream)・並列(--workers 2)の抽出結果が traverse_nodes と同じになることも確認する
+- 1M ノードは数GBのメモリを使うため、既定のサイズには含めない(--sizes で指定)
+
+使用方法:
+    python3 scripts/benchmarks/bench_pipeline.py [--sizes 1000,10000,100000] [--seed 0] [--repeat 1] [--no-memory] [--geometry auto|numpy|python]
+"""
+
+import contextlib
+import gc
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract_figma  # noqa: E402
+from extract_figma_structured import (  # noqa: E402
+    DesignSystemExtractor,
+    ExtractedMarkdownParser,
+    SectionDetector,
+    StructuredOutputGenerator,
+    parser_from_results,
+)
+from figma_elements import to_plain  # noqa: E402
+from figma_sidecar import markdown_file_digest, sidecar_path, write_sidecar  # noqa: E402
+from figma_synthetic import build_document, document_root  # noqa: E402
+from bench_traversal import count_nodes  # noqa: E402
+
+STAGES = (
+    "traverse_nodes",
+    "detect_overlaps",
+    "layout_tree",
+    "generate_markdown",
+    "parse_markdown",
+    "parse_sidecar",
+    "design_system",
+    "sections",
+    "structured_files",
+)
+
+
+def measure(func, repeat=1, memory=True):
+    """func() の最良時間(秒)・ピークメモリ(バイト、memory=False なら None)・戻り値を返す"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if memory:
+        result = None
+        gc.collect()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def parse_extracted(markdown_file):
+    parser = ExtractedMarkdownParser(str(markdown_file))
+    parser.parse()
+    return parser
+
+
+def load_sidecar(markdown_file):
+    parser = ExtractedMarkdownParser(str(markdown_file))
+    if not parser.load_sidecar():
+        raise RuntimeError(f"サイドカーを読み込めませんでした: {sidecar_path(markdown_file)}")
+    return parser
+
+
+def extract_design_system(parser):
+    extractor = DesignSystemExtractor(parser)
+    return {
+        "typography": extractor.extract_typography_system(),
+        "layouts": extractor.extract_layout_system(),
+        "colors": extractor.extract_color_system(),
+    }
+
+
+def generate_structured_files(parser, design_system, sections):
+    generator = StructuredOutputGenerator(parser, design_system, sections)
+    return (
+        generator.generate_design_system_file(),
+        generator.generate_sections_file(),
+        generator.generate_relationship_map(),
+    )
+
+
+def structured_output(parser):
+    """パーサーから生成した構造化ファイル3つの内容(実行ごとに変わる生成日時の行は除く)"""
+    design_system = extract_design_system(parser)
+    sections = SectionDetector(parser).detect_sections_by_coordinates()
+    return [
+        [line for line in content.splitlines() if not line.startswith("> 生成日時:")]
+        for content in generate_structured_files(parser, design_system, sections)
+    ]
+
+
+def same_extraction(data, root, whitelist, expected):
+    """ストリーミング・並列の抽出結果が traverse_nodes の結果 expected と同じかどうか"""
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        input_file = Path(tmp_dir) / "figma-data.json"
+        input_file.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        streamed = extract_figma.stream_traverse_nodes(str(input_file), whitelist=whitelist)
+        parallel = extract_figma.parallel_traverse_nodes(root, 2, whitelist=whitelist)
+    return snapshot(streamed) == snapshot(expected) and snapshot(parallel) == snapshot(expected)
+
+
+def snapshot(extracted):
+    """比較用に抽出結果を通常の dict / list に変換"""
+    results, warnings, unknown_props, all_elements = extracted
+    return to_plain(results), warnings, unknown_props, to_plain(all_elements)
+
+
+def run_stages(node_count, seed=0, repeat=1, memory=True, backend="auto"):
+    """合成ドキュメントで全段階を実行し、{段階: {"seconds", "peak_bytes"}} と補足情報を返す"""
+    data = build_document(node_count, seed)
+    root = document_root(data)
+    whitelist = extract_figma.load_whitelist()
+    stages = {}
+
+    def run(stage, func):
+        seconds, peak, result = measure(func, repeat, memory)
+        stages[stage] = {"seconds": seconds, "peak_bytes": peak}
+        return result
+
+    results, warnings, unknown_props, all_elements = run(
+        "traverse_nodes", lambda: extract_figma.traverse_nodes(root, whitelist=whitelist)
+    )
+    same_modes = same_extraction(data, root, whitelist, (results, warnings, unknown_props, all_elements))
+    overlap_results = run("detect_overlaps", lambda: extract_figma.detect_overlaps(all_elements, backend))
+    run("layout_tree", lambda: extract_figma.build_layout_tree_lines(all_elements))
+    input_file = f"synthetic-{node_count}.json"
+    markdown = run("generate_markdown", lambda: extract_figma.generate_markdown(
+        results, warnings, input_file, unknown_props, [], all_elements, overlap_results
+    ))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        markdown_file = Path(tmp_dir) / "extracted.md"
+        markdown_file.write_text(markdown, encoding="utf-8")
+        del markdown
+        markdown_parser = run("parse_markdown", lambda: parse_extracted(markdown_file))
+        write_sidecar(
+            sidecar_path(markdown_file), results, warnings, unknown_props, all_elements, overlap_results,
+            input_file, markdown_file_digest(markdown_file),
+        )
+        parser = run("parse_sidecar", lambda: load_sidecar(markdown_file))
+
+    design_system = run("design_system", lambda: extract_design_system(parser))
+    sections = run("sections", lambda: SectionDetector(parser).detect_sections_by_coordinates())
+    run("structured_files", lambda: generate_structured_files(parser, design_system, sections))
+
+    # どの経路で読み込んでも構造化出力は同じ
+    with contextlib.redirect_stdout(io.StringIO()):
+        memory_parser = parser_from_results(
+            dict(results, overlaps=overlap_results[0], decorative_overlaps=overlap_results[1]), all_elements
+        )
+        expected = structured_output(markdown_parser)
+        identical = structured_output(parser) == expected and structured_output(memory_parser) == expected
+
+    return {
+        "nodes": count_nodes(root),
+        "elements": len(all_elements),
+        "overlaps": sum(len(items) for items in overlap_results),
+        "identical": identical,
+        "same_modes": same_modes,
+        "stages": stages,
+    }
+
+
+def main():
+    sizes = [1000, 10000, 100000]
+    seed = 0
+    repeat = 1
+    if "--sizes" in sys.argv:
+        sizes = [int(v) for v in sys.argv[sys.argv.index("--sizes") + 1].split(",")]
+    if "--seed" in sys.argv:
+        seed = int(sys.argv[sys.argv.index("--seed") + 1])
+    if "--repeat" in sys.argv:
+        repeat = int(sys.argv[sys.argv.index("--repeat") + 1])
+    memory = "--no-memory" not in sys.argv
+    backend = "auto"
+    if "--geometry" in sys.argv:
+        backend = sys.argv[sys.argv.index("--geometry") + 1]
+
+    all_identical = True
+    for size in sizes:
+        report = run_stages(size, seed=seed, repeat=repeat, memory=memory, backend=backend)
+        all_identical = all_identical and report["identical"] and report["same_modes"]
+        print(f"Nodes: {report['nodes']:,} / Elements: {report['elements']:,} / Overlaps: {report['overlaps']:,} (seed {seed})")
+        print("")
+        print("| Stage | Time (s) | µs/node | Peak memory (MB) |")
+        print("|-------|----------|---------|------------------|")
+        for stage in STAGES:
+            entry = report["stages"][stage]
+            peak = f"{entry['peak_bytes'] / 1e6:.1f}" if entry["peak_bytes"] is not None else "-"
+            print(f"| {stage} | {entry['seconds']:.3f} | {entry['seconds'] / report['nodes'] * 1e6:.2f} | {peak} |")
+        print("")
+        print(f"Identical structured output (markdown / sidecar / in-memory): {'✅' if report['identical'] else '❌'}")
+        print(f"Identical extraction (serial / stream / parallel): {'✅' if report['same_modes'] else '❌'}")
+        print("")
+
+    if not all_identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Scaling Benchmark
+=================
+bench_pipeline の各段階を等比数列のノード数で実行し、経験的な計算量の指数を求める回帰チェック
+
+- 指数は log(時間) と log(ノード数) の最小二乗法による傾き(1.0 = 線形、2.0 = 二乗)
+- 指数が予算(既定 1.2、STAGE_BUDGETS で段階ごとに上書き)を超えた段階があれば終了コード 1
+- 保存済みのベースライン(scaling_baseline.json)と比較し、指数が EXPONENT_TOLERANCE を超えて
+  悪化した段階も終了コード 1(時間の比は環境に依存するため表示のみ)
+- MIN_FIT_SECONDS 未満の計測値はタイマーの誤差が大きいため指数の計算に使わない
+
+使用方法:
+    python3 scripts/benchmarks/bench_scaling.py [--sizes 1000,2000,4000,8000,16000,32000] [--seed 0] [--repeat 3]
+        [--budget 1.2] [--baseline scaling_baseline.json] [--update-baseline] [--report scaling_report.md]
+        [--geometry auto|numpy|python]
+"""
+
+import json
+import math
+import platform
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_pipeline import STAGES, run_stages  # noqa: E402
+
+
+SCALING_VERSION = 1
+DEFAULT_SIZES = [1000 * 2 ** i for i in range(6)]
+EXPONENT_BUDGET = 1.2
+# 段階ごとの予算(EXPONENT_BUDGET より緩い・厳しい段階だけ書く)
+STAGE_BUDGETS = {}
+# ベースラインからの指数の悪化をどこまで許容するか
+EXPONENT_TOLERANCE = 0.15
+MIN_FIT_SECONDS = 0.002
+BASELINE_FILE = Path(__file__).with_name("scaling_baseline.json")
+
+
+def fit_exponent(sizes, seconds):
+    """log-log の最小二乗法で seconds ∝ sizes^k の k を求める(点が2つ未満なら None)"""
+    points = [(math.log(n), math.log(t)) for n, t in zip(sizes, seconds) if t >= MIN_FIT_SECONDS]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def run_scaling(sizes, seed=0, repeat=3, backend="auto"):
+    """各サイズで全段階を計測し、段階ごとの時間の列と指数を返す"""
+    nodes = []
+    seconds = {stage: [] for stage in STAGES}
+    for size in sizes:
+        report = run_stages(size, seed=seed, repeat=repeat, memory=False, backend=backend)
+        nodes.append(report["nodes"])
+        for stage in STAGES:
+            seconds[stage].append(report["stages"][stage]["seconds"])
+        print(f"   {report['nodes']:>9,} nodes: " + ", ".join(f"{stage} {seconds[stage][-1]:.3f}s" for stage in STAGES[:3]) + ", ...")
+    return {
+        "version": SCALING_VERSION,
+        "seed": seed,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "sizes": nodes,
+        "stages": {
+            stage: {"exponent": fit_exponent(nodes, seconds[stage]), "seconds": seconds[stage]}
+            for stage in STAGES
+        },
+    }
+
+
+def load_baseline(path):
+    """ベースラインを読み込む(ない・形式が違う場合は None)"""
+    path = Path(path)
+    if not path.is_file():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("version") != SCALING_VERSION:
+        print(f"ℹ️ ベースラインの形式が違うため比較しません: {path}")
+        return None
+    return baseline
+
+
+def compare(current, baseline, budget=EXPONENT_BUDGET):
+    """段階ごとの比較結果(指数・予算・ベースラインとの差・最大サイズでの時間の比・判定)"""
+    rows = []
+    largest = current["sizes"][-1]
+    for stage in STAGES:
+        entry = current["stages"][stage]
+        exponent = entry["exponent"]
+        stage_budget = STAGE_BUDGETS.get(stage, budget)
+        base = baseline["stages"].get(stage) if baseline else None
+        base_exponent = base["exponent"] if base else None
+
+        # 同じノード数で計測した時間があれば比を出す
+        ratio = None
+        if base and largest in baseline["sizes"]:
+            base_seconds = base["seconds"][baseline["sizes"].index(largest)]
+            if base_seconds >= MIN_FIT_SECONDS:
+                ratio = entry["seconds"][-1] / base_seconds
+
+        if exponent is None:
+            status = "n/a"
+        elif exponent > stage_budget:
+            status = "over budget"
+        elif base_exponent is not None and exponent > base_exponent + EXPONENT_TOLERANCE:
+            status = "regressed"
+        else:
+            status = "ok"
+        rows.append({
+            "stage": stage,
+            "exponent": exponent,
+            "budget": stage_budget,
+            "baseline_exponent": base_exponent,
+            "seconds": entry["seconds"][-1],
+            "time_ratio": ratio,
+            "status": status,
+        })
+    return rows
+
+
+STATUS_MARKS = {"ok": "✅ ok", "over budget": "❌ over budget", "regressed": "❌ regressed", "n/a": "- n/a"}
+
+
+def format_report(current, baseline, rows):
+    """比較結果の Markdown"""
+
+    def number(value, fmt):
+        return format(value, fmt) if value is not None else "-"
+
+    lines = [
+        "# Scaling Report",
+        "",
+        f"- Sizes: {', '.join(f'{n:,}' for n in current['sizes'])} nodes (seed {current['seed']}, best of {current['repeat']})",
+        f"- Python: {current['python']}",
+        f"- Baseline: {', '.join(f'{n:,}' for n in baseline['sizes']) + ' nodes' if baseline else 'なし'}",
+        f"- Exponent tolerance vs baseline: +{EXPONENT_TOLERANCE}",
+        "",
+        f"| Stage | Exponent | Budget | Baseline | Δ | Time @ {current['sizes'][-1]:,} (s) | vs baseline | Status |",
+        "|-------|----------|--------|----------|---|------------------|-------------|--------|",
+    ]
+    for row in rows:
+        delta = None
+        if row["exponent"] is not None and row["baseline_exponent"] is not None:
+            delta = row["exponent"] - row["baseline_exponent"]
+        lines.append(
+            f"| {row['stage']} | {number(row['exponent'], '.2f')} | {row['budget']:.2f} | "
+            f"{number(row['baseline_exponent'], '.2f')} | {number(delta, '+.2f')} | {row['seconds']:.3f} | "
+            f"{number(row['time_ratio'], '.2f') + 'x' if row['time_ratio'] is not None else '-'} | {STATUS_MARKS[row['status']]} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    sizes = DEFAULT_SIZES
+    seed = 0
+    repeat = 3
+    budget = EXPONENT_BUDGET
+    baseline_file = BASELINE_FILE
+    report_file = None
+    backend = "auto"
+    if "--sizes" in sys.argv:
+        sizes = [int(v) for v in sys.argv[sys.argv.index("--sizes") + 1].split(",")]
+    if "--seed" in sys.argv:
+        seed = int(sys.argv[sys.argv.index("--seed") + 1])
+    if "--repeat" in sys.argv:
+        repeat = int(sys.argv[sys.argv.index("--repeat") + 1])
+    if "--budget" in sys.argv:
+        budget = float(sys.argv[sys.argv.index("--budget") + 1])
+    if "--baseline" in sys.argv:
+        baseline_file = Path(sys.argv[sys.argv.index("--baseline") + 1])
+    if "--report" in sys.argv:
+        report_file = sys.argv[sys.argv.index("--report") + 1]
+    if "--geometry" in sys.argv:
+        backend = sys.argv[sys.argv.index("--geometry") + 1]
+    if len(sizes) < 2:
+        print("❌ --sizes には2つ以上のサイズを指定してください")
+        sys.exit(1)
+
+    print(f"📈 Scaling: {', '.join(f'{n:,}' for n in sizes)} nodes")
+    current = run_scaling(sorted(sizes), seed=seed, repeat=repeat, backend=backend)
+    baseline = load_baseline(baseline_file)
+    rows = compare(current, baseline, budget)
+    report = format_report(current, baseline, rows)
+    print("")
+    print(report)
+
+    if report_file:
+        Path(report_file).write_text(report, encoding="utf-8")
+        print(f"📝 Report: {report_file}")
+    if "--update-baseline" in sys.argv:
+        with open(baseline_file, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"💾 Baseline: {baseline_file}")
+
+    failed = [row["stage"] for row in rows if row["status"] in ("over budget", "regressed")]
+    if failed:
+        print(f"❌ 計算量の予算超過・悪化: {', '.join(failed)}")
+        sys.exit(1)
+    print("✅ All stages within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Traversal Benchmark
+===================
+traverse_nodes の走査エンジンを比較するベンチマーク
+
+比較対象:
+1. legacy: 旧実装と同じ再帰走査(1ノード1関数呼び出し)
+2. stack: 明示的なワークスタック + TraversalContext による非再帰走査
+3. one-pass: ID→名前マップを構築せず parent_name を引き継ぐ走査(既定)
+
+抽出込みの nodes/sec に加え、ノード抽出をスタブに差し替えた「走査のみ」のコストも計測する
+
+使用方法:
+    python3 scripts/benchmarks/bench_traversal.py [figma-data.json] [--nodes N] [--repeat N]
+"""
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract_figma  # noqa: E402
+from extract_figma import TraversalContext, walk_nodes  # noqa: E402
+from figma_elements import NodePath  # noqa: E402
+
+
+def legacy_traverse_nodes(node, ctx, path="", parent_info=None, depth=0, parent_id=None, parent_node=None, position=0):
+    """旧実装と同じ再帰走査(比較用)"""
+    if not node.get("visible", True):
+        return
+    node_name = node.get("name", "Unknown")
+    node_id = node["id"] if "id" in node else extract_figma.synthetic_node_id(parent_id, position)
+    # 要素のパスは NodePath(文字列とは等しくならないため、比較する walk_nodes と同じ形にする)
+    current_path = NodePath(path, node_name)
+    parent_name = ctx.id_to_name_map.get(parent_id, None) if parent_id else None
+
+    current_parent_info = extract_figma.extract_node_info(
+        node, ctx, current_path, depth, parent_id, parent_name, parent_node, parent_info, node_id
+    )
+    for child_position, child in enumerate(node.get("children", [])):
+        child_parent_info = current_parent_info if current_parent_info else parent_info
+        legacy_traverse_nodes(child, ctx, current_path, child_parent_info, depth + 1, node_id, node, child_position)
+
+
+def build_synthetic_tree(node_count, seed=0):
+    """簡易的な合成ドキュメントを生成"""
+    rnd = random.Random(seed)
+    counter = [0]
+
+    def make_node(depth, y):
+        counter[0] += 1
+        index = counter[0]
+        node_type = "FRAME" if depth < 2 else rnd.choice(["FRAME", "TEXT", "RECTANGLE", "VECTOR", "INSTANCE"])
+        node = {
+            "id": f"{index}:{depth}",
+            "name": f"{node_type.title()} {index % 13}",
+            "type": node_type,
+            "absoluteBoundingBox": {"x": rnd.randint(0, 1200), "y": y, "width": rnd.randint(10, 400), "height": rnd.randint(10, 200)},
+            "fills": [{"type": "SOLID", "color": {"r": rnd.random(), "g": rnd.random(), "b": rnd.random(), "a": 1}}],
+        }
+        if node_type in ("FRAME", "INSTANCE"):
+            node["layoutMode"] = rnd.choice(["NONE", "HORIZONTAL", "VERTICAL"])
+            if node["layoutMode"] != "NONE":
+                node["itemSpacing"] = rnd.choice([8, 16, 24])
+            if counter[0] < node_count and depth < 12:
+                fanout = rnd.randint(2, 6) if depth else max(4, node_count // 200)
+                node["children"] = []
+                for _ in range(fanout):
+                    if counter[0] >= node_count:
+                        break
+                    node["children"].append(make_node(depth + 1, y + rnd.randint(0, 300)))
+        elif node_type == "TEXT":
+            node["characters"] = "Sample text"
+            node["style"] = {"fontFamily": "Inter", "fontSize": 16, "fontWeight": 400}
+        elif node_type == "VECTOR":
+            node["fillGeometry"] = [{"path": f"M0 0 L{index % 17} 4 Z", "windingRule": "NONZERO"}]
+        return node
+
+    return make_node(0, 0)
+
+
+def count_nodes(root):
+    """ノード数を数える"""
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.get("children", []))
+    return count
+
+
+def stub_extract_node_info(node, ctx, current_path, depth, parent_id, parent_name, parent_node, parent_info, node_id):
+    """走査コストのみを測るための抽出スタブ"""
+    ctx.all_elements.append(node)
+    return parent_info
+
+
+def timed(func, *args):
+    """1回の実行時間を返す"""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def bench(func, root, whitelist, id_map, repeat):
+    """指定の走査関数を repeat 回実行し、最良時間の ctx と秒数を返す"""
+    best = None
+    ctx = None
+    for _ in range(repeat):
+        ctx = TraversalContext(whitelist=whitelist, id_to_name_map=id_map)
+        start = time.perf_counter()
+        func(root, ctx)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return ctx, best
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    node_count = 20000
+    repeat = 3
+    if "--nodes" in sys.argv:
+        node_count = int(sys.argv[sys.argv.index("--nodes") + 1])
+        args = [arg for arg in args if arg != str(node_count)]
+    if "--repeat" in sys.argv:
+        repeat = int(sys.argv[sys.argv.index("--repeat") + 1])
+        args = [arg for arg in args if arg != str(repeat)]
+
+    if args:
+        with open(args[0], "r", encoding="utf-8") as f:
+            data = json.load(f)
+        root = data.get("document") or next(
+            (nd["document"] for nd in data.get("nodes", {}).values() if "document" in nd), data
+        )
+        source = args[0]
+    else:
+        root = build_synthetic_tree(node_count)
+        source = f"synthetic ({node_count} nodes)"
+
+    whitelist = extract_figma.load_whitelist()
+    id_map = extract_figma.build_id_to_node_map(root)
+    total = count_nodes(root)
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursion_limit, 10000))
+
+    print(f"Source: {source}")
+    print(f"Nodes: {total:,}")
+    print("")
+    print("| Engine | Time (s) | Nodes/sec |")
+    print("|--------|----------|-----------|")
+    legacy_ctx, legacy_time = bench(legacy_traverse_nodes, root, whitelist, id_map, repeat)
+    stack_ctx, stack_time = bench(walk_nodes, root, whitelist, id_map, repeat)
+    print(f"| legacy (recursive) | {legacy_time:.3f} | {total / legacy_time:,.0f} |")
+    print(f"| stack (iterative) | {stack_time:.3f} | {total / stack_time:,.0f} |")
+
+    # 2パス(マップ構築 + 走査)と1パスの比較
+    map_time = min(timed(extract_figma.build_id_to_node_map, root) for _ in range(repeat))
+    one_pass_ctx, one_pass_time = bench(walk_nodes, root, whitelist, None, repeat)
+    print(f"| two-pass (id map + stack) | {map_time + stack_time:.3f} | {total / (map_time + stack_time):,.0f} |")
+    print(f"| one-pass (no id map) | {one_pass_time:.3f} | {total / one_pass_time:,.0f} |")
+
+    extract_node_info = extract_figma.extract_node_info
+    extract_figma.extract_node_info = stub_extract_node_info
+    try:
+        _, legacy_walk = bench(legacy_traverse_nodes, root, whitelist, id_map, repeat)
+        _, stack_walk = bench(walk_nodes, root, whitelist, id_map, repeat)
+    finally:
+        extract_figma.extract_node_info = extract_node_info
+    print(f"| legacy (walk only) | {legacy_walk:.3f} | {total / legacy_walk:,.0f} |")
+    print(f"| stack (walk only) | {stack_walk:.3f} | {total / stack_walk:,.0f} |")
+    print("")
+
+    same = all(
+        legacy_ctx.results == ctx.results
+        and legacy_ctx.warnings == ctx.warnings
+        and legacy_ctx.all_elements == ctx.all_elements
+        for ctx in (stack_ctx, one_pass_ctx)
+    )
+    print(f"Identical output: {'✅' if same else '❌'}")
+
+    # 再帰上限を超える深さのツリー
+    sys.setrecursionlimit(recursion_limit)
+    deep = {"id": "0:0", "name": "root", "type": "FRAME"}
+    tail = deep
+    for i in range(1, recursion_limit * 2):
+        child = {"id": f"{i}:0", "name": f"level {i}", "type": "FRAME"}
+        tail["children"] = [child]
+        tail = child
+    deep_ctx = walk_nodes(deep, TraversalContext())
+    print(f"Deep tree ({recursion_limit * 2} levels): {len(deep_ctx.all_elements)} elements ✅")
+
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Whitelist Lookup Benchmark
+==========================
+ホワイトリスト参照(未知プロパティ検出)のコストを計測するベンチマーク
+
+比較対象:
+1. legacy: 呼び出しごとに common + type + inherits から set を作り直す旧実装
+2. compiled: 読み込み時にタイプ別 frozenset へコンパイルした表を参照
+
+使用方法:
+    python3 scripts/benchmarks/bench_whitelist.py [--nodes 100000]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import extract_figma  # noqa: E402
+from bench_traversal import build_synthetic_tree  # noqa: E402
+
+
+def legacy_get_type_properties(whitelist, node_type):
+    """旧実装の get_type_properties(比較用)"""
+    props = set()
+    if "common" in whitelist:
+        props.update(whitelist["common"].get("properties", []))
+    if node_type in whitelist:
+        type_config = whitelist[node_type]
+        props.update(type_config.get("properties", []))
+        if "inherits" in type_config:
+            parent_type = type_config["inherits"]
+            if parent_type in whitelist:
+                props.update(whitelist[parent_type].get("properties", []))
+    return props
+
+
+def flatten(root):
+    """ツリーをノードのリストに展開"""
+    nodes = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.get("children", []))
+    return nodes
+
+
+def run_detection(nodes, whitelist, lookups_per_node):
+    """全ノードに未知プロパティ検出を実行し、経過時間を返す"""
+    unknown_props = {}
+    start = time.perf_counter()
+    for node in nodes:
+        node_type = node.get("type", "")
+        extract_figma.detect_unknown_properties(node, node_type, whitelist, unknown_props)
+        # 旧実装は extract_node_properties_dynamic でも同じ表を作り直していた
+        for _ in range(lookups_per_node - 1):
+            extract_figma.get_type_properties(whitelist, node_type)
+    return time.perf_counter() - start, unknown_props
+
+
+def main():
+    node_count = 100000
+    if "--nodes" in sys.argv:
+        node_count = int(sys.argv[sys.argv.index("--nodes") + 1])
+
+    nodes = flatten(build_synthetic_tree(node_count))
+    whitelist = extract_figma.load_whitelist()
+
+    compiled_get = extract_figma.get_type_properties
+    extract_figma.get_type_properties = legacy_get_type_properties
+    try:
+        legacy_time, legacy_unknown = run_detection(nodes, whitelist, lookups_per_node=2)
+    finally:
+        extract_figma.get_type_properties = compiled_get
+    compiled_time, compiled_unknown = run_detection(nodes, whitelist, lookups_per_node=1)
+
+    print(f"Nodes: {len(nodes):,}")
+    print("")
+    print("| Whitelist lookup | Time (s) | µs/node |")
+    print("|------------------|----------|---------|")
+    print(f"| legacy (2 set builds/node) | {legacy_time:.3f} | {legacy_time / len(nodes) * 1e6:.2f} |")
+    print(f"| compiled (1 lookup/node) | {compiled_time:.3f} | {compiled_time / len(nodes) * 1e6:.2f} |")
+    print("")
+    same = legacy_unknown == compiled_unknown
+    print(f"Identical unknown properties: {'✅' if same else '❌'}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Synthetic Figma Document
+========================
+ベンチマーク用の Figma JSON(nodes API のレスポンス形式)を乱数シードから再現可能に生成する
+
+生成する構造(LP を模したページ):
+1. ページ: 縦方向オートレイアウトの FRAME に、セクションを縦に積む
+2. セクション: 見出し・サブテキスト + カード行(横方向オートレイアウト)+ 絶対配置の装飾(重なり)
+3. カード: コンポーネントの INSTANCE(componentProperties / overrides)に
+   画像 RECTANGLE / アイコン VECTOR(fillGeometry・strokeGeometry)/ スタイル上書き付き TEXT /
+   区切り LINE / アバター ELLIPSE / ネストしたボタン INSTANCE を含む
+
+- ノード数は --nodes で指定した数ちょうど(上限に達した時点でカードの途中でも打ち切る)
+- 色・アイコン形状・コンポーネントは有限のパレットから選ぶため、実データと同様に同じ値が繰り返し現れる
+- 3セクションに1つはカード行の FRAME に id を付けない(手で加工した JSON を模す。id のないノードの扱いを通す)
+- 同じ --nodes / --seed なら常に同じ JSON になる
+
+使用方法:
+    python3 scripts/benchmarks/figma_synthetic.py <output.json> [--nodes 10000] [--seed 0]
+
+    from figma_synthetic import build_document
+    data = build_document(10000, seed=0)
+"""
+
+import json
+import math
+import random
+import sys
+
+
+PAGE_WIDTH = 1440
+SECTION_PADDING = 120
+CARD_GAP = 24
+
+PALETTE = [
+    (1, 1, 1), (0.07, 0.07, 0.09), (0.2, 0.4, 0.95), (0.96, 0.97, 0.98), (0.45, 0.47, 0.52),
+    (0.93, 0.3, 0.26), (0.13, 0.7, 0.45), (0.99, 0.75, 0.18), (0.55, 0.36, 0.96), (0.86, 0.88, 0.91),
+]
+FONT_FAMILIES = ["Inter", "Noto Sans JP", "Roboto"]
+SECTION_NAMES = ["Hero", "Features", "Pricing", "Testimonials", "FAQ", "Blog", "Team", "CTA", "Footer"]
+CARD_NAMES = ["Card", "Feature Card", "Plan", "Review", "Article", "Member"]
+DECORATION_NAMES = ["bg shape", "Decoration", "star deco", "Blob", "Ornament"]
+WORDS = [
+    "Figma", "design", "component", "layout", "fast", "simple", "team", "plan", "price", "free",
+    "デザイン", "コンポーネント", "料金", "お問い合わせ", "詳しく見る", "今すぐ始める",
+]
+# Markdown のセル区切りと同じ "|" も混ぜる(表のエスケープ処理を通す)
+PUNCTUATION = [".", "!", " |", "、", "。"]
+
+ICON_COUNT = 40
+COMPONENT_COUNT = 12
+
+
+def color(rgb, alpha=1):
+    r, g, b = rgb
+    return {"r": r, "g": g, "b": b, "a": alpha}
+
+
+def solid(rgb, opacity=None):
+    paint = {"blendMode": "NORMAL", "type": "SOLID", "color": color(rgb)}
+    if opacity is not None:
+        paint["opacity"] = opacity
+    return paint
+
+
+def bounding_box(x, y, width, height):
+    return {"x": x, "y": y, "width": width, "height": height}
+
+
+def icon_path(rnd, size=24):
+    """星形・多角形のアイコンの SVG パス"""
+    points = rnd.randint(3, 8)
+    outer = size / 2
+    inner = outer * rnd.uniform(0.35, 0.9)
+    coords = []
+    for i in range(points * 2):
+        radius = outer if i % 2 == 0 else inner
+        angle = math.pi * i / points - math.pi / 2
+        coords.append(f"{outer + radius * math.cos(angle):.3f} {outer + radius * math.sin(angle):.3f}")
+    return "M" + " L".join(coords) + " Z"
+
+
+class SyntheticDocument:
+    """ノード数の上限までページを組み立てる"""
+
+    def __init__(self, node_count, seed=0):
+        self.rnd = random.Random(seed)
+        self.limit = node_count
+        self.count = 0
+        self.icons = [icon_path(self.rnd) for _ in range(ICON_COUNT)]
+        self.components = {
+            f"{900 + i}:{i}": {
+                "key": f"{seed:04x}{i:036x}",
+                "name": f"{self.rnd.choice(CARD_NAMES)}/{self.rnd.choice(['Default', 'Hover', 'Dark', 'Compact'])}",
+                "description": "",
+                "remote": False,
+                "documentationLinks": [],
+            }
+            for i in range(COMPONENT_COUNT)
+        }
+        self.component_ids = list(self.components)
+
+    def full(self):
+        return self.count >= self.limit
+
+    def node(self, node_type, name, x, y, width, height, **props):
+        """ノードを1つ作る(上限に達していれば None)"""
+        if self.count >= self.limit:
+            return None
+        self.count += 1
+        node = {
+            "id": f"{self.count}:{self.count % 997}",
+            "name": name,
+            "type": node_type,
+            "scrollBehavior": "SCROLLS",
+            "blendMode": "PASS_THROUGH",
+            "absoluteBoundingBox": bounding_box(x, y, width, height),
+            "absoluteRenderBounds": bounding_box(x, y, width, height),
+            "constraints": {"vertical": "TOP", "horizontal": "LEFT"},
+        }
+        node.update(props)
+        return node
+
+    def add(self, parent, child):
+        if child is not None:
+            parent.setdefault("children", []).append(child)
+        return child
+
+    def paint(self):
+        return [solid(self.rnd.choice(PALETTE))]
+
+    def words(self, count):
+        rnd = self.rnd
+        return " ".join(rnd.choice(WORDS) for _ in range(count)) + rnd.choice(PUNCTUATION)
+
+    def auto_layout(self, mode, spacing, padding):
+        return {
+            "layoutMode": mode,
+            "itemSpacing": spacing,
+            "paddingLeft": padding,
+            "paddingRight": padding,
+            "paddingTop": padding,
+            "paddingBottom": padding,
+            "primaryAxisSizingMode": "AUTO",
+            "counterAxisSizingMode": "FIXED",
+            "primaryAxisAlignItems": "MIN",
+            "counterAxisAlignItems": self.rnd.choice(["MIN", "CENTER"]),
+            "layoutSizingHorizontal": "FILL",
+            "layoutSizingVertical": "HUG",
+            "clipsContent": False,
+        }
+
+    def text(self, name, x, y, width, font_size, word_count, weight=400):
+        """スタイル上書き(一部の文字だけ太字・色違い)付きの TEXT"""
+        rnd = self.rnd
+        characters = self.words(word_count)
+        line_height = round(font_size * 1.5)
+        lines = max(1, math.ceil(len(characters) * font_size * 0.55 / width))
+        props = {
+            "characters": characters,
+            "style": {
+                "fontFamily": rnd.choice(FONT_FAMILIES),
+                "fontPostScriptName": None,
+                "fontWeight": weight,
+                "fontSize": font_size,
+                "textAlignHorizontal": rnd.choice(["LEFT", "LEFT", "CENTER"]),
+                "textAlignVertical": "TOP",
+                "letterSpacing": rnd.choice([0, 0, 0.5]),
+                "lineHeightPx": line_height,
+                "lineHeightPercentFontSize": 150,
+                "lineHeightUnit": "PIXELS",
+            },
+            "fills": self.paint(),
+            "strokes": [],
+            "strokeWeight": 1,
+            "strokeAlign": "OUTSIDE",
+            "effects": [],
+            "layoutAlign": "STRETCH",
+            "layoutGrow": 0,
+            "layoutSizingHorizontal": "FILL",
+            "layoutSizingVertical": "HUG",
+        }
+        if rnd.random() < 0.3:
+            start = rnd.randint(0, max(0, len(characters) - 4))
+            props["characterStyleOverrides"] = [0] * start + [1] * min(4, len(characters) - start)
+            props["styleOverrideTable"] = {"1": {"fontWeight": 700, "fills": self.paint()}}
+        return self.node("TEXT", name, x, y, width, lines * line_height, **props)
+
+    def vector(self, name, x, y, size, **props):
+        """共有パレットのアイコン形状を使う VECTOR(svgHash の重複除去が効く)"""
+        path = self.rnd.choice(self.icons)
+        return self.node(
+            "VECTOR", name, x, y, size, size,
+            fills=self.paint(),
+            strokes=[solid(PALETTE[1])] if self.rnd.random() < 0.3 else [],
+            strokeWeight=1.5,
+            strokeAlign="CENTER",
+            effects=[],
+            fillGeometry=[{"path": path, "windingRule": "NONZERO"}],
+            strokeGeometry=[{"path": path, "windingRule": "NONZERO"}] if self.rnd.random() < 0.3 else [],
+            **props,
+        )
+
+    def button(self, x, y, label):
+        """ネストした INSTANCE(ラベルの TEXT を上書き)"""
+        rnd = self.rnd
+        component_id = rnd.choice(self.component_ids)
+        button = self.node(
+            "INSTANCE", "Button", x, y, 160, 48,
+            componentId=component_id,
+            componentProperties={
+                "Variant": {"type": "VARIANT", "value": rnd.choice(["Primary", "Secondary", "Ghost"])},
+                "Label#12:0": {"type": "TEXT", "value": label},
+                "Icon#12:1": {"type": "BOOLEAN", "value": rnd.random() < 0.5},
+            },
+            fills=self.paint(),
+            strokes=[],
+            strokeWeight=1,
+            cornerRadius=8,
+            rectangleCornerRadii=[8, 8, 8, 8],
+            effects=[],
+            **self.auto_layout("HORIZONTAL", 8, 12),
+        )
+        if button is None:
+            return None
+        label_node = self.add(button, self.text("Label", x + 12, y + 12, 136, 16, 2, weight=600))
+        if label_node is not None:
+            button["overrides"] = [{"id": label_node["id"], "overriddenFields": ["characters", "fills"]}]
+        return button
+
+    def card(self, parent, x, y, width):
+        """カード(INSTANCE)と中身を parent に追加し、カードの高さを返す"""
+        rnd = self.rnd
+        padding = 24
+        inner = width - padding * 2
+        card = self.node(
+            "INSTANCE", rnd.choice(CARD_NAMES), x, y, width, 0,
+            componentId=rnd.choice(self.component_ids),
+            componentProperties={
+                "Size": {"type": "VARIANT", "value": rnd.choice(["S", "M", "L"])},
+                "Title#3:0": {"type": "TEXT", "value": self.words(2)},
+                "ShowImage#3:1": {"type": "BOOLEAN", "value": True},
+            },
+            overrides=[],
+            fills=[solid(PALETTE[0])],
+            strokes=[solid(PALETTE[9])],
+            strokeWeight=1,
+            cornerRadius=16,
+            rectangleCornerRadii=[16, 16, 16, 16],
+            effects=[{
+                "type": "DROP_SHADOW", "visible": True, "color": color(PALETTE[1], 0.08),
+                "blendMode": "NORMAL", "offset": {"x": 0, "y": 4}, "radius": 16, "showShadowBehindNode": False,
+            }],
+            **self.auto_layout("VERTICAL", 16, padding),
+        )
+        if card is None:
+            return 0
+        self.add(parent, card)
+        cursor = y + padding
+
+        if rnd.random() < 0.5:
+            image_height = round(inner * 0.6)
+            self.add(card, self.node(
+                "RECTANGLE", "Image", x + padding, cursor, inner, image_height,
+                fills=[{"blendMode": "NORMAL", "type": "IMAGE", "scaleMode": "FILL", "imageRef": f"{rnd.getrandbits(64):016x}"}],
+                strokes=[],
+                strokeWeight=0,
+                cornerRadius=8,
+                effects=[],
+            ))
+        else:
+            image_height = 40
+            icon_frame = self.add(card, self.node(
+                "FRAME", "Icon", x + padding, cursor, 40, 40,
+                fills=[solid(rnd.choice(PALETTE), 0.12)],
+                strokes=[],
+                strokeWeight=1,
+                cornerRadius=20,
+                effects=[],
+                layoutMode="NONE",
+            ))
+            if icon_frame is not None:
+                self.add(icon_frame, self.vector("icon", x + padding + 8, cursor + 8, 24))
+        cursor += image_height + 16
+
+        for name, font_size, word_count, weight in (("Title", 20, 3, 700), ("Body", 14, rnd.randint(6, 20), 400)):
+            text = self.add(card, self.text(name, x + padding, cursor, inner, font_size, word_count, weight))
+            if text is not None:
+                cursor += text["absoluteBoundingBox"]["height"] + 16
+                if name == "Title":
+                    card["overrides"].append({"id": text["id"], "overriddenFields": ["characters"]})
+
+        self.add(card, self.node(
+            "LINE", "Divider", x + padding, cursor, inner, 0,
+            fills=[],
+            strokes=[solid(PALETTE[9])],
+            strokeWeight=1,
+            strokeAlign="CENTER",
+            strokeCap="NONE",
+            effects=[],
+        ))
+        cursor += 16
+
+        footer = self.add(card, self.node(
+            "FRAME", "Footer", x + padding, cursor, inner, 48,
+            fills=[],
+            strokes=[],
+            strokeWeight=1,
+            effects=[],
+            **self.auto_layout("HORIZONTAL", 12, 0),
+        ))
+        if footer is not None:
+            self.add(footer, self.node(
+                "ELLIPSE", "Avatar", x + padding, cursor + 4, 40, 40,
+                fills=self.paint(),
+                strokes=[],
+                strokeWeight=0,
+                effects=[],
+                arcData={"startingAngle": 0, "endingAngle": 6.2831854820251465, "innerRadius": 0},
+            ))
+            self.add(footer, self.text("Author", x + padding + 52, cursor + 12, inner - 224, 14, 2))
+            self.add(footer, self.button(x + padding + inner - 160, cursor, self.words(1)))
+        cursor += 48 + padding
+
+        # 一部はノードを非表示にする(走査でスキップされる)
+        if rnd.random() < 0.03:
+            card["visible"] = False
+
+        height = cursor - y
+        card["absoluteBoundingBox"]["height"] = height
+        card["absoluteRenderBounds"]["height"] = height
+        return height
+
+    def section(self, index, y):
+        """セクションを作り、セクションの高さを返す"""
+        rnd = self.rnd
+        section = self.node(
+            "FRAME", f"{SECTION_NAMES[index % len(SECTION_NAMES)]} Section {index}", 0, y, PAGE_WIDTH, 0,
+            fills=[solid(rnd.choice(PALETTE[:4]))],
+            strokes=[],
+            strokeWeight=1,
+            effects=[],
+            **self.auto_layout("VERTICAL", 40, SECTION_PADDING),
+        )
+        if section is None:
+            return None, 0
+        inner = PAGE_WIDTH - SECTION_PADDING * 2
+        cursor = y + SECTION_PADDING
+
+        for name, font_size, word_count, weight in (("Heading", 40, 4, 700), ("Lead", 18, 12, 400)):
+            text = self.add(section, self.text(name, SECTION_PADDING, cursor, inner, font_size, word_count, weight))
+            if text is not None:
+                cursor += text["absoluteBoundingBox"]["height"] + 40
+
+        # カード行(横方向オートレイアウト)。セクションあたりの行数はばらつかせる
+        columns = rnd.choice([2, 3, 4])
+        card_width = (inner - CARD_GAP * (columns - 1)) / columns
+        for row_index in range(rnd.randint(1, 4)):
+            row = self.add(section, self.node(
+                "FRAME", f"Row {row_index + 1}", SECTION_PADDING, cursor, inner, 0,
+                fills=[],
+                strokes=[],
+                strokeWeight=1,
+                effects=[],
+                **self.auto_layout("HORIZONTAL", CARD_GAP, 0),
+            ))
+            if row is None:
+                break
+            if index % 3 == 2:
+                del row["id"]
+            row_height = 0
+            for column in range(columns):
+                if self.full():
+                    break
+                height = self.card(row, SECTION_PADDING + column * (card_width + CARD_GAP), cursor, card_width)
+                row_height = max(row_height, height)
+            row["absoluteBoundingBox"]["height"] = row_height
+            row["absoluteRenderBounds"]["height"] = row_height
+            cursor += row_height + 40
+
+        # 絶対配置の装飾(カードと重なる)
+        for _ in range(rnd.randint(0, 3)):
+            size = rnd.choice([120, 240, 480])
+            self.add(section, self.vector(
+                rnd.choice(DECORATION_NAMES),
+                rnd.uniform(-size / 2, PAGE_WIDTH - size / 2),
+                rnd.uniform(y, max(y, cursor - size)),
+                size,
+                layoutPositioning="ABSOLUTE",
+            ))
+
+        height = cursor - y + SECTION_PADDING - 40
+        section["absoluteBoundingBox"]["height"] = height
+        section["absoluteRenderBounds"]["height"] = height
+        return section, height
+
+    def build(self):
+        """ページ全体(nodes API のレスポンス形式)を作る"""
+        page = self.node(
+            "FRAME", "Landing Page", 0, 0, PAGE_WIDTH, 0,
+            fills=[solid(PALETTE[0])],
+            strokes=[],
+            strokeWeight=1,
+            effects=[],
+            **self.auto_layout("VERTICAL", 0, 0),
+        )
+        page["layoutSizingHorizontal"] = "FIXED"
+        y = 0
+        index = 0
+        while not self.full():
+            section, height = self.section(index, y)
+            self.add(page, section)
+            y += height
+            index += 1
+        page["absoluteBoundingBox"]["height"] = y
+        page["absoluteRenderBounds"]["height"] = y
+        return {
+            "name": "Synthetic Landing Page",
+            "lastModified": "2025-01-01T00:00:00Z",
+            "thumbnailUrl": "",
+            "version": "1",
+            "role": "viewer",
+            "editorType": "figma",
+            "linkAccess": "view",
+            "nodes": {
+                page["id"]: {
+                    "document": page,
+                    "components": self.components,
+                    "componentSets": {},
+                    "schemaVersion": 0,
+                    "styles": {},
+                },
+            },
+        }
+
+
+def build_document(node_count, seed=0):
+    """node_count ノードの合成ドキュメント(nodes API のレスポンス形式)"""
+    return SyntheticDocument(node_count, seed).build()
+
+
+def document_root(data):
+    """build_document() の戻り値から走査の起点ノードを返す"""
+    return next(iter(data["nodes"].values()))["document"]
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    node_count = 10000
+    seed = 0
+    if "--nodes" in sys.argv:
+        node_count = int(sys.argv[sys.argv.index("--nodes") + 1])
+        args.remove(str(node_count))
+    if "--seed" in sys.argv:
+        seed = int(sys.argv[sys.argv.index("--seed") + 1])
+        args.remove(str(seed))
+    if len(args) != 1:
+        print("Usage: python3 scripts/benchmarks/figma_synthetic.py <output.json> [--nodes 10000] [--seed 0]")
+        sys.exit(1)
+
+    data = build_document(node_count, seed)
+    with open(args[0], "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    print(f"✅ {args[0]}: {node_count:,} nodes (seed {seed})")
+
+
+if __name__ == "__main__":
+    main()
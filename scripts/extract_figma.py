@@ -19,9 +19,21 @@ Phase 1-4で追加された機能:
 import json
 import sys
 import os
-import hashlib
+import multiprocessing
 from pathlib import Path
-from datetime import datetime
+
+from figma_json_stream import iter_document_nodes
+from figma_spatial_index import find_intersecting_pairs
+from figma_geometry import GEOMETRY_BACKENDS, GeometryArrays, resolve_backend
+from figma_elements import DecorativeElement, DynamicElement, FrameElement, NodePath, TextElement
+from figma_svg_hash import SVG_HASH_LENGTH, SvgHashRegistry, canonical_geometry, geometry_digest
+from figma_whitelist_store import WhitelistStore, merge_properties
+from figma_paint_cache import PaintCache
+from figma_run_stats import RunStats, measure
+from figma_sidecar import markdown_hasher, sidecar_path, write_sidecar
+from figma_subtree_cache import SubtreeCache, environment_fingerprint, gc_paused, subtree_hashes
+import figma_elements
+import figma_svg_hash
 
 
 SCRIPT_DIR = Path(__file__).parent
@@ -49,22 +61,19 @@ def load_whitelist():
         return json.load(f)
 
 
-def save_whitelist(whitelist):
-    """ホワイトリストを保存"""
-    whitelist["_meta"]["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
-    with open(WHITELIST_FILE, "w", encoding="utf-8") as f:
-        json.dump(whitelist, f, indent=2, ensure_ascii=False)
-
-
-def get_type_properties(whitelist, node_type):
-    """ノードタイプのプロパティ一覧を取得(継承を解決)"""
-    props = set()
+# コンパイル済みホワイトリストのキャッシュ
+# (対象の whitelist・タイプ別 frozenset・キー構成ごとの未知プロパティ判定結果)
+_compiled_whitelist = {"source": None, "common": frozenset(), "types": {}, "shapes": {}}
 
-    if "common" in whitelist:
-        props.update(whitelist["common"].get("properties", []))
 
-    if node_type in whitelist:
-        type_config = whitelist[node_type]
+def compile_whitelist(whitelist):
+    """ホワイトリストをノードタイプ別の frozenset に展開(common・継承を解決済み)"""
+    common = frozenset(whitelist.get("common", {}).get("properties", [])) if "common" in whitelist else frozenset()
+    types = {}
+    for node_type, type_config in whitelist.items():
+        if not isinstance(type_config, dict):
+            continue
+        props = set(common)
         props.update(type_config.get("properties", []))
 
         if "inherits" in type_config:
@@ -72,40 +81,90 @@ def get_type_properties(whitelist, node_type):
             if parent_type in whitelist:
                 props.update(whitelist[parent_type].get("properties", []))
 
-    return props
+        types[node_type] = frozenset(props)
 
+    _compiled_whitelist["source"] = whitelist
+    _compiled_whitelist["common"] = common
+    _compiled_whitelist["types"] = types
+    _compiled_whitelist["shapes"] = {}
 
-def detect_unknown_properties(node, node_type, whitelist, unknown_props):
-    """未知のプロパティを検出"""
-    known_props = get_type_properties(whitelist, node_type)
 
-    for key in node.keys():
-        if key in BLACKLIST_PROPS:
-            continue
-        if key not in known_props:
-            if node_type not in unknown_props:
-                unknown_props[node_type] = set()
-            unknown_props[node_type].add(key)
+def invalidate_compiled_whitelist():
+    """ホワイトリストを変更した後に呼び出し、次回参照時に再コンパイルさせる"""
+    _compiled_whitelist["source"] = None
 
 
-def add_unknown_to_whitelist(whitelist, unknown_props):
-    """未知のプロパティをホワイトリストに追加"""
-    added = []
-
-    for node_type, props in unknown_props.items():
-        if node_type not in whitelist:
-            whitelist[node_type] = {
-                "description": f"自動追加: {node_type}",
-                "properties": []
-            }
+def get_type_properties(whitelist, node_type):
+    """ノードタイプのプロパティ一覧を取得(継承を解決、コンパイル済みの表を参照)"""
+    if _compiled_whitelist["source"] is not whitelist:
+        compile_whitelist(whitelist)
+    return _compiled_whitelist["types"].get(node_type, _compiled_whitelist["common"])
+
+
+def unknown_keys_for_shape(shape):
+    """キー構成 (node_type, キーのタプル) に含まれる未知のプロパティ(結果はキャッシュ)"""
+    shapes = _compiled_whitelist["shapes"]
+    unknown = shapes.get(shape)
+    if unknown is None:
+        node_type, keys = shape
+        known_props = _compiled_whitelist["types"].get(node_type, _compiled_whitelist["common"])
+        unknown = tuple(key for key in keys if key not in BLACKLIST_PROPS and key not in known_props)
+        shapes[shape] = unknown
+    return unknown
+
+
+def detect_unknown_properties(node, node_type, whitelist, unknown_props, shape_counts=None, unknown_log=None):
+    """未知のプロパティを検出(同じタイプ・同じキー構成のノードは1回だけ判定)
+
+    shape_counts に dict を渡すと (node_type, キーのタプル) ごとの出現数を記録する
+    unknown_log に list を渡すと、未知のプロパティを持つノードごとに (node_type, キー) を記録する
+    """
+    if _compiled_whitelist["source"] is not whitelist:
+        compile_whitelist(whitelist)
+
+    shape = (node_type, tuple(node))
+    unknown = unknown_keys_for_shape(shape)
+
+    if shape_counts is not None:
+        shape_counts[shape] = shape_counts.get(shape, 0) + 1
+
+    if unknown:
+        if unknown_log is not None:
+            unknown_log.append((node_type, unknown))
+        if node_type not in unknown_props:
+            unknown_props[node_type] = set()
+        unknown_props[node_type].update(unknown)
+
+
+def replay_unknown_log(unknown_props, unknown_log):
+    """記録した未知のプロパティを、検出時と同じ順序で unknown_props に追加"""
+    for node_type, unknown in unknown_log:
+        if node_type not in unknown_props:
+            unknown_props[node_type] = set()
+        unknown_props[node_type].update(unknown)
+
+
+def summarize_node_shapes(shape_counts, whitelist=None):
+    """キー構成ごとの出現数をスキーマ調査用のレポートに変換(出現数の多い順)"""
+    if whitelist and _compiled_whitelist["source"] is not whitelist:
+        compile_whitelist(whitelist)
+    report = []
+    for (node_type, keys), count in sorted(shape_counts.items(), key=lambda item: item[1], reverse=True):
+        report.append({
+            "type": node_type,
+            "count": count,
+            "keys": list(keys),
+            "unknown": list(unknown_keys_for_shape((node_type, keys))),
+        })
+    return report
+
 
-        existing = set(whitelist[node_type].get("properties", []))
-        new_props = props - existing
+def add_unknown_to_whitelist(whitelist, unknown_props):
+    """未知のプロパティをホワイトリストに追加(メモリ上のみ。保存は WhitelistStore)"""
+    added = merge_properties(whitelist, unknown_props)
 
-        if new_props:
-            whitelist[node_type]["properties"] = list(existing | new_props)
-            for prop in new_props:
-                added.append(f"{node_type}.{prop}")
+    if added:
+        invalidate_compiled_whitelist()
 
     return added
 
@@ -133,10 +192,19 @@ def rgb_to_css(r, g, b, a=1):
     return f"rgb({r_int}, {g_int}, {b_int})"
 
 
+# fills / strokes / effects の変換結果のキャッシュ(プロセス内で共有)
+PAINT_CACHE = PaintCache()
+
+
 def extract_color(fills):
-    """fills配列から色を抽出"""
+    """fills配列から色を抽出(同じ fills は PAINT_CACHE から同じ文字列を返す)"""
     if not fills:
         return None
+    return PAINT_CACHE.convert("fills", fills, convert_fills)
+
+
+def convert_fills(fills):
+    """fills配列をCSSの色に変換"""
     for fill in fills:
         if fill.get("visible", True) and fill.get("type") == "SOLID":
             color = fill.get("color", {})
@@ -157,9 +225,14 @@ def extract_color(fills):
 
 
 def extract_stroke_color(strokes):
-    """strokes配列から色を抽出"""
+    """strokes配列から色を抽出(同じ strokes は PAINT_CACHE から同じ文字列を返す)"""
     if not strokes:
         return None
+    return PAINT_CACHE.convert("strokes", strokes, convert_strokes)
+
+
+def convert_strokes(strokes):
+    """strokes配列をCSSの色に変換"""
     for stroke in strokes:
         if stroke.get("visible", True) and stroke.get("type") == "SOLID":
             color = stroke.get("color", {})
@@ -171,9 +244,14 @@ def extract_stroke_color(strokes):
 
 
 def extract_effects(effects):
-    """effects配列からCSS用の効果を抽出"""
+    """effects配列からCSS用の効果を抽出(同じ effects は PAINT_CACHE から同じ文字列を返す)"""
     if not effects:
         return None
+    return PAINT_CACHE.convert("effects", effects, convert_effects)
+
+
+def convert_effects(effects):
+    """effects配列をCSS用の効果に変換"""
     result = []
     for effect in effects:
         if not effect.get("visible", True):
@@ -265,27 +343,18 @@ def extract_overrides(node):
     return " | ".join(override_info) if override_info else None
 
 
-def extract_svg_hash(node):
-    """ベクターノードからSVGパスのハッシュ値を生成"""
-    fill_geometry = node.get("fillGeometry")
-    if fill_geometry:
-        try:
-            path_str = json.dumps(fill_geometry, sort_keys=True)
-            path_hash = hashlib.md5(path_str.encode()).hexdigest()[:8]
-            return path_hash
-        except:
-            return None
-    
-    vector_network = node.get("vectorNetwork")
-    if vector_network:
-        try:
-            path_str = json.dumps(vector_network, sort_keys=True)
-            path_hash = hashlib.md5(path_str.encode()).hexdigest()[:8]
-            return path_hash
-        except:
-            return None
-    
-    return None
+def extract_svg_hash(node, registry=None):
+    """ベクターノードからSVGパスのハッシュ値を生成
+
+    registry(SvgHashRegistry)を渡すと、衝突チェックとキャッシュ済みの割り当てを使う
+    """
+    if registry is not None:
+        return registry.hash_node(node)
+
+    canonical = canonical_geometry(node)
+    if canonical is None:
+        return None
+    return geometry_digest(canonical)[:SVG_HASH_LENGTH]
 
 
 def extract_export_info(node):
@@ -466,8 +535,6 @@ def extract_node_properties_dynamic(node, node_type, whitelist, current_path):
         "height": dims.get("height"),
     }
 
-    whitelist_props = get_type_properties(whitelist, node_type)
-
     for key in node.keys():
         if key in BLACKLIST_PROPS:
             continue
@@ -525,64 +592,161 @@ def build_id_to_node_map(node, id_map=None):
     """全ノードのIDと名前のマッピングを構築"""
     if id_map is None:
         id_map = {}
-    
-    node_id = node.get("id")
-    node_name = node.get("name", "Unknown")
-    
-    if node_id:
-        id_map[node_id] = node_name
-    
-    children = node.get("children", [])
-    for child in children:
-        build_id_to_node_map(child, id_map)
-    
+
+    # 深いツリーでも再帰上限に達しないよう明示的なスタックで前順に走査
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        node_id = current.get("id")
+        if node_id:
+            id_map[node_id] = current.get("name", "Unknown")
+        children = current.get("children")
+        if children:
+            stack.extend(reversed(children))
+
     return id_map
 # ↑↑↑ ここまで追加 ↑↑↑
 
 
-def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, unknown_props=None, parent_info=None, depth=0, parent_id=None, parent_node=None, all_elements=None, id_to_name_map=None):
-    # ↑↑↑ id_to_name_map=None を追加 ↑↑↑
-    """ノードを再帰的に走査して情報を抽出"""
-    if results is None:
-        results = {
-            "texts": [],
-            "frames": [],
-            "rectangles": [],
-            "vectors": [],
-            "lines": [],
-            "ellipses": [],
-            "decoratives": [],
-            "parent_gaps": [],
-        }
-    if warnings is None:
-        warnings = []
-    if unknown_props is None:
-        unknown_props = {}
-    if all_elements is None:
-        all_elements = []
-    if id_to_name_map is None:  # ← 追加
-        id_to_name_map = {}      # ← 追加
+def new_results():
+    """抽出結果の格納先を作成"""
+    return {
+        "texts": [],
+        "frames": [],
+        "rectangles": [],
+        "vectors": [],
+        "lines": [],
+        "ellipses": [],
+        "decoratives": [],
+        "parent_gaps": [],
+    }
+
+
+class TraversalContext:
+    """走査全体で共有する状態(抽出結果・警告・ホワイトリスト等)
+
+    id_to_name_map を省略すると、parent_name は走査中に親から子へ引き継ぐ(1パス抽出)
+    """
+
+    def __init__(self, whitelist=None, id_to_name_map=None, results=None, warnings=None, unknown_props=None, all_elements=None, shape_counts=None, svg_hashes=None, run_stats=None):
+        self.whitelist = whitelist
+        self.id_to_name_map = id_to_name_map
+        self.results = results if results is not None else new_results()
+        self.warnings = warnings if warnings is not None else []
+        self.unknown_props = unknown_props if unknown_props is not None else {}
+        self.all_elements = all_elements if all_elements is not None else []
+        # (node_type, キー構成) ごとの出現数。None なら記録しない
+        self.shape_counts = shape_counts
+        # svgHash の割り当て(同じジオメトリは1回だけハッシュ化し、衝突をチェック)
+        self.svg_hashes = svg_hashes if svg_hashes is not None else SvgHashRegistry()
+        # 未知のプロパティの検出順の記録(ストリーミング・並列抽出で前順に並べ直すために使う)
+        self.unknown_log = None
+        # parent_gaps に追加済みのパス(None なら重複除外しない)
+        self.gap_paths = {gap["path"] for gap in self.results["parent_gaps"]}
+        # --stats 指定時のみ: ノードタイプ別の処理数・時間を記録する RunStats
+        self.run_stats = run_stats
+
+    def as_tuple(self):
+        """traverse_nodes の戻り値形式に変換"""
+        return self.results, self.warnings, self.unknown_props, self.all_elements
+
+
+def synthetic_node_id(parent_id, position):
+    """id のないノードの ID(親の ID と兄弟内の位置から決めるため、走査モードによらず同じ値になる)"""
+    if parent_id is None:
+        return f"unknown_{position}"
+    if parent_id.startswith("unknown_"):
+        parent_id = parent_id[len("unknown_"):]
+    return f"unknown_{parent_id}/{position}"
+
+
+def walk_nodes(root, ctx, path="", parent_info=None, depth=0, parent_id=None, parent_node=None, parent_name=None, split_depth=None, on_split=None, node_id=None):
+    """明示的なワークスタックでノードを前順に走査して情報を抽出(非再帰)
+
+    split_depth を指定すると、その深さのノードは抽出せずにワークアイテムを on_split に渡す(並列抽出の分割用)
+    node_id は root の ID(root に id がない場合は synthetic_node_id の値。省略すると先頭の子とみなす)
+    """
+    id_to_name_map = ctx.id_to_name_map
+    # --stats 指定時だけ計測付きのラッパーを使う(未指定なら追加コストなし)
+    handler = extract_node_info if ctx.run_stats is None else ctx.run_stats.timed_handler(extract_node_info)
+    if node_id is None:
+        node_id = root["id"] if "id" in root else synthetic_node_id(parent_id, 0)
+    # ワークアイテム: (node, node_id, path, depth, parent_id, parent_name, parent_node, parent_info)
+    stack = [(root, node_id, path, depth, parent_id, parent_name, parent_node, parent_info)]
+    pop = stack.pop
+
+    while stack:
+        node, node_id, path, depth, parent_id, parent_name, parent_node, parent_info = pop()
+
+        if not node.get("visible", True):
+            continue
+
+        if depth == split_depth:
+            on_split((node, node_id, path, depth, parent_id, parent_name, parent_node, parent_info))
+            continue
+
+        node_name = node.get("name", "Unknown")
+        current_path = NodePath(path, node_name)
+
+        # Phase 5: parent_name を取得(マップ指定時のみ参照、通常は親から引き継ぎ)
+        if id_to_name_map is not None:
+            parent_name = id_to_name_map.get(parent_id, None) if parent_id else None
+
+        current_parent_info = handler(
+            node, ctx, current_path, depth, parent_id, parent_name, parent_node, parent_info, node_id
+        )
+
+        # 子要素は逆順に積んで、元の再帰と同じ訪問順を保つ
+        children = node.get("children")
+        if children:
+            child_parent_info = current_parent_info if current_parent_info else parent_info
+            child_depth = depth + 1
+            # IDのないノードは build_id_to_node_map に載らないため、子の parent_name も None
+            child_parent_name = node_name if node.get("id") else None
+            stack.extend([
+                (child, child["id"] if "id" in child else synthetic_node_id(node_id, position), current_path, child_depth, node_id, child_parent_name, node, child_parent_info)
+                for position, child in reversed(list(enumerate(children)))
+            ])
+
+    return ctx
+
+
+def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, unknown_props=None, parent_info=None, depth=0, parent_id=None, parent_node=None, all_elements=None, id_to_name_map=None, shape_counts=None, svg_hashes=None, run_stats=None):
+    """ノードを走査して情報を抽出(walk_nodes への互換ラッパー)"""
+    ctx = TraversalContext(
+        whitelist=whitelist,
+        id_to_name_map=id_to_name_map,
+        results=results,
+        warnings=warnings,
+        unknown_props=unknown_props,
+        all_elements=all_elements,
+        shape_counts=shape_counts,
+        svg_hashes=svg_hashes,
+        run_stats=run_stats,
+    )
+    walk_nodes(node, ctx, path, parent_info, depth, parent_id, parent_node)
+    return ctx.as_tuple()
+
+
+def extract_node_info(node, ctx, current_path, depth, parent_id, parent_name, parent_node, parent_info, node_id):
+    """1ノード分の情報を抽出して ctx に追加し、子要素に渡す親情報を返す(node_id は synthetic_node_id 適用済みの ID)"""
+    results = ctx.results
+    warnings = ctx.warnings
+    whitelist = ctx.whitelist
+    unknown_props = ctx.unknown_props
+    all_elements = ctx.all_elements
 
     node_type = node.get("type", "")
     node_name = node.get("name", "Unknown")
-    node_id = node.get("id", f"unknown_{id(node)}")
-    visible = node.get("visible", True)
-    current_path = f"{path}/{node_name}" if path else node_name
-
-    if not visible:
-        return results, warnings, unknown_props, all_elements
 
     if whitelist:
-        detect_unknown_properties(node, node_type, whitelist, unknown_props)
+        detect_unknown_properties(node, node_type, whitelist, unknown_props, ctx.shape_counts, ctx.unknown_log)
 
     # Phase 4: 絶対座標を取得
     abs_x, abs_y = get_absolute_position(node)
     
     # Phase 4: layoutPositioningを判定
     layout_positioning = determine_layout_positioning(node, parent_node)
-    
-    # Phase 5: parent_name を取得
-    parent_name = id_to_name_map.get(parent_id, None) if parent_id else None
 
     # テキスト要素
     if node_type == "TEXT":
@@ -600,38 +764,38 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
 
         line_height_value, line_height_unit = extract_line_height_with_unit(node)
 
-        text_info = {
-            "id": node_id,
-            "name": node_name,
-            "type": node_type,
-            "path": current_path,
-            "depth": depth,
-            "parent_id": parent_id,
-            "parent_name": parent_name,  
-            "absoluteX": abs_x,
-            "absoluteY": abs_y,
-            "characters": node.get("characters", ""),
-            "fontSize": style.get("fontSize") or node.get("fontSize"),
-            "fontWeight": font_weight,
-            "fontFamily": font_family,
-            "lineHeight": line_height_value,
-            "lineHeightUnit": line_height_unit,
-            "letterSpacing": style.get("letterSpacing") or node.get("letterSpacing"),
-            "textAlign": style.get("textAlignHorizontal") or node.get("textAlignHorizontal"),
-            "color": extract_color(node.get("fills", [])),
-            "opacity": node.get("opacity", 1),
-            "width": dims.get("width"),
-            "height": dims.get("height"),
-            "hyperlink": hyperlink_url,
-            "hasMixedStyles": has_mixed_styles,
-            "layoutAlign": node.get("layoutAlign"),
-            "layoutGrow": node.get("layoutGrow"),
-            "layoutSizingHorizontal": node.get("layoutSizingHorizontal"),
-            "layoutSizingVertical": node.get("layoutSizingVertical"),
-            "layoutPositioning": layout_positioning,
-            "visible": node.get("visible", True),
-            "blendMode": node.get("blendMode"),
-        }
+        text_info = TextElement(
+            id=node_id,
+            name=node_name,
+            type=node_type,
+            path=current_path,
+            depth=depth,
+            parent_id=parent_id,
+            parent_name=parent_name,
+            absoluteX=abs_x,
+            absoluteY=abs_y,
+            characters=node.get("characters", ""),
+            fontSize=style.get("fontSize") or node.get("fontSize"),
+            fontWeight=font_weight,
+            fontFamily=font_family,
+            lineHeight=line_height_value,
+            lineHeightUnit=line_height_unit,
+            letterSpacing=style.get("letterSpacing") or node.get("letterSpacing"),
+            textAlign=style.get("textAlignHorizontal") or node.get("textAlignHorizontal"),
+            color=extract_color(node.get("fills", [])),
+            opacity=node.get("opacity", 1),
+            width=dims.get("width"),
+            height=dims.get("height"),
+            hyperlink=hyperlink_url,
+            hasMixedStyles=has_mixed_styles,
+            layoutAlign=node.get("layoutAlign"),
+            layoutGrow=node.get("layoutGrow"),
+            layoutSizingHorizontal=node.get("layoutSizingHorizontal"),
+            layoutSizingVertical=node.get("layoutSizingVertical"),
+            layoutPositioning=layout_positioning,
+            visible=node.get("visible", True),
+            blendMode=node.get("blendMode"),
+        )
 
         if text_info["fontSize"] is None:
             warnings.append(f"⚠️ fontSize未取得: {node_name} (path: {current_path})")
@@ -655,62 +819,62 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
         overflow_scrolling = node.get("overflowScrolling")
         export_info = extract_export_info(node)
         
-        frame_info = {
-            "id": node_id,
-            "name": node_name,
-            "type": node_type,
-            "path": current_path,
-            "depth": depth,
-            "parent_id": parent_id,
-            "parent_name": parent_name, 
-            "absoluteX": abs_x,
-            "absoluteY": abs_y,
-            "width": dims.get("width"),
-            "height": dims.get("height"),
-            "x": dims.get("x"),
-            "y": dims.get("y"),
-            "paddingTop": node.get("paddingTop"),
-            "paddingRight": node.get("paddingRight"),
-            "paddingBottom": node.get("paddingBottom"),
-            "paddingLeft": node.get("paddingLeft"),
-            "itemSpacing": item_spacing,
-            "counterAxisSpacing": node.get("counterAxisSpacing"),
-            "cornerRadius": node.get("cornerRadius"),
-            "rectangleCornerRadii": corner_radii_str,
-            "backgroundColor": extract_color(node.get("fills", [])),
-            "borderColor": extract_stroke_color(node.get("strokes", [])),
-            "strokeWeight": node.get("strokeWeight"),
-            "layoutMode": node.get("layoutMode"),
-            "layoutWrap": node.get("layoutWrap"),
-            "overflowDirection": node.get("overflowDirection"),
-            "overflowScrolling": overflow_scrolling,
-            "primaryAxisAlignItems": node.get("primaryAxisAlignItems"),
-            "counterAxisAlignItems": node.get("counterAxisAlignItems"),
-            "counterAxisAlignContent": node.get("counterAxisAlignContent"),
-            "layoutSizingHorizontal": node.get("layoutSizingHorizontal"),
-            "layoutSizingVertical": node.get("layoutSizingVertical"),
-            "primaryAxisSizingMode": node.get("primaryAxisSizingMode"),
-            "counterAxisSizingMode": node.get("counterAxisSizingMode"),
-            "minWidth": node.get("minWidth"),
-            "maxWidth": node.get("maxWidth"),
-            "minHeight": node.get("minHeight"),
-            "maxHeight": node.get("maxHeight"),
-            "layoutAlign": node.get("layoutAlign"),
-            "layoutGrow": node.get("layoutGrow"),
-            "layoutPositioning": layout_positioning,
-            "visible": node.get("visible", True),
-            "clipsContent": node.get("clipsContent"),
-            "strokeAlign": node.get("strokeAlign"),
-            "individualStrokeWeights": node.get("individualStrokeWeights"),
-            "constraints": node.get("constraints"),
-            "cornerSmoothing": node.get("cornerSmoothing"),
-            "blendMode": node.get("blendMode"),
-            "opacity": node.get("opacity", 1),
-            "effects": extract_effects(node.get("effects", [])),
-            "componentProperties": component_props,
-            "overrides": overrides,
-            "exportSettings": export_info,
-        }
+        frame_info = FrameElement(
+            id=node_id,
+            name=node_name,
+            type=node_type,
+            path=current_path,
+            depth=depth,
+            parent_id=parent_id,
+            parent_name=parent_name,
+            absoluteX=abs_x,
+            absoluteY=abs_y,
+            width=dims.get("width"),
+            height=dims.get("height"),
+            x=dims.get("x"),
+            y=dims.get("y"),
+            paddingTop=node.get("paddingTop"),
+            paddingRight=node.get("paddingRight"),
+            paddingBottom=node.get("paddingBottom"),
+            paddingLeft=node.get("paddingLeft"),
+            itemSpacing=item_spacing,
+            counterAxisSpacing=node.get("counterAxisSpacing"),
+            cornerRadius=node.get("cornerRadius"),
+            rectangleCornerRadii=corner_radii_str,
+            backgroundColor=extract_color(node.get("fills", [])),
+            borderColor=extract_stroke_color(node.get("strokes", [])),
+            strokeWeight=node.get("strokeWeight"),
+            layoutMode=node.get("layoutMode"),
+            layoutWrap=node.get("layoutWrap"),
+            overflowDirection=node.get("overflowDirection"),
+            overflowScrolling=overflow_scrolling,
+            primaryAxisAlignItems=node.get("primaryAxisAlignItems"),
+            counterAxisAlignItems=node.get("counterAxisAlignItems"),
+            counterAxisAlignContent=node.get("counterAxisAlignContent"),
+            layoutSizingHorizontal=node.get("layoutSizingHorizontal"),
+            layoutSizingVertical=node.get("layoutSizingVertical"),
+            primaryAxisSizingMode=node.get("primaryAxisSizingMode"),
+            counterAxisSizingMode=node.get("counterAxisSizingMode"),
+            minWidth=node.get("minWidth"),
+            maxWidth=node.get("maxWidth"),
+            minHeight=node.get("minHeight"),
+            maxHeight=node.get("maxHeight"),
+            layoutAlign=node.get("layoutAlign"),
+            layoutGrow=node.get("layoutGrow"),
+            layoutPositioning=layout_positioning,
+            visible=node.get("visible", True),
+            clipsContent=node.get("clipsContent"),
+            strokeAlign=node.get("strokeAlign"),
+            individualStrokeWeights=node.get("individualStrokeWeights"),
+            constraints=node.get("constraints"),
+            cornerSmoothing=node.get("cornerSmoothing"),
+            blendMode=node.get("blendMode"),
+            opacity=node.get("opacity", 1),
+            effects=extract_effects(node.get("effects", [])),
+            componentProperties=component_props,
+            overrides=overrides,
+            exportSettings=export_info,
+        )
         
         results["frames"].append(frame_info)
         all_elements.append(frame_info)
@@ -722,8 +886,12 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
                 "itemSpacing": item_spacing,
                 "layoutMode": node.get("layoutMode"),
             }
-            existing_paths = [g["path"] for g in results["parent_gaps"]]
-            if current_path not in existing_paths:
+            # 同じパスは最初のものだけ残す(gap_paths が None の場合は呼び出し側でまとめて除外)
+            gap_paths = ctx.gap_paths
+            if gap_paths is None:
+                results["parent_gaps"].append(gap_info)
+            elif current_path not in gap_paths:
+                gap_paths.add(current_path)
                 results["parent_gaps"].append(gap_info)
 
     # 矩形
@@ -752,24 +920,25 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
             parent_gap = parent_info.get("itemSpacing", 0)
             css_gap, css_bottom = calculate_pseudo_element_css(parent_gap, element_height)
 
-            decorative_info = {
-                "name": node_name,
-                "path": current_path,
-                "depth": depth,
-                "parent_id": parent_id,
-                "type": node_type,
-                "height": element_height,
-                "width": dims.get("width"),
-                "color": extract_stroke_color(node.get("strokes", [])) or extract_color(node.get("fills", [])),
-                "strokeWeight": node.get("strokeWeight"),
-                "parent_name": parent_info.get("name") if parent_info else None,
-                "parent_path": parent_info.get("path") if parent_info else None,
-                "parent_gap": parent_gap,
-                "css_gap": round(css_gap, 2),
-                "css_bottom": round(css_bottom, 2),
-            }
+            decorative_info = DecorativeElement(
+                name=node_name,
+                path=current_path,
+                depth=depth,
+                parent_id=parent_id,
+                type=node_type,
+                height=element_height,
+                width=dims.get("width"),
+                color=extract_stroke_color(node.get("strokes", [])) or extract_color(node.get("fills", [])),
+                strokeWeight=node.get("strokeWeight"),
+                parent_name=parent_info.get("name") if parent_info else None,
+                parent_path=parent_info.get("path") if parent_info else None,
+                parent_gap=parent_gap,
+                css_gap=round(css_gap, 2),
+                css_bottom=round(css_bottom, 2),
+            )
             results["decoratives"].append(decorative_info)
         else:
+            rect_info = DynamicElement(rect_info)
             results["rectangles"].append(rect_info)
             all_elements.append(rect_info)
 
@@ -786,7 +955,7 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
         vector_info["absoluteY"] = abs_y
         vector_info["layoutPositioning"] = layout_positioning
         
-        svg_hash = extract_svg_hash(node)
+        svg_hash = extract_svg_hash(node, ctx.svg_hashes)
         if svg_hash:
             vector_info["svgHash"] = svg_hash
         
@@ -799,24 +968,25 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
             parent_gap = parent_info.get("itemSpacing", 0)
             css_gap, css_bottom = calculate_pseudo_element_css(parent_gap, element_height)
 
-            decorative_info = {
-                "name": node_name,
-                "path": current_path,
-                "depth": depth,
-                "parent_id": parent_id,
-                "type": node_type,
-                "height": element_height,
-                "width": dims.get("width"),
-                "color": extract_stroke_color(node.get("strokes", [])) or extract_color(node.get("fills", [])),
-                "strokeWeight": node.get("strokeWeight"),
-                "parent_name": parent_info.get("name") if parent_info else None,
-                "parent_path": parent_info.get("path") if parent_info else None,
-                "parent_gap": parent_gap,
-                "css_gap": round(css_gap, 2),
-                "css_bottom": round(css_bottom, 2),
-            }
+            decorative_info = DecorativeElement(
+                name=node_name,
+                path=current_path,
+                depth=depth,
+                parent_id=parent_id,
+                type=node_type,
+                height=element_height,
+                width=dims.get("width"),
+                color=extract_stroke_color(node.get("strokes", [])) or extract_color(node.get("fills", [])),
+                strokeWeight=node.get("strokeWeight"),
+                parent_name=parent_info.get("name") if parent_info else None,
+                parent_path=parent_info.get("path") if parent_info else None,
+                parent_gap=parent_gap,
+                css_gap=round(css_gap, 2),
+                css_bottom=round(css_bottom, 2),
+            )
             results["decoratives"].append(decorative_info)
         else:
+            vector_info = DynamicElement(vector_info)
             results["vectors"].append(vector_info)
             all_elements.append(vector_info)
 
@@ -838,24 +1008,25 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
             parent_gap = parent_info.get("itemSpacing", 0)
             css_gap, css_bottom = calculate_pseudo_element_css(parent_gap, element_height)
 
-            decorative_info = {
-                "name": node_name,
-                "path": current_path,
-                "depth": depth,
-                "parent_id": parent_id,
-                "type": node_type,
-                "height": element_height,
-                "width": dims.get("width"),
-                "color": extract_stroke_color(node.get("strokes", [])) or extract_color(node.get("fills", [])),
-                "strokeWeight": node.get("strokeWeight"),
-                "parent_name": parent_info.get("name") if parent_info else None,
-                "parent_path": parent_info.get("path") if parent_info else None,
-                "parent_gap": parent_gap,
-                "css_gap": round(css_gap, 2),
-                "css_bottom": round(css_bottom, 2),
-            }
+            decorative_info = DecorativeElement(
+                name=node_name,
+                path=current_path,
+                depth=depth,
+                parent_id=parent_id,
+                type=node_type,
+                height=element_height,
+                width=dims.get("width"),
+                color=extract_stroke_color(node.get("strokes", [])) or extract_color(node.get("fills", [])),
+                strokeWeight=node.get("strokeWeight"),
+                parent_name=parent_info.get("name") if parent_info else None,
+                parent_path=parent_info.get("path") if parent_info else None,
+                parent_gap=parent_gap,
+                css_gap=round(css_gap, 2),
+                css_bottom=round(css_bottom, 2),
+            )
             results["decoratives"].append(decorative_info)
         else:
+            line_info = DynamicElement(line_info)
             results["lines"].append(line_info)
             all_elements.append(line_info)
 
@@ -875,6 +1046,7 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
         if export_info:
             ellipse_info["exportSettings"] = export_info
         
+        ellipse_info = DynamicElement(ellipse_info)
         results["ellipses"].append(ellipse_info)
         all_elements.append(ellipse_info)
 
@@ -890,7 +1062,7 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
         other_info["absoluteY"] = abs_y
         other_info["layoutPositioning"] = layout_positioning
         
-        svg_hash = extract_svg_hash(node)
+        svg_hash = extract_svg_hash(node, ctx.svg_hashes)
         if svg_hash:
             other_info["svgHash"] = svg_hash
         
@@ -898,6 +1070,7 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
         if export_info:
             other_info["exportSettings"] = export_info
         
+        other_info = DynamicElement(other_info)
         results["vectors"].append(other_info)
         all_elements.append(other_info)
 
@@ -913,28 +1086,447 @@ def traverse_nodes(node, path="", results=None, warnings=None, whitelist=None, u
                 "layoutMode": node.get("layoutMode"),
             }
 
-    # 子要素を再帰処理
-    children = node.get("children", [])
-    for child in children:
-        child_parent_info = current_parent_info if current_parent_info else parent_info
-        traverse_nodes(
-            child, 
-            current_path, 
-            results, 
-            warnings, 
-            whitelist, 
-            unknown_props, 
-            child_parent_info,
-            depth + 1,
-            node_id,
-            node,
-            all_elements,
-            id_to_name_map 
-        )
+    return current_parent_info
+
+
+class SiblingPositions:
+    """閉じた順に届くノードの、親の children 内での位置を数える(synthetic_node_id 用)
+
+    兄弟は children の順に閉じるため、親ごとに届いた子の数がそのまま位置になる
+    """
+
+    def __init__(self):
+        self.counts = {}
+
+    def next(self, index, parent_index, has_children):
+        position = self.counts.get(parent_index, 0)
+        self.counts[parent_index] = position + 1
+        if has_children:
+            # 子はすべて閉じたので、このノードの子の数はもう使わない
+            self.counts.pop(index, None)
+        return position
+
+
+def build_stream_contexts(input_file):
+    """ストリーミング1パス目: 子を持つノードの文脈(名前・パス・レイアウト)だけを収集
+
+    子を持つノードすべての文脈を保持するため、メモリは(葉を除いた)ノード数に比例する
+    """
+    contexts = {}
+    positions = SiblingPositions()
+    for index, parent_index, depth, node, has_children in iter_document_nodes(input_file):
+        position = positions.next(index, parent_index, has_children)
+        if has_children:
+            contexts[index] = {
+                "parent_index": parent_index,
+                "position": position,
+                "id": node.get("id"),
+                # IDのないノードの子の parent_name は None(walk_nodes と同じ)
+                "child_parent_name": node.get("name", "Unknown") if node.get("id") else None,
+                "name": node.get("name", "Unknown"),
+                "type": node.get("type", ""),
+                "visible": node.get("visible", True),
+                "layoutMode": node.get("layoutMode"),
+                "itemSpacing": node.get("itemSpacing"),
+            }
+
+    # 前順に並べ直して、親から子へパス・親情報・非表示フラグを伝播
+    for index in sorted(contexts):
+        ctx = contexts[index]
+        parent = contexts.get(ctx["parent_index"])
+        ctx["path"] = NodePath(parent["path"] if parent else None, ctx["name"])
+        if ctx["id"] is None:
+            ctx["id"] = synthetic_node_id(parent["id"] if parent else None, ctx["position"])
+        ctx["hidden"] = not ctx["visible"] or bool(parent and parent["hidden"])
+
+        current_parent_info = None
+        if ctx["type"] in ["FRAME", "COMPONENT", "INSTANCE", "GROUP"] and ctx["itemSpacing"] is not None:
+            current_parent_info = {
+                "name": ctx["name"],
+                "path": ctx["path"],
+                "itemSpacing": ctx["itemSpacing"],
+                "layoutMode": ctx["layoutMode"],
+            }
+        inherited = parent["child_parent_info"] if parent else None
+        ctx["child_parent_info"] = current_parent_info if current_parent_info else inherited
+
+    return contexts
+
+
+def stream_traverse_nodes(input_file, whitelist=None, shape_counts=None, svg_hashes=None, run_stats=None):
+    """JSONを逐次読み込みしながら traverse_nodes と同じ結果を生成(ストリーミングモード)
+
+    Figma の JSON は children がプロパティより先に出現するため、2パスで処理する(ファイルを2回読む):
+    1. 子を持つノードの文脈だけを収集
+    2. ノードが閉じた時点で抽出し、前順の通し番号で並べ直す
+
+    元のJSON全体(葉ノードのペイロード)は保持しないが、文脈表は子を持つノードの数に比例する。
+    子は親より先に閉じるため、2パス目ではノードが閉じた時点でそのノードの文脈を破棄する
+    """
+    contexts = build_stream_contexts(input_file)
+
+    pending = {key: [] for key in new_results()}
+    pending_warnings = []
+    pending_elements = []
+    pending_unknown = []
+
+    # 1ノード分の抽出結果を受け取る一時コンテキスト
+    stage = TraversalContext(whitelist=whitelist, shape_counts=shape_counts, svg_hashes=svg_hashes, run_stats=run_stats)
+    stage.unknown_log = []
+    handler = extract_node_info if run_stats is None else run_stats.timed_handler(extract_node_info)
+    # ノードは閉じた順に届くため、parent_gaps の重複除外は前順に並べ直してから行う
+    stage.gap_paths = None
+
+    positions = SiblingPositions()
+    for index, parent_index, depth, node, has_children in iter_document_nodes(input_file):
+        position = positions.next(index, parent_index, has_children)
+        # 子はすべて閉じているので、このノードの文脈はもう参照されない
+        own = contexts.pop(index, None) if has_children else None
+        parent = contexts.get(parent_index)
+        if parent and parent["hidden"]:
+            continue
+        if not node.get("visible", True):
+            continue
+
+        node_name = node.get("name", "Unknown")
+        if parent:
+            current_path = NodePath(parent["path"], node_name)
+            parent_id = parent["id"]
+            parent_name = parent["child_parent_name"]
+            parent_info = parent["child_parent_info"]
+        else:
+            current_path = NodePath(None, node_name)
+            parent_id = None
+            parent_name = None
+            parent_info = None
+        if own is not None:
+            node_id = own["id"]
+        else:
+            node_id = node["id"] if "id" in node else synthetic_node_id(parent_id, position)
+
+        handler(node, stage, current_path, depth, parent_id, parent_name, parent, parent_info, node_id)
+
+        for key, items in stage.results.items():
+            if items:
+                pending[key].extend((index, item) for item in items)
+                items.clear()
+        if stage.warnings:
+            pending_warnings.extend((index, w) for w in stage.warnings)
+            stage.warnings.clear()
+        if stage.all_elements:
+            pending_elements.extend((index, e) for e in stage.all_elements)
+            stage.all_elements.clear()
+        if stage.unknown_log:
+            pending_unknown.extend((index, entry) for entry in stage.unknown_log)
+            stage.unknown_log.clear()
+            stage.unknown_props.clear()
+
+    def in_preorder(items):
+        items.sort(key=lambda pair: pair[0])
+        return [item for _, item in items]
+
+    results = {key: in_preorder(items) for key, items in pending.items()}
+
+    # parent_gaps の重複除外は前順で最初に現れたものを残す(traverse_nodes と同じ)
+    unique_gaps = []
+    seen_gap_paths = set()
+    for gap in results["parent_gaps"]:
+        if gap["path"] not in seen_gap_paths:
+            seen_gap_paths.add(gap["path"])
+            unique_gaps.append(gap)
+    results["parent_gaps"] = unique_gaps
+
+    unknown_props = {}
+    replay_unknown_log(unknown_props, in_preorder(pending_unknown))
+
+    return results, in_preorder(pending_warnings), unknown_props, in_preorder(pending_elements)
+
+
+# 並列抽出(--workers N)
+# これより小さいサブツリーはワーカーに送らず親プロセスで抽出
+PARALLEL_MIN_SUBTREE = 256
+# 分割する深さを自動で選ぶときの上限
+MAX_SPLIT_DEPTH = 8
+
+# ワーカープロセスで共有するホワイトリストとルートノード(initializer で設定)
+_worker_state = {"whitelist": None, "root": None}
+
+
+def collect_split_nodes(root, workers, split_depth=None):
+    """分割する深さと、その深さの表示ノードの (ノード, ルートからの子インデックス列) を返す
+
+    split_depth を省略すると、ノード数が workers * 4 以上になる最初の深さを選ぶ
+    """
+    if not root.get("visible", True):
+        return None, []
+    level = [(root, ())]
+    depth = 0
+    target = split_depth if split_depth is not None else MAX_SPLIT_DEPTH
+    while depth < target:
+        next_level = []
+        for node, locator in level:
+            for i, child in enumerate(node.get("children") or ()):
+                if child.get("visible", True):
+                    next_level.append((child, locator + (i,)))
+        if not next_level:
+            return None, []
+        level = next_level
+        depth += 1
+        if split_depth is None and len(level) >= workers * 4:
+            break
+    return depth, level
+
+
+def count_visible_nodes(node):
+    """表示されるノードの数(非表示ノードとその子孫は数えない)"""
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if not current.get("visible", True):
+            continue
+        count += 1
+        children = current.get("children")
+        if children:
+            stack.extend(children)
+    return count
+
+
+def take_segment(ctx):
+    """ctx に溜まった抽出結果を1セグメントとして取り出し、ctx を空に戻す"""
+    segment = (ctx.results, ctx.warnings, ctx.all_elements, ctx.unknown_log, ctx.shape_counts, ctx.svg_hashes.by_geometry)
+    ctx.results = new_results()
+    ctx.warnings = []
+    ctx.all_elements = []
+    ctx.unknown_props = {}
+    ctx.unknown_log = []
+    ctx.shape_counts = {}
+    ctx.svg_hashes = SvgHashRegistry()
+    ctx.gap_paths = set()
+    return segment
+
+
+def new_segment_context(whitelist, run_stats=None):
+    """セグメント単位で抽出するためのコンテキスト(未知プロパティ・キー構成・svgHash を個別に記録)"""
+    ctx = TraversalContext(whitelist=whitelist, shape_counts={}, run_stats=run_stats)
+    ctx.unknown_log = []
+    return ctx
+
+
+def _init_extract_worker(whitelist, root, collect_stats=False):
+    """ワーカープロセスの初期化(ホワイトリストのコンパイルはワーカーごとに1回)"""
+    _worker_state["whitelist"] = whitelist
+    _worker_state["root"] = root
+    _worker_state["collect_stats"] = collect_stats
+
+
+def _extract_subtree_worker(task):
+    """ワーカー: ルートからの子インデックス列で指定されたサブツリーを抽出"""
+    index, locator, node_id, path, parent_id, parent_name, parent_info = task
+    parent_node = None
+    node = _worker_state["root"]
+    for i in locator:
+        parent_node = node
+        node = node["children"][i]
+    run_stats = RunStats() if _worker_state["collect_stats"] else None
+    ctx = new_segment_context(_worker_state["whitelist"], run_stats)
+    hits, misses = PAINT_CACHE.hits, PAINT_CACHE.misses
+    walk_nodes(node, ctx, path, parent_info, len(locator), parent_id, parent_node, parent_name, node_id=node_id)
+    node_types = run_stats.node_types if run_stats is not None else None
+    return index, take_segment(ctx), (PAINT_CACHE.hits - hits, PAINT_CACHE.misses - misses), node_types
+
+
+def remap_svg_hashes(segment_results, segment_elements, remap):
+    """セグメント内の要素の svgHash を統合後の値に置き換える"""
+    seen = set()
+    for items in list(segment_results.values()) + [segment_elements]:
+        for item in items:
+            if id(item) in seen:
+                continue
+            seen.add(id(item))
+            svg_hash = item.get("svgHash")
+            if svg_hash in remap:
+                item["svgHash"] = remap[svg_hash]
+
+
+def merge_segments(segments, shape_counts=None, svg_hashes=None):
+    """前順に並んだセグメントを1つの抽出結果に統合(直列の traverse_nodes と同じ結果になる)"""
+    if svg_hashes is None:
+        svg_hashes = SvgHashRegistry()
+    results = new_results()
+    warnings = []
+    unknown_props = {}
+    all_elements = []
+
+    for seg_results, seg_warnings, seg_elements, seg_unknown, seg_shapes, seg_svg in segments:
+        # svgHash は前順で最初に現れたジオメトリから割り当て直す(衝突時の桁拡張も直列と同じ順)
+        remap = {}
+        for canonical, local_hash in seg_svg.items():
+            svg_hash = svg_hashes.hash_canonical(canonical)
+            if svg_hash != local_hash:
+                remap[local_hash] = svg_hash
+        if remap:
+            remap_svg_hashes(seg_results, seg_elements, remap)
+
+        for key, items in seg_results.items():
+            results[key].extend(items)
+        warnings.extend(seg_warnings)
+        all_elements.extend(seg_elements)
+        replay_unknown_log(unknown_props, seg_unknown)
+        if shape_counts is not None:
+            for shape, count in seg_shapes.items():
+                shape_counts[shape] = shape_counts.get(shape, 0) + count
+
+    # parent_gaps の重複除外は前順で最初に現れたものを残す(traverse_nodes と同じ)
+    unique_gaps = []
+    seen_gap_paths = set()
+    for gap in results["parent_gaps"]:
+        if gap["path"] not in seen_gap_paths:
+            seen_gap_paths.add(gap["path"])
+            unique_gaps.append(gap)
+    results["parent_gaps"] = unique_gaps
 
     return results, warnings, unknown_props, all_elements
 
 
+def parallel_traverse_nodes(root, workers, whitelist=None, shape_counts=None, svg_hashes=None, split_depth=None, run_stats=None):
+    """サブツリー単位でプロセスプールに分散して抽出(結果は traverse_nodes と同一)
+
+    1. split_depth の深さでツリーを分割し、大きいサブツリーから順にワーカーへ送る
+    2. 親プロセスは分割点より浅いノードと小さいサブツリーを抽出
+    3. 各セグメントを前順に並べて統合(svgHash・未知プロパティ・キー構成の順序も直列と一致)
+    """
+    depth, split_nodes = collect_split_nodes(root, workers, split_depth)
+    tasks = {}
+    for node, locator in split_nodes:
+        size = count_visible_nodes(node)
+        if size >= PARALLEL_MIN_SUBTREE:
+            tasks[id(node)] = (len(tasks), locator, size)
+
+    if workers <= 1 or not tasks:
+        return traverse_nodes(root, whitelist=whitelist, shape_counts=shape_counts, svg_hashes=svg_hashes, run_stats=run_stats)
+
+    print(f"⚡ Parallel: {len(tasks)} subtrees at depth {depth} on {workers} workers")
+    stage = new_segment_context(whitelist, run_stats)
+    segments = []
+    submitted = []
+
+    def on_split(item):
+        node, node_id, path, node_depth, parent_id, parent_name, parent_node, parent_info = item
+        task = tasks.get(id(node))
+        if task is None:
+            # 小さいサブツリーはその場で抽出
+            walk_nodes(node, stage, path, parent_info, node_depth, parent_id, parent_node, parent_name, node_id=node_id)
+            return
+        index, locator, size = task
+        segments.append(take_segment(stage))
+        segments.append(index)
+        submitted.append((size, (index, locator, node_id, path, parent_id, parent_name, parent_info)))
+
+    # 分割点と各タスクの引数は親の走査で確定するため、先に浅い部分を走査する
+    walk_nodes(root, stage, split_depth=depth, on_split=on_split)
+    segments.append(take_segment(stage))
+
+    # 大きいサブツリーから先に送って、最後に残る待ち時間を短くする
+    submitted.sort(key=lambda task: task[0], reverse=True)
+    with multiprocessing.Pool(workers, initializer=_init_extract_worker, initargs=(whitelist, root, run_stats is not None)) as pool:
+        done = {}
+        for index, segment, paint_stats, node_types in pool.imap_unordered(_extract_subtree_worker, [task for _, task in submitted]):
+            done[index] = segment
+            PAINT_CACHE.add_stats(*paint_stats)
+            if node_types:
+                run_stats.merge_node_types(node_types)
+
+    ordered = [done[segment] if isinstance(segment, int) else segment for segment in segments]
+    return merge_segments(ordered, shape_counts, svg_hashes)
+
+
+# 差分抽出(--incremental-cache)
+# これ以上のノードを含むサブツリーをキャッシュの単位にする
+INCREMENTAL_MIN_SUBTREE = 64
+
+
+def open_subtree_cache(cache_file, whitelist):
+    """差分抽出キャッシュを開く(ホワイトリスト・抽出コードが変わっていればキャッシュは使わない)"""
+    sources = [__file__, figma_elements.__file__, figma_svg_hash.__file__]
+    return SubtreeCache(cache_file, environment_fingerprint(whitelist, sources))
+
+
+def subtree_context(item):
+    """サブツリーの抽出結果に影響する、親から受け取る値(キャッシュキーの一部)"""
+    node, node_id, path, depth, parent_id, parent_name, parent_node, parent_info = item
+    # 親ノードからは layoutPositioning の判定に使う layoutMode(と親の有無)だけを参照する
+    parent_layout = (parent_node.get("layoutMode"),) if parent_node is not None else None
+    # id のないノードの ID(とその子孫の ID)は親の ID と兄弟内の位置で決まるため、キーに含める
+    return [node_id, path, depth, parent_id, parent_name, parent_layout, parent_info]
+
+
+def is_empty_segment(segment):
+    """抽出結果を何も含まないセグメントかどうか"""
+    seg_results, seg_warnings, seg_elements, seg_unknown, seg_shapes, seg_svg = segment
+    return not (seg_warnings or seg_elements or seg_unknown or seg_shapes or seg_svg or any(seg_results.values()))
+
+
+def incremental_traverse_nodes(root, cache, whitelist=None, shape_counts=None, svg_hashes=None, run_stats=None):
+    """サブツリーごとのキャッシュを使って抽出(変更のないサブツリーは前回の結果を再利用)
+
+    1. Merkle 形式のサブツリーハッシュを、キャッシュの単位になるサブツリーについて計算
+    2. INCREMENTAL_MIN_SUBTREE 以上のサブツリーごとに、ハッシュ + 親からの文脈でキャッシュを検索
+    3. 見つからなければそのノードだけを抽出し、子サブツリーについて 2 を繰り返す
+    4. セグメントを前順に展開して統合(parallel_traverse_nodes と同じ merge_segments)
+
+    戻り値は traverse_nodes と同じ形式で、キャッシュを使わない場合と同一の結果になる
+    """
+    hashes, sizes = subtree_hashes(root, INCREMENTAL_MIN_SUBTREE)
+    stats = {"reused_nodes": 0, "extracted_nodes": 0}
+
+    def extract_unit(item):
+        """キャッシュにないサブツリーを抽出し、パーツ列を返す(大きい子サブツリーは参照にする)"""
+        node, node_id, path, depth, parent_id, parent_name, parent_node, parent_info = item
+        stage = new_segment_context(whitelist, run_stats)
+        parts = []
+        inline_nodes = sizes[id(node)]
+
+        def on_split(child_item):
+            nonlocal inline_nodes
+            child = child_item[0]
+            if sizes[id(child)] >= INCREMENTAL_MIN_SUBTREE:
+                segment = take_segment(stage)
+                if not is_empty_segment(segment):
+                    parts.append(("seg", segment))
+                parts.append(("ref", lookup_unit(child_item)))
+                inline_nodes -= sizes[id(child)]
+            else:
+                _, child_id, child_path, child_depth, child_parent_id, child_parent_name, child_parent_node, child_parent_info = child_item
+                walk_nodes(child, stage, child_path, child_parent_info, child_depth, child_parent_id, child_parent_node, child_parent_name, node_id=child_id)
+
+        walk_nodes(node, stage, path, parent_info, depth, parent_id, parent_node, parent_name, split_depth=depth + 1, on_split=on_split, node_id=node_id)
+        segment = take_segment(stage)
+        if not is_empty_segment(segment) or not parts:
+            parts.append(("seg", segment))
+        stats["extracted_nodes"] += inline_nodes
+        return parts
+
+    def lookup_unit(item):
+        """サブツリーのキャッシュキーを返す(キャッシュになければ抽出して登録)"""
+        node = item[0]
+        key = cache.key(hashes[id(node)], subtree_context(item))
+        if cache.get(key) is None:
+            cache.put(key, extract_unit(item))
+        else:
+            stats["reused_nodes"] += sizes[id(node)]
+        return key
+
+    # キャッシュからの読み込み(pickle)で大量のオブジェクトを作るため、その間は GC を止める
+    with gc_paused():
+        root_key = lookup_unit((root, root["id"] if "id" in root else synthetic_node_id(None, 0), "", 0, None, None, None, None))
+        segments, used = cache.expand(root_key)
+    # 統合で要素の svgHash を書き換える前に保存する
+    cache.save(used)
+    print(f"♻️ Incremental: {stats['reused_nodes']} nodes reused, {stats['extracted_nodes']} re-extracted ({cache.hits} hits / {cache.misses} misses)")
+    return merge_segments(segments, shape_counts, svg_hashes)
+
+
 # Phase 4: 重なり検出ロジック
 def is_parent_child_relationship(elem_a, elem_b):
     """親子関係かどうかを判定"""
@@ -1064,81 +1656,69 @@ def generate_decorative_css(elem_a, elem_b):
     return f"`.{parent_class}::before {{ content: ''; position: absolute; top: {rel_y}px; left: {rel_x}px; width: {width}px; height: {height}px; background: {color}; }}`"
 
 
-def detect_overlaps(all_elements):
-    """全要素から重なりを検出する"""
+def detect_overlaps(all_elements, backend="auto"):
+    """全要素から重なりを検出する(Yスイープ + X区間木で交差ペアのみを列挙)
+
+    backend: 除外判定の実装 ("auto" = 候補ペアが多く NumPy があれば配列演算、"numpy"、"python")
+    """
     overlaps = []
     decorative_overlaps = []
     
-    # Y座標でソート（上から順）
-    sorted_elements = sorted(
-        [e for e in all_elements if e.get('absoluteY') is not None],
-        key=lambda e: e.get('absoluteY', 0)
-    )
+    # Y座標でソート（上から順）し、必須プロパティが揃った要素だけを対象にする
+    sorted_elements = [
+        e for e in sorted(
+            [e for e in all_elements if e.get('absoluteY') is not None],
+            key=lambda e: e.get('absoluteY', 0)
+        )
+        if all(k in e and e[k] is not None for k in ['absoluteX', 'absoluteY', 'width', 'height'])
+    ]
+    boxes = [
+        (e['absoluteX'], e['absoluteY'], e['absoluteX'] + e['width'], e['absoluteY'] + e['height'])
+        for e in sorted_elements
+    ]
     
-    for i, elem_a in enumerate(sorted_elements):
-        # 必須プロパティの確認
-        if not all(k in elem_a and elem_a[k] is not None for k in ['absoluteX', 'absoluteY', 'width', 'height']):
+    # Y軸・X軸ともに重なるペア (a が上) を列挙
+    pairs = find_intersecting_pairs(boxes)
+    vectorized = resolve_backend(backend, len(pairs)) == "numpy"
+    if vectorized and pairs:
+        # 除外判定を候補ペア全体に対して配列演算で一括実行
+        pairs = GeometryArrays(sorted_elements).filter_pairs(pairs)
+
+    for i, j in pairs:
+        elem_a = sorted_elements[i]
+        elem_b = sorted_elements[j]
+        
+        # 除外判定
+        if not vectorized and should_exclude_from_overlap(elem_a, elem_b):
             continue
         
-        a_bottom = elem_a['absoluteY'] + elem_a['height']
+        a_left, a_top, a_right, a_bottom = boxes[i]
+        b_left, b_top, b_right, b_bottom = boxes[j]
+        overlap_y = a_bottom - b_top
+        overlap_x = calculate_x_overlap(a_left, a_right, b_left, b_right)
         
-        for elem_b in sorted_elements[i+1:]:
-            if not all(k in elem_b and elem_b[k] is not None for k in ['absoluteX', 'absoluteY', 'width', 'height']):
-                continue
-            
-            b_top = elem_b['absoluteY']
-            
-            # Y座標の差が大きすぎる場合はスキップ
-            if b_top - a_bottom > 500:
-                break
-            
-            # 除外判定
-            if should_exclude_from_overlap(elem_a, elem_b):
-                continue
-            
-            # Y軸の重なりチェック
-            if a_bottom > b_top:
-                overlap_y = a_bottom - b_top
-                
-                # X軸の重なりチェック
-                a_left = elem_a['absoluteX']
-                a_right = a_left + elem_a['width']
-                b_left = elem_b['absoluteX']
-                b_right = b_left + elem_b['width']
-                
-                # X軸で重なっているか
-                if not (a_right <= b_left or b_right <= a_left):
-                    overlap_x = calculate_x_overlap(a_left, a_right, b_left, b_right)
-                    
-                    overlap_info = {
-                        'element_a_name': elem_a.get('name', 'Unknown'),
-                        'element_a_id': elem_a.get('id', '-'),
-                        'element_b_name': elem_b.get('name', 'Unknown'),
-                        'element_b_id': elem_b.get('id', '-'),
-                        'overlap_y': round(overlap_y, 1),
-                        'overlap_x': round(overlap_x, 1),
-                    }
-                    
-                    # 装飾要素判定
-                    if is_decorative_for_overlap(elem_a):
-                        overlap_info['css_suggestion'] = generate_decorative_css(elem_a, elem_b)
-                        decorative_overlaps.append(overlap_info)
-                    else:
-                        overlap_info['css_suggestion'] = generate_css_suggestion(elem_a, elem_b, overlap_y, overlap_x)
-                        overlaps.append(overlap_info)
+        overlap_info = {
+            'element_a_name': elem_a.get('name', 'Unknown'),
+            'element_a_id': elem_a.get('id', '-'),
+            'element_b_name': elem_b.get('name', 'Unknown'),
+            'element_b_id': elem_b.get('id', '-'),
+            'overlap_y': round(overlap_y, 1),
+            'overlap_x': round(overlap_x, 1),
+        }
+        
+        # 装飾要素判定
+        if is_decorative_for_overlap(elem_a):
+            overlap_info['css_suggestion'] = generate_decorative_css(elem_a, elem_b)
+            decorative_overlaps.append(overlap_info)
+        else:
+            overlap_info['css_suggestion'] = generate_css_suggestion(elem_a, elem_b, overlap_y, overlap_x)
+            overlaps.append(overlap_info)
     
     return overlaps, decorative_overlaps
 
 
-def generate_dynamic_table(title, items):
-    """アイテムのリストから動的にMarkdownテーブルを生成"""
-    if not items:
-        return []
-
-    lines = []
-    lines.append(f"## {title}")
-    lines.append("")
-
+def dynamic_table_keys(items):
+    """動的カラムのテーブルの列(出力するキー)を出力順に返す"""
     all_keys = []
     seen_keys = set()
 
@@ -1161,10 +1741,22 @@ def generate_dynamic_table(title, items):
                 all_keys.append(key)
                 seen_keys.add(key)
 
+    return all_keys
+
+
+def generate_dynamic_table(title, items):
+    """アイテムのリストから動的にMarkdownテーブルの行を1行ずつ生成"""
+    if not items:
+        return
+
+    yield f"## {title}"
+    yield ""
+
+    all_keys = dynamic_table_keys(items)
     header = "| " + " | ".join(all_keys) + " |"
     separator = "|" + "|".join(["------" for _ in all_keys]) + "|"
-    lines.append(header)
-    lines.append(separator)
+    yield header
+    yield separator
 
     for item in items:
         row_values = []
@@ -1175,87 +1767,169 @@ def generate_dynamic_table(title, items):
                 row_values.append("-")
             else:
                 row_values.append(str(formatted))
-        lines.append("| " + " | ".join(row_values) + " |")
-
-    lines.append("")
-    return lines
-
-
-def generate_markdown(results, warnings, input_file, unknown_props=None, added_props=None, all_elements=None):
-    """抽出結果をMarkdown形式で出力"""
-    lines = []
-
-    lines.append(f"# Figma Design Data (Optimized for AI Coding)")
-    lines.append(f"")
-    lines.append(f"Source: `{input_file}`")
-    lines.append(f"")
-    lines.append(f"> 注意：セクション名はFigmaの構造に基づきます。内容から適切なHTMLタグを推論してください。")
-    lines.append(f"")
-    lines.append(f"**実装済み機能:**")
-    lines.append(f"- ✅ componentProperties(バリアント情報)")
-    lines.append(f"- ✅ rectangleCornerRadii(個別角丸)")
-    lines.append(f"- ✅ lineHeight単位情報(PIXELS/PERCENT)")
-    lines.append(f"- ✅ 親子関係(depth, parent_id)")
-    lines.append(f"- ✅ overflowScrolling(スクロール設定)")
-    lines.append(f"- ✅ SVGハッシュ値(アイコン識別)")
-    lines.append(f"- ✅ exportSettings(画像情報)")
-    lines.append(f"- ✅ **絶対座標(AbsoluteX/Y) - Phase 4**")
-    lines.append(f"- ✅ **layoutPositioning判定 - Phase 4**")
-    lines.append(f"- ✅ **要素の重なり検出と推奨CSS提案 - Phase 4**")
-    lines.append(f"")
+        yield "| " + " | ".join(row_values) + " |"
+
+    yield ""
+
+
+def run_overlap_stage(all_elements, enabled=True, backend="auto"):
+    """重なり検出を1回だけ実行し、Markdown・統計表示・return_results で共有する結果を返す"""
+    if not enabled or not all_elements:
+        return [], []
+    return detect_overlaps(all_elements, backend)
+
+
+def iter_texts_table(texts):
+    """Texts (基本) のテーブルの行を1行ずつ生成"""
+    yield "## Texts (基本)"
+    yield ""
+    yield "| Characters | Name | fontSize | fontWeight | AbsoluteX | AbsoluteY | color | lineHeight | textAlign | opacity |"
+    yield "|------------|------|----------|------------|-----------|-----------|-------|------------|-----------|---------|"
+    for t in texts:
+        chars = t["characters"][:50] + "..." if len(t["characters"]) > 50 else t["characters"]
+        chars = chars.replace("|", "\\|")
+        text_align = t.get('textAlign', '-')
+        abs_x = t.get('absoluteX', '-') or '-'
+        abs_y = t.get('absoluteY', '-') or '-'
+        line_height = t.get('lineHeight', '-')
+        parent_name = t.get('parent_name', '-') or '-'
+        # 数値の丸め処理
+        font_size = round(t['fontSize']) if t['fontSize'] else "-"
+        font_weight = t['fontWeight'] if t['fontWeight'] else "-"
+        abs_x_rounded = round(abs_x) if abs_x != '-' and abs_x is not None else "-"
+        abs_y_rounded = round(abs_y) if abs_y != '-' and abs_y is not None else "-"
+        line_height_rounded = round(line_height) if line_height != '-' and line_height is not None else "-"
+        opacity = round(t.get('opacity', 1), 1) if t.get('opacity', 1) != 1 else "-"
+
+        yield f"| {chars} | {t['name']} | {font_size} | {font_weight} | {abs_x_rounded} | {abs_y_rounded} | {t['color']} | {line_height_rounded} | {text_align} | {opacity} |"
+    yield ""
+
+
+def iter_frames_table(frames):
+    """Frames & Components (基本) のテーブルの行を1行ずつ生成"""
+    yield "## Frames & Components (基本)"
+    yield ""
+    yield "| Name | Type | Width | Height | AbsoluteX | AbsoluteY | layoutMode | itemSpacing | backgroundColor | cornerRadius |"
+    yield "|------|------|-------|--------|-----------|-----------|------------|-------------|-----------------|-------------|"
+    for f in frames:
+        abs_x = f.get('absoluteX', '-') or '-'
+        abs_y = f.get('absoluteY', '-') or '-'
+        # 数値の丸め処理
+        width_rounded = round(f['width']) if f['width'] else "-"
+        height_rounded = round(f['height']) if f['height'] else "-"
+        abs_x_rounded = round(abs_x) if abs_x != '-' and abs_x is not None else "-"
+        abs_y_rounded = round(abs_y) if abs_y != '-' and abs_y is not None else "-"
+        item_spacing_rounded = round(f['itemSpacing']) if f['itemSpacing'] else "-"
+        corner_radius_rounded = round(f['cornerRadius']) if f['cornerRadius'] else "-"
+
+        yield f"| {f['name']} | {f['type']} | {width_rounded} | {height_rounded} | {abs_x_rounded} | {abs_y_rounded} | {f['layoutMode']} | {item_spacing_rounded} | {f['backgroundColor']} | {corner_radius_rounded} |"
+    yield ""
+
+
+def iter_overlap_section(overlaps, decorative_overlaps):
+    """Layout Overlaps(重なり検出)のセクションの行を1行ずつ生成"""
+    if overlaps or decorative_overlaps:
+        yield "## 🔴 Layout Overlaps (要素の重なり検出)"
+        yield ""
+        yield "以下の要素は画面上で重なっています。コーディング時に`position`、`margin`、`z-index`の調整が必要です。"
+        yield ""
+
+        if overlaps:
+            yield "### 通常要素の重なり"
+            yield ""
+            yield "| Element A (前面) | Element A ID | Element B (背面) | Element B ID | Y軸重なり (px) | X軸重なり (px) | 推奨CSS実装方法 |"
+            yield "|-----------------|-------------|-----------------|-------------|---------------|---------------|----------------|"
+            for overlap in overlaps:
+                yield f"| {overlap['element_a_name']} | {overlap['element_a_id']} | {overlap['element_b_name']} | {overlap['element_b_id']} | {overlap['overlap_y']} | {overlap['overlap_x']} | {overlap['css_suggestion']} |"
+            yield ""
+
+        if decorative_overlaps:
+            yield "### 装飾要素の重なり"
+            yield ""
+            yield "| Element A (装飾) | Element A ID | Element B (背景) | Element B ID | 配置方法 |"
+            yield "|-----------------|-------------|-----------------|-------------|---------|"
+            for overlap in decorative_overlaps:
+                yield f"| {overlap['element_a_name']} | {overlap['element_a_id']} | {overlap['element_b_name']} | {overlap['element_b_id']} | {overlap['css_suggestion']} |"
+            yield ""
+
+        yield "**検出条件**:"
+        yield "- Y軸で重なりがある(Element A の bottom > Element B の top)"
+        yield "- X軸でも重なりがある(完全に横並びではない)"
+        yield "- 親子関係ではない(depth差が1かつparent_idが一致する場合は除外)"
+        yield ""
+        yield "**注意事項**:"
+        yield "- `margin-bottom`を負の値にする場合、下の要素に対応する`padding-top`を追加して高さを確保"
+        yield "- 絶対配置(`position: absolute`)を使う場合、親要素に`position: relative`が必要"
+        yield "- 装飾要素は`::before`、`::after`擬似要素での実装を推奨"
+        yield ""
+
+
+def iter_layout_tree_section(elements):
+    """階層構造（Layout Tree）のセクションの行を1行ずつ生成"""
+    yield "## 📐 階層構造（Layout Tree）"
+    yield ""
+    yield "この階層構造を参照して、HTMLの入れ子関係を正確に再現してください。"
+    yield ""
+    yield from iter_layout_tree_lines(elements)
+    yield ""
+
+
+def iter_markdown_lines(results, warnings, input_file, unknown_props=None, added_props=None, all_elements=None, overlap_results=None):
+    """抽出結果をMarkdown形式で1行ずつ生成(全体を1つの文字列に組み立てない)
+
+    overlap_results に run_overlap_stage() の結果を渡すと重なり検出を再実行しない
+    """
+
+    yield f"# Figma Design Data (Optimized for AI Coding)"
+    yield f""
+    yield f"Source: `{input_file}`"
+    yield f""
+    yield f"> 注意：セクション名はFigmaの構造に基づきます。内容から適切なHTMLタグを推論してください。"
+    yield f""
+    yield f"**実装済み機能:**"
+    yield f"- ✅ componentProperties(バリアント情報)"
+    yield f"- ✅ rectangleCornerRadii(個別角丸)"
+    yield f"- ✅ lineHeight単位情報(PIXELS/PERCENT)"
+    yield f"- ✅ 親子関係(depth, parent_id)"
+    yield f"- ✅ overflowScrolling(スクロール設定)"
+    yield f"- ✅ SVGハッシュ値(アイコン識別)"
+    yield f"- ✅ exportSettings(画像情報)"
+    yield f"- ✅ **絶対座標(AbsoluteX/Y) - Phase 4**"
+    yield f"- ✅ **layoutPositioning判定 - Phase 4**"
+    yield f"- ✅ **要素の重なり検出と推奨CSS提案 - Phase 4**"
+    yield f""
 
     if warnings or unknown_props or added_props:
-        lines.append("## ⚠️ Warnings")
-        lines.append("")
+        yield "## ⚠️ Warnings"
+        yield ""
         for w in warnings:
-            lines.append(f"- {w}")
+            yield f"- {w}"
         if added_props:
-            lines.append(f"- 🆕 ホワイトリストに追加されたプロパティ: {', '.join(added_props)}")
-        lines.append("")
-
-    lines.append("## Summary")
-    lines.append("")
-    lines.append(f"| Type | Count |")
-    lines.append(f"|------|-------|")
-    lines.append(f"| Texts | {len(results['texts'])} |")
-    lines.append(f"| Frames/Components | {len(results['frames'])} |")
-    lines.append(f"| Rectangles | {len(results['rectangles'])} |")
-    lines.append(f"| Vectors | {len(results['vectors'])} |")
-    lines.append(f"| Lines | {len(results['lines'])} |")
-    lines.append(f"| Ellipses | {len(results['ellipses'])} |")
-    lines.append(f"| **Decoratives (擬似要素候補)** | **{len(results['decoratives'])}** |")
-    lines.append("")
+            yield f"- 🆕 ホワイトリストに追加されたプロパティ: {', '.join(added_props)}"
+        yield ""
+
+    yield "## Summary"
+    yield ""
+    yield f"| Type | Count |"
+    yield f"|------|-------|"
+    yield f"| Texts | {len(results['texts'])} |"
+    yield f"| Frames/Components | {len(results['frames'])} |"
+    yield f"| Rectangles | {len(results['rectangles'])} |"
+    yield f"| Vectors | {len(results['vectors'])} |"
+    yield f"| Lines | {len(results['lines'])} |"
+    yield f"| Ellipses | {len(results['ellipses'])} |"
+    yield f"| **Decoratives (擬似要素候補)** | **{len(results['decoratives'])}** |"
+    yield ""
 
     # テキスト要素 (基本)
     if results["texts"]:
-        lines.append("## Texts (基本)")
-        lines.append("")
-        lines.append("| Characters | Name | fontSize | fontWeight | AbsoluteX | AbsoluteY | color | lineHeight | textAlign | opacity |")
-        lines.append("|------------|------|----------|------------|-----------|-----------|-------|------------|-----------|---------|")
-        for t in results["texts"]:
-            chars = t["characters"][:50] + "..." if len(t["characters"]) > 50 else t["characters"]
-            chars = chars.replace("|", "\\|")
-            text_align = t.get('textAlign', '-')
-            abs_x = t.get('absoluteX', '-') or '-'
-            abs_y = t.get('absoluteY', '-') or '-'
-            line_height = t.get('lineHeight', '-')
-            parent_name = t.get('parent_name', '-') or '-'
-            # 数値の丸め処理
-            font_size = round(t['fontSize']) if t['fontSize'] else "-"
-            font_weight = t['fontWeight'] if t['fontWeight'] else "-"
-            abs_x_rounded = round(abs_x) if abs_x != '-' and abs_x is not None else "-"
-            abs_y_rounded = round(abs_y) if abs_y != '-' and abs_y is not None else "-"
-            line_height_rounded = round(line_height) if line_height != '-' and line_height is not None else "-"
-            opacity = round(t.get('opacity', 1), 1) if t.get('opacity', 1) != 1 else "-"
-
-            lines.append(f"| {chars} | {t['name']} | {font_size} | {font_weight} | {abs_x_rounded} | {abs_y_rounded} | {t['color']} | {line_height_rounded} | {text_align} | {opacity} |")
-        lines.append("")
+        yield from iter_texts_table(results["texts"])
 
         # テキスト要素 (レイアウト詳細)
-        lines.append("## Texts (レイアウト詳細)")
-        lines.append("")
-        lines.append("| Name | Parent ID | LayoutPositioning | Sizing H | Sizing V | Grow | Align | Visible | BlendMode | Opacity |")
-        lines.append("|------|-----------|-------------------|----------|----------|------|-------|---------|-----------|---------|")
+        yield "## Texts (レイアウト詳細)"
+        yield ""
+        yield "| Name | Parent ID | LayoutPositioning | Sizing H | Sizing V | Grow | Align | Visible | BlendMode | Opacity |"
+        yield "|------|-----------|-------------------|----------|----------|------|-------|---------|-----------|---------|"
         for t in results["texts"]:
             parent_id = t.get('parent_id', '-') or "-"
             layout_pos = t.get('layoutPositioning', '-') or "-"
@@ -1270,34 +1944,18 @@ def generate_markdown(results, warnings, input_file, unknown_props=None, added_p
             blend_str = "-" if blend == "PASS_THROUGH" else blend
             opacity = t.get('opacity', 1)
             opacity_str = str(opacity) if opacity != 1 else "-"
-            lines.append(f"| {t['name'][:20]} | {parent_id[:15]} | {layout_pos} | {sizing_h} | {sizing_v} | {grow_str} | {align} | {visible_str} | {blend_str} | {opacity_str} |")
-        lines.append("")
+            yield f"| {t['name'][:20]} | {parent_id[:15]} | {layout_pos} | {sizing_h} | {sizing_v} | {grow_str} | {align} | {visible_str} | {blend_str} | {opacity_str} |"
+        yield ""
 
     # フレーム/コンポーネント(基本情報)
     if results["frames"]:
-        lines.append("## Frames & Components (基本)")
-        lines.append("")
-        lines.append("| Name | Type | Width | Height | AbsoluteX | AbsoluteY | layoutMode | itemSpacing | backgroundColor | cornerRadius |")
-        lines.append("|------|------|-------|--------|-----------|-----------|------------|-------------|-----------------|-------------|")
-        for f in results["frames"]:
-            abs_x = f.get('absoluteX', '-') or '-'
-            abs_y = f.get('absoluteY', '-') or '-'
-            # 数値の丸め処理
-            width_rounded = round(f['width']) if f['width'] else "-"
-            height_rounded = round(f['height']) if f['height'] else "-"
-            abs_x_rounded = round(abs_x) if abs_x != '-' and abs_x is not None else "-"
-            abs_y_rounded = round(abs_y) if abs_y != '-' and abs_y is not None else "-"
-            item_spacing_rounded = round(f['itemSpacing']) if f['itemSpacing'] else "-"
-            corner_radius_rounded = round(f['cornerRadius']) if f['cornerRadius'] else "-"
-
-            lines.append(f"| {f['name']} | {f['type']} | {width_rounded} | {height_rounded} | {abs_x_rounded} | {abs_y_rounded} | {f['layoutMode']} | {item_spacing_rounded} | {f['backgroundColor']} | {corner_radius_rounded} |")
-        lines.append("")
+        yield from iter_frames_table(results["frames"])
 
         # フレーム/コンポーネント(レイアウト詳細)
-        lines.append("## Frames & Components (レイアウト詳細)")
-        lines.append("")
-        lines.append("| Name | Parent ID | Layout | LayoutPositioning | Wrap | OverflowScroll | Align (Primary) | Align (Counter) | Sizing H | Sizing V | Grow | ChildAlign |")
-        lines.append("|------|-----------|--------|-------------------|------|----------------|-----------------|-----------------|----------|----------|------|------------|")
+        yield "## Frames & Components (レイアウト詳細)"
+        yield ""
+        yield "| Name | Parent ID | Layout | LayoutPositioning | Wrap | OverflowScroll | Align (Primary) | Align (Counter) | Sizing H | Sizing V | Grow | ChildAlign |"
+        yield "|------|-----------|--------|-------------------|------|----------------|-----------------|-----------------|----------|----------|------|------------|"
         for f in results["frames"]:
             parent_id = f.get('parent_id', '-') or "-"
             layout = f.get('layoutMode', '-') or "-"
@@ -1311,14 +1969,14 @@ def generate_markdown(results, warnings, input_file, unknown_props=None, added_p
             grow = f.get('layoutGrow')
             grow_str = str(grow) if grow is not None else "-"
             child_align = f.get('layoutAlign', '-') or "-"
-            lines.append(f"| {f['name']} | {parent_id[:15]} | {layout} | {layout_pos} | {layout_wrap} | {overflow_scroll} | {primary_align} | {counter_align} | {sizing_h} | {sizing_v} | {grow_str} | {child_align} |")
-        lines.append("")
+            yield f"| {f['name']} | {parent_id[:15]} | {layout} | {layout_pos} | {layout_wrap} | {overflow_scroll} | {primary_align} | {counter_align} | {sizing_h} | {sizing_v} | {grow_str} | {child_align} |"
+        yield ""
 
         # フレーム/コンポーネント(表示・その他)
-        lines.append("## Frames & Components (表示・その他)")
-        lines.append("")
-        lines.append("| Name | Visible | ClipsContent | StrokeAlign | BlendMode | Opacity | Constraints | Overrides |")
-        lines.append("|------|---------|--------------|-------------|-----------|---------|-------------|-----------|")
+        yield "## Frames & Components (表示・その他)"
+        yield ""
+        yield "| Name | Visible | ClipsContent | StrokeAlign | BlendMode | Opacity | Constraints | Overrides |"
+        yield "|------|---------|--------------|-------------|-----------|---------|-------------|-----------|"
         for f in results["frames"]:
             visible = f.get('visible', True)
             visible_str = "-" if visible is True else "✗ hidden"
@@ -1335,72 +1993,39 @@ def generate_markdown(results, warnings, input_file, unknown_props=None, added_p
             else:
                 constraints_str = "-"
             overrides = f.get('overrides', '-') or "-"
-            lines.append(f"| {f['name']} | {visible_str} | {clips_str} | {stroke_align} | {blend_str} | {opacity_str} | {constraints_str} | {overrides} |")
-        lines.append("")
+            yield f"| {f['name']} | {visible_str} | {clips_str} | {stroke_align} | {blend_str} | {opacity_str} | {constraints_str} | {overrides} |"
+        yield ""
 
     # 矩形(動的カラム生成)
     if results["rectangles"]:
-        lines.extend(generate_dynamic_table("Rectangles", results["rectangles"]))
+        yield from generate_dynamic_table("Rectangles", results["rectangles"])
 
     # ベクター(動的カラム生成)
     if results["vectors"]:
-        lines.extend(generate_dynamic_table("Vectors (Icons/Lines)", results["vectors"]))
+        yield from generate_dynamic_table("Vectors (Icons/Lines)", results["vectors"])
 
     # 線(動的カラム生成)
     if results["lines"]:
-        lines.extend(generate_dynamic_table("Lines", results["lines"]))
+        yield from generate_dynamic_table("Lines", results["lines"])
 
     # 楕円(動的カラム生成)
     if results["ellipses"]:
-        lines.extend(generate_dynamic_table("Ellipses", results["ellipses"]))
+        yield from generate_dynamic_table("Ellipses", results["ellipses"])
 
     # Phase 4: 重なり検出セクション
+    if overlap_results is None:
+        overlap_results = run_overlap_stage(all_elements)
     if all_elements:
-        overlaps, decorative_overlaps = detect_overlaps(all_elements)
-        
-        if overlaps or decorative_overlaps:
-            lines.append("## 🔴 Layout Overlaps (要素の重なり検出)")
-            lines.append("")
-            lines.append("以下の要素は画面上で重なっています。コーディング時に`position`、`margin`、`z-index`の調整が必要です。")
-            lines.append("")
-            
-            if overlaps:
-                lines.append("### 通常要素の重なり")
-                lines.append("")
-                lines.append("| Element A (前面) | Element A ID | Element B (背面) | Element B ID | Y軸重なり (px) | X軸重なり (px) | 推奨CSS実装方法 |")
-                lines.append("|-----------------|-------------|-----------------|-------------|---------------|---------------|----------------|")
-                for overlap in overlaps:
-                    lines.append(f"| {overlap['element_a_name']} | {overlap['element_a_id']} | {overlap['element_b_name']} | {overlap['element_b_id']} | {overlap['overlap_y']} | {overlap['overlap_x']} | {overlap['css_suggestion']} |")
-                lines.append("")
-            
-            if decorative_overlaps:
-                lines.append("### 装飾要素の重なり")
-                lines.append("")
-                lines.append("| Element A (装飾) | Element A ID | Element B (背景) | Element B ID | 配置方法 |")
-                lines.append("|-----------------|-------------|-----------------|-------------|---------|")
-                for overlap in decorative_overlaps:
-                    lines.append(f"| {overlap['element_a_name']} | {overlap['element_a_id']} | {overlap['element_b_name']} | {overlap['element_b_id']} | {overlap['css_suggestion']} |")
-                lines.append("")
-            
-            lines.append("**検出条件**:")
-            lines.append("- Y軸で重なりがある(Element A の bottom > Element B の top)")
-            lines.append("- X軸でも重なりがある(完全に横並びではない)")
-            lines.append("- 親子関係ではない(depth差が1かつparent_idが一致する場合は除外)")
-            lines.append("")
-            lines.append("**注意事項**:")
-            lines.append("- `margin-bottom`を負の値にする場合、下の要素に対応する`padding-top`を追加して高さを確保")
-            lines.append("- 絶対配置(`position: absolute`)を使う場合、親要素に`position: relative`が必要")
-            lines.append("- 装飾要素は`::before`、`::after`擬似要素での実装を推奨")
-            lines.append("")
+        yield from iter_overlap_section(*overlap_results)
 
     # 装飾要素 (擬似要素候補)
     if results["decoratives"]:
-        lines.append("## 🎨 Decorative Elements (擬似要素候補)")
-        lines.append("")
-        lines.append("以下の要素は装飾線として検出されました。CSS擬似要素 (`::after`)で実装してください。")
-        lines.append("")
-        lines.append("| 要素名 | Depth | 親要素 | 元gap | 高さ | 色 | → CSS gap | → bottom |")
-        lines.append("|--------|-------|--------|-------|------|-----|-----------|----------|")
+        yield "## 🎨 Decorative Elements (擬似要素候補)"
+        yield ""
+        yield "以下の要素は装飾線として検出されました。CSS擬似要素 (`::after`)で実装してください。"
+        yield ""
+        yield "| 要素名 | Depth | 親要素 | 元gap | 高さ | 色 | → CSS gap | → bottom |"
+        yield "|--------|-------|--------|-------|------|-----|-----------|----------|"
         for d in results["decoratives"]:
             name = d.get("name", "-")
             depth = d.get("depth", "-")
@@ -1414,146 +2039,160 @@ def generate_markdown(results, warnings, input_file, unknown_props=None, added_p
             height_str = f"{height}px" if height != "-" else "-"
             css_gap_str = f"{css_gap}px" if css_gap != "-" else "-"
             css_bottom_str = f"{css_bottom}px" if css_bottom != "-" else "-"
-            lines.append(f"| {name} | {depth} | {parent} | {parent_gap_str} | {height_str} | {color} | {css_gap_str} | {css_bottom_str} |")
-        lines.append("")
-        lines.append("### 実装例")
-        lines.append("")
-        lines.append("```scss")
+            yield f"| {name} | {depth} | {parent} | {parent_gap_str} | {height_str} | {color} | {css_gap_str} | {css_bottom_str} |"
+        yield ""
+        yield "### 実装例"
+        yield ""
+        yield "```scss"
         first_dec = results["decoratives"][0]
         parent_name = first_dec.get("parent_name", "parent")
         css_gap = first_dec.get("css_gap", 25)
         css_bottom = first_dec.get("css_bottom", -12.5)
         height = first_dec.get("height", 1)
         color = first_dec.get("color", "rgb(212, 214, 221)")
-        lines.append(f".{parent_name.lower().replace(' ', '-')} {{")
-        lines.append(f"  display: flex;")
-        lines.append(f"  flex-direction: column;")
-        lines.append(f"  gap: {css_gap}px;  // 計算済み")
-        lines.append(f"}}")
-        lines.append(f"")
-        lines.append(f".item {{")
-        lines.append(f"  position: relative;")
-        lines.append(f"  ")
-        lines.append(f"  &:not(:last-child)::after {{")
-        lines.append(f"    content: '';")
-        lines.append(f"    position: absolute;")
-        lines.append(f"    bottom: {css_bottom}px;  // 計算済み")
-        lines.append(f"    left: 0;")
-        lines.append(f"    right: 0;")
-        lines.append(f"    height: {height}px;")
-        lines.append(f"    background: {color};")
-        lines.append(f"  }}")
-        lines.append(f"}}")
-        lines.append("```")
-        lines.append("")
+        yield f".{parent_name.lower().replace(' ', '-')} {{"
+        yield f"  display: flex;"
+        yield f"  flex-direction: column;"
+        yield f"  gap: {css_gap}px;  // 計算済み"
+        yield f"}}"
+        yield f""
+        yield f".item {{"
+        yield f"  position: relative;"
+        yield f"  "
+        yield f"  &:not(:last-child)::after {{"
+        yield f"    content: '';"
+        yield f"    position: absolute;"
+        yield f"    bottom: {css_bottom}px;  // 計算済み"
+        yield f"    left: 0;"
+        yield f"    right: 0;"
+        yield f"    height: {height}px;"
+        yield f"    background: {color};"
+        yield f"  }}"
+        yield f"}}"
+        yield "```"
+        yield ""
 
     # AI計算ヘルパー
     if results["parent_gaps"]:
-        lines.append("## 📐 AI計算ヘルパー")
-        lines.append("")
-        lines.append("AIが追加で装飾要素を検出した場合、以下の情報を使って計算してください。")
-        lines.append("")
-        lines.append("### 親要素のitemSpacing一覧")
-        lines.append("")
-        lines.append("| 親要素名 | パス | itemSpacing | layoutMode |")
-        lines.append("|----------|------|-------------|------------|")
+        yield "## 📐 AI計算ヘルパー"
+        yield ""
+        yield "AIが追加で装飾要素を検出した場合、以下の情報を使って計算してください。"
+        yield ""
+        yield "### 親要素のitemSpacing一覧"
+        yield ""
+        yield "| 親要素名 | パス | itemSpacing | layoutMode |"
+        yield "|----------|------|-------------|------------|"
         for g in results["parent_gaps"]:
             name = g.get("name", "-")
             path = g.get("path", "-")
             spacing = g.get("itemSpacing", "-")
             layout = g.get("layoutMode", "-")
             spacing_str = f"{spacing}px" if spacing != "-" else "-"
-            lines.append(f"| {name} | {path} | {spacing_str} | {layout} |")
-        lines.append("")
-        lines.append("### 計算式")
-        lines.append("")
-        lines.append("```")
-        lines.append("CSS gap = 元のgap × 2 + 装飾要素の高さ")
-        lines.append("bottom位置 = -(元のgap + 装飾要素の高さ / 2)")
-        lines.append("```")
-        lines.append("")
+            yield f"| {name} | {path} | {spacing_str} | {layout} |"
+        yield ""
+        yield "### 計算式"
+        yield ""
+        yield "```"
+        yield "CSS gap = 元のgap × 2 + 装飾要素の高さ"
+        yield "bottom位置 = -(元のgap + 装飾要素の高さ / 2)"
+        yield "```"
+        yield ""
 
     # Phase 3: SVGハッシュ値についての説明を追加
     has_svg_hash = any(v.get("svgHash") for v in results["vectors"])
     if has_svg_hash:
-        lines.append("## 🎨 SVGハッシュ値について")
-        lines.append("")
-        lines.append("**svgHash列の見方:**")
-        lines.append("- 同じハッシュ値 = 同じアイコン形状")
-        lines.append("- 違うハッシュ値 = 異なるアイコン形状")
-        lines.append("- この情報を使って、AIは同じアイコンを統一して使用できます")
-        lines.append("")
-        lines.append("**例:**")
-        lines.append("```")
-        lines.append("arrow-icon-01 | svgHash: a3f2b8c1  ← 同じハッシュ")
-        lines.append("arrow-icon-02 | svgHash: a3f2b8c1  ← 同じアイコンとして扱える")
-        lines.append("trash-icon    | svgHash: 7d9e4f2a  ← 別のアイコン")
-        lines.append("```")
-        lines.append("")
-        # Phase 5: 階層構造（Tree）を出力
-        lines.append("## 📐 階層構造（Layout Tree）")
-        lines.append("")
-        lines.append("この階層構造を参照して、HTMLの入れ子関係を正確に再現してください。")
-        lines.append("")
-        
-        def build_tree_lines(elements, parent_id=None, indent=0):
-            """階層構造を再帰的に構築"""
-            tree_lines = []
-            # parent_idが一致する要素を抽出
-            children = [e for e in elements if e.get('parent_id') == parent_id]
-            # depthでソート
-            children.sort(key=lambda x: (x.get('depth', 0), x.get('absoluteY', 0) or 0))
-            
-            for elem in children:
-                indent_str = "  " * indent
-                elem_type = elem.get('type', 'Unknown')
-                elem_name = elem.get('name', 'Unknown')
-                elem_id = elem.get('id', '')
-                
-                if elem_type == "TEXT":
-                    chars = elem.get('characters', '')[:30]
-                    if len(elem.get('characters', '')) > 30:
-                        chars += "..."
-                    tree_lines.append(f"{indent_str}- {elem_name} (Text): \"{chars}\"")
-                else:
-                    tree_lines.append(f"{indent_str}- {elem_name} ({elem_type})")
-                
-                # 子要素を再帰的に追加
-                tree_lines.extend(build_tree_lines(elements, elem_id, indent + 1))
-            
-            return tree_lines
-        
-        tree_output = build_tree_lines(all_elements)
-        lines.extend(tree_output)
-        lines.append("")
+        yield "## 🎨 SVGハッシュ値について"
+        yield ""
+        yield "**svgHash列の見方:**"
+        yield "- 同じハッシュ値 = 同じアイコン形状"
+        yield "- 違うハッシュ値 = 異なるアイコン形状"
+        yield "- この情報を使って、AIは同じアイコンを統一して使用できます"
+        yield ""
+        yield "**例:**"
+        yield "```"
+        yield "arrow-icon-01 | svgHash: a3f2b8c1d4e5f607  ← 同じハッシュ"
+        yield "arrow-icon-02 | svgHash: a3f2b8c1d4e5f607  ← 同じアイコンとして扱える"
+        yield "trash-icon    | svgHash: 7d9e4f2a0b1c3d5e  ← 別のアイコン"
+        yield "```"
+        yield ""
+
+    # Phase 5: 階層構造（Tree）を出力(SVGハッシュの有無に関係なく出力)
+    yield from iter_layout_tree_section(all_elements or [])
+
+
+def generate_markdown(results, warnings, input_file, unknown_props=None, added_props=None, all_elements=None, overlap_results=None):
+    """抽出結果をMarkdown形式の文字列で返す"""
+    return "\n".join(iter_markdown_lines(results, warnings, input_file, unknown_props, added_props, all_elements, overlap_results))
+
+
+def write_markdown(f, lines, digest=None):
+    """行を逐次ファイルに書き込む
+
+    digest(markdown_hasher())を渡すと、書き込んだ内容で update する(サイドカーとの対応確認用)
+    """
+    separator = ""
+    for line in lines:
+        chunk = separator + line
+        f.write(chunk)
+        if digest is not None:
+            digest.update(chunk.encode("utf-8"))
+        separator = "\n"
+
+
+def iter_layout_tree(elements):
+    """階層構造(Layout Tree)の順に (要素, インデント) を返す
+
+    parent_id → 子要素 の索引を1回だけ作り、明示的なスタックで前順に出力する(O(n log n))
+    """
+    children_by_parent = {}
+    for elem in elements:
+        parent_id = elem.get('parent_id')
+        if parent_id in children_by_parent:
+            children_by_parent[parent_id].append(elem)
+        else:
+            children_by_parent[parent_id] = [elem]
 
-    return "\n".join(lines)
+    # depthでソート(安定ソートなので同順位は元の順序のまま)
+    for children in children_by_parent.values():
+        children.sort(key=lambda x: (x.get('depth', 0), x.get('absoluteY', 0) or 0))
 
+    stack = [(elem, 0) for elem in reversed(children_by_parent.get(None, []))]
+    while stack:
+        elem, indent = stack.pop()
+        yield elem, indent
 
-def main(return_results=False, input_file_override=None):
-    # input_file_override が指定されている場合はそれを使用
-    if input_file_override:
-        input_file = input_file_override
-        output_file = None
-    else:
-        if len(sys.argv) < 2 and not return_results:
-            print("Usage: python extract_figma_06.py <figma-data.json> [output.md]")
-            sys.exit(1)
+        # 子要素は逆順に積んで、ソート順に出力する
+        children = children_by_parent.get(elem.get('id', ''))
+        if children:
+            stack.extend((child, indent + 1) for child in reversed(children))
 
-        input_file = sys.argv[1] if len(sys.argv) >= 2 else None
-        output_file = sys.argv[2] if len(sys.argv) > 2 else None
 
-    if output_file is None and not return_results:
-        input_path = Path(input_file)
-        output_file = input_path.parent / "extracted.md"
+def format_layout_tree_item(elem):
+    """Layout Tree の1行(インデントなし)"""
+    elem_type = elem.get('type', 'Unknown')
+    elem_name = elem.get('name', 'Unknown')
 
-    print(f"Loading whitelist: {WHITELIST_FILE}")
-    whitelist = load_whitelist()
+    if elem_type == "TEXT":
+        chars = elem.get('characters', '')[:30]
+        if len(elem.get('characters', '')) > 30:
+            chars += "..."
+        return f"- {elem_name} (Text): \"{chars}\""
+    return f"- {elem_name} ({elem_type})"
 
-    print(f"Reading: {input_file}")
-    with open(input_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
 
+def iter_layout_tree_lines(elements):
+    """階層構造(Layout Tree)の行を1行ずつ生成"""
+    for elem, indent in iter_layout_tree(elements):
+        yield "  " * indent + format_layout_tree_item(elem)
+
+
+def build_layout_tree_lines(elements):
+    """階層構造(Layout Tree)の行を構築"""
+    return list(iter_layout_tree_lines(elements))
+
+
+def find_document_root(data):
+    """Figma API のレスポンス(ファイル全体 / nodes 指定 / ノード単体)から走査の起点ノードを返す"""
     root = data
     if "document" in data:
         root = data["document"]
@@ -1564,12 +2203,179 @@ def main(return_results=False, input_file_override=None):
                 break
     elif "children" in data:
         pass
+    return root
 
-    print("Building ID to name map...")
-    id_to_name_map = build_id_to_node_map(root)  # ← 追加
-    
-    print("Extracting (Phase 1-5)...")
-    results, warnings, unknown_props, all_elements = traverse_nodes(root, whitelist=whitelist, id_to_name_map=id_to_name_map)  # ← 引数追加
+
+def load_document_root(input_file):
+    """Figma JSON を読み込んで走査の起点ノードを返す"""
+    with open(input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return find_document_root(data)
+
+
+# 値を取るオプション(--name=value / --name value のどちらでも指定可)
+VALUE_OPTIONS = ("--stats", "--shape-report", "--svg-cache", "--geometry", "--workers", "--split-depth", "--incremental-cache")
+# 値を取らないオプション
+FLAG_OPTIONS = ("--stream", "--no-overlaps", "--sidecar")
+
+
+def parse_cli_args(argv, value_options=VALUE_OPTIONS, flag_options=FLAG_OPTIONS):
+    """コマンドライン引数を 位置引数・フラグ・値付きオプション に分ける(不明なオプションは ValueError)"""
+    positional = []
+    flags = set()
+    options = {}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg.startswith("--"):
+            name, sep, value = arg.partition("=")
+            if name in value_options:
+                if not sep:
+                    if i + 1 >= len(argv):
+                        raise ValueError(f"{name} には値が必要です")
+                    i += 1
+                    value = argv[i]
+                options[name] = value
+            elif arg in flag_options:
+                flags.add(arg)
+            else:
+                raise ValueError(f"不明なオプションです: {arg}")
+        else:
+            positional.append(arg)
+        i += 1
+    return positional, flags, options
+
+
+def parse_positive_int(name, value, minimum=1):
+    """整数オプションの値を検証"""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = None
+    if number is None or number < minimum:
+        raise ValueError(f"{name} には {minimum} 以上の整数を指定してください: {value}")
+    return number
+
+
+def main(return_results=False, input_file_override=None, stream=False, overlaps=True, shape_report=None, svg_cache=None, geometry="auto", workers=1, split_depth=None, output_file_override=None, whitelist=None, whitelist_store=None, incremental_cache=None, stats_file=None, sidecar=False):
+    """whitelist を渡すとファイルから読み込まない(バッチ処理でワーカーごとに1回だけ読み込む場合)
+
+    whitelist_store に deferred モードの WhitelistStore を渡すと、追加プロパティは保存せずに溜める
+    return_results=True の場合、Markdown は output_file_override を指定したときだけ出力する
+    stats_file を指定するとフェーズ別・ノードタイプ別の処理時間などを JSON で出力する
+    sidecar=True の場合、extracted.md と並べて丸め・省略のない抽出結果(extracted.jsonl)も出力する
+    (extract_figma_structured.py --sidecar で、extracted.md を解析する代わりに読み込める)
+    """
+    # input_file_override が指定されている場合はそれを使用
+    if input_file_override:
+        input_file = input_file_override
+        output_file = output_file_override
+    else:
+        try:
+            args, flags, options = parse_cli_args(sys.argv[1:])
+            stream = stream or "--stream" in flags
+            overlaps = overlaps and "--no-overlaps" not in flags
+            sidecar = sidecar or "--sidecar" in flags
+            shape_report = options.get("--shape-report", shape_report)
+            svg_cache = options.get("--svg-cache", svg_cache)
+            geometry = options.get("--geometry", geometry)
+            incremental_cache = options.get("--incremental-cache", incremental_cache)
+            stats_file = options.get("--stats", stats_file)
+            if "--workers" in options:
+                workers = parse_positive_int("--workers", options["--workers"])
+            if "--split-depth" in options:
+                split_depth = parse_positive_int("--split-depth", options["--split-depth"])
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+        if len(args) < 1 and not return_results:
+            print("Usage: python extract_figma_06.py <figma-data.json> [output.md] [--stream] [--no-overlaps] [--shape-report=shapes.json] [--svg-cache=svg_hash_cache.json] [--geometry=auto|numpy|python] [--workers N] [--split-depth D] [--incremental-cache=extract_cache.sqlite] [--stats=stats.json] [--sidecar]")
+            sys.exit(1)
+        if geometry not in GEOMETRY_BACKENDS:
+            print(f"❌ --geometry は {' / '.join(GEOMETRY_BACKENDS)} のいずれかを指定してください")
+            sys.exit(1)
+
+        input_file = args[0] if len(args) >= 1 else None
+        output_file = args[1] if len(args) > 1 else None
+
+    if output_file is None and not return_results:
+        input_path = Path(input_file)
+        output_file = input_path.parent / "extracted.md"
+
+    # --stats 指定時のみ計測する(未指定なら measure() は何もしない)
+    run_stats = RunStats() if stats_file else None
+
+    if whitelist is None:
+        print(f"Loading whitelist: {WHITELIST_FILE}")
+        with measure(run_stats, "whitelist_load"):
+            whitelist = load_whitelist()
+    # ノードのキー構成ごとの出現数(スキーマ調査用テレメトリ)
+    shape_counts = {}
+    # 変換結果は残したまま、今回の実行分のヒット率を数える
+    PAINT_CACHE.reset_stats()
+    # svgHash の割り当て(--svg-cache 指定時は実行をまたいで共有)
+    with measure(run_stats, "svg_hash_cache"):
+        svg_hashes = SvgHashRegistry(cache_file=svg_cache)
+
+    print(f"Reading: {input_file}")
+    if stream:
+        mode = "stream"
+        # ストリーミングモード: JSON全体をロードせずに逐次抽出
+        if workers > 1:
+            print("ℹ️ --stream では --workers は使用しません(1プロセスで抽出)")
+        if incremental_cache:
+            print("ℹ️ --stream では --incremental-cache は使用しません")
+        print("Extracting (Phase 1-5, streaming)...")
+        # 読み込みと走査を交互に行うため、1つのフェーズ(traverse)として計測
+        with measure(run_stats, "traverse"):
+            results, warnings, unknown_props, all_elements = stream_traverse_nodes(input_file, whitelist=whitelist, shape_counts=shape_counts, svg_hashes=svg_hashes, run_stats=run_stats)
+    else:
+        with measure(run_stats, "load"):
+            root = load_document_root(input_file)
+
+        # parent_name は走査中に引き継ぐため、ID→名前マップの事前構築は不要(1パス)
+        print("Extracting (Phase 1-5)...")
+        if incremental_cache:
+            # 変更のないサブツリーは前回の抽出結果を再利用(結果はキャッシュなしの場合と同一)
+            if workers > 1:
+                print("ℹ️ --incremental-cache 指定時は --workers は使用しません")
+            mode = "incremental"
+            with measure(run_stats, "incremental_cache_load"):
+                subtree_cache = open_subtree_cache(incremental_cache, whitelist)
+            with measure(run_stats, "traverse"):
+                results, warnings, unknown_props, all_elements = incremental_traverse_nodes(root, subtree_cache, whitelist=whitelist, shape_counts=shape_counts, svg_hashes=svg_hashes, run_stats=run_stats)
+        elif workers > 1:
+            # サブツリー単位でプロセスプールに分散(結果は1プロセスの場合と同一)
+            mode = "parallel"
+            with measure(run_stats, "traverse"):
+                results, warnings, unknown_props, all_elements = parallel_traverse_nodes(root, workers, whitelist=whitelist, shape_counts=shape_counts, svg_hashes=svg_hashes, split_depth=split_depth, run_stats=run_stats)
+        else:
+            mode = "serial"
+            with measure(run_stats, "traverse"):
+                results, warnings, unknown_props, all_elements = traverse_nodes(root, whitelist=whitelist, shape_counts=shape_counts, svg_hashes=svg_hashes, run_stats=run_stats)
+
+    with measure(run_stats, "svg_hash_cache"):
+        svg_hashes.save()
+    if svg_hashes.collisions:
+        print(f"⚠️ SVGハッシュの衝突を検出(桁数を拡張して区別): {svg_hashes.collisions}")
+    if svg_cache:
+        print(f"🗂️ SVG hash cache: {len(svg_hashes.by_geometry)} shapes, {svg_hashes.cache_hits} cached ({svg_cache})")
+
+    paint_lookups = PAINT_CACHE.hits + PAINT_CACHE.misses
+    if paint_lookups:
+        print(f"🎨 Paint cache: {PAINT_CACHE.hits}/{paint_lookups} hits ({PAINT_CACHE.hit_rate():.1%}), {len(PAINT_CACHE.entries)} distinct")
+
+    with measure(run_stats, "shape_report"):
+        shape_report_data = summarize_node_shapes(shape_counts, whitelist)
+        if shape_report:
+            with open(shape_report, "w", encoding="utf-8") as f:
+                json.dump(shape_report_data, f, indent=2, ensure_ascii=False)
+    print(f"🔍 Node shapes: {len(shape_report_data)} distinct ({sum(1 for shape in shape_report_data if shape['unknown'])} with unknown props)")
+    if shape_report:
+        if run_stats is not None:
+            run_stats.record_file("shape_report", shape_report)
+        print(f"   Shape report: {shape_report}")
 
     added_props = []
     if unknown_props:
@@ -1580,17 +2386,39 @@ def main(return_results=False, input_file_override=None):
 
         added_props = add_unknown_to_whitelist(whitelist, unknown_props)
         if added_props:
-            save_whitelist(whitelist)
-            print(f"\n✅ ホワイトリストに追加しました: {', '.join(added_props)}")
-
-    # return_results=True の場合はファイル出力をスキップ
-    if not return_results:
-        markdown = generate_markdown(results, warnings, input_file, unknown_props, added_props, all_elements)
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(markdown)
-
+            if whitelist_store is None:
+                whitelist_store = WhitelistStore(WHITELIST_FILE)
+            with measure(run_stats, "whitelist_update"):
+                whitelist_store.add(unknown_props)
+            if whitelist_store.deferred:
+                print(f"\n📝 ホワイトリストへの追加を記録しました(バッチ終了時に保存): {', '.join(added_props)}")
+            else:
+                print(f"\n✅ ホワイトリストに追加しました: {', '.join(added_props)}")
+
+    # Phase 4: 重なり検出は1回だけ実行して全出力先で共有(--no-overlaps でスキップ)
+    with measure(run_stats, "overlaps"):
+        overlap_results = run_overlap_stage(all_elements, enabled=overlaps, backend=geometry)
+    overlap_list, decorative_overlaps = overlap_results
+
+    # return_results=True で出力先の指定がない場合はファイル出力をスキップ
+    if output_file is not None:
+        # 1行ずつ書き込む(出力全体をメモリ上に組み立てない)
+        digest = markdown_hasher() if sidecar else None
+        with measure(run_stats, "markdown"):
+            with open(output_file, "w", encoding="utf-8") as f:
+                write_markdown(f, iter_markdown_lines(results, warnings, input_file, unknown_props, added_props, all_elements, overlap_results), digest)
+        if run_stats is not None:
+            run_stats.record_file("markdown", output_file)
         print(f"\n✅ Output: {output_file}")
+
+        # --sidecar 指定時のみ: 丸め・省略のない抽出結果(extract_figma_structured.py --sidecar・他のツール向け。
+        # Markdown の数倍の書き込みコストがかかる)
+        if sidecar:
+            with measure(run_stats, "sidecar"):
+                sidecar_file = write_sidecar(sidecar_path(output_file), results, warnings, unknown_props, all_elements, overlap_results, input_file, digest.hexdigest())
+            if run_stats is not None:
+                run_stats.record_file("sidecar", sidecar_file)
+            print(f"   Sidecar: {sidecar_file}")
     print(f"   Texts: {len(results['texts'])}")
     print(f"   Frames: {len(results['frames'])}")
     print(f"   Rectangles: {len(results['rectangles'])}")
@@ -1601,10 +2429,10 @@ def main(return_results=False, input_file_override=None):
         print(f"   🎨 Decoratives (擬似要素候補): {len(results['decoratives'])}")
     
     # Phase 4: 重なり検出結果を表示
-    if all_elements:
-        overlaps, decorative_overlaps = detect_overlaps(all_elements)
-        if overlaps or decorative_overlaps:
-            print(f"   🔴 Layout Overlaps: {len(overlaps)} normal, {len(decorative_overlaps)} decorative")
+    if not overlaps:
+        print(f"   ⏭️ Layout Overlaps: skipped (--no-overlaps)")
+    elif overlap_list or decorative_overlaps:
+        print(f"   🔴 Layout Overlaps: {len(overlap_list)} normal, {len(decorative_overlaps)} decorative")
 
     if warnings:
         print(f"\n⚠️ Warnings: {len(warnings)}")
@@ -1619,16 +2447,28 @@ def main(return_results=False, input_file_override=None):
     print(f"   ✅ Phase 3: SVGハッシュ値, exportSettings")
     print(f"   ✅ Phase 4: 絶対座標(AbsoluteX/Y), layoutPositioning, 重なり検出")
 
+    if run_stats is not None:
+        run_stats.info.update({
+            "input": str(input_file),
+            "mode": mode,
+            "workers": workers if mode == "parallel" else 1,
+            "counts": {kind: len(items) for kind, items in results.items()},
+            "overlaps": {"normal": len(overlap_list), "decorative": len(decorative_overlaps)},
+            "paint_cache": {
+                "hits": PAINT_CACHE.hits,
+                "misses": PAINT_CACHE.misses,
+                "hit_rate": PAINT_CACHE.hit_rate(),
+                "distinct": len(PAINT_CACHE.entries),
+            },
+        })
+        run_stats.write(stats_file)
+        print(f"\n📊 Stats: {stats_file}")
+
     # return_results=True の場合は結果を返す
     if return_results:
-        # 重なり検出結果を results に追加
-        if all_elements:
-            overlaps, decorative_overlaps = detect_overlaps(all_elements)
-            results['overlaps'] = overlaps
-            results['decorative_overlaps'] = decorative_overlaps
-        else:
-            results['overlaps'] = []
-            results['decorative_overlaps'] = []
+        # 重なり検出結果を results に追加(検出済みの結果を再利用)
+        results['overlaps'] = overlap_list
+        results['decorative_overlaps'] = decorative_overlaps
 
         return results, warnings, unknown_props, all_elements
 
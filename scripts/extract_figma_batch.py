@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Figma Batch Extractor
+=====================
+urls.csv に記載された全ページ・全ブレークポイントについて、
+extract_figma.py → extract_figma_structured.py の2段階をプロセスプールでまとめて実行
+(構造化は extracted.md を読み込まず、メモリ上の抽出結果に extracted.md と同じ丸め・省略を適用して行う)
+
+機能:
+1. urls.csv (page_name, desktop_url, mobile_url) から処理対象を列挙
+2. 取得済みJSONのディレクトリからページ・ブレークポイントごとのJSONを検索
+   - <json_dir>/<page>/<breakpoint>.json
+   - <json_dir>/<page>/<breakpoint>/figma-data.json
+   - <json_dir>/<page>/sections/<section>/<breakpoint>/figma-data.json(1A-fetch-figma.js の出力構造)
+3. 上限付きのプロセスプールで実行(起動・インポート・ホワイトリスト読み込みはワーカーごとに1回)
+4. 各ジョブのログは出力先の batch.log に保存し、最後にページ別の処理時間を表示
+5. ホワイトリストへの追加はメモリに溜めて、バッチの最後に1回だけ保存
+   (--whitelist-per-run でジョブごとに保存。どちらもロック + マージで安全に書き込む)
+
+使用方法:
+    python3 extract_figma_batch.py <urls.csv> <json_dir> [--workers N] [--stream] [--no-overlaps] [--summary=batch_summary.json] [--whitelist-per-run]
+"""
+
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+import traceback
+from pathlib import Path
+
+import extract_figma
+import extract_figma_structured
+from figma_whitelist_store import WhitelistStore
+
+
+BREAKPOINTS = ("desktop", "mobile")
+BATCH_VALUE_OPTIONS = ("--workers", "--summary")
+BATCH_FLAG_OPTIONS = ("--stream", "--no-overlaps", "--whitelist-per-run")
+JOB_LOG_FILE = "batch.log"
+
+# ワーカープロセスで共有する状態(initializer で設定)
+_worker_state = {"whitelist": None, "whitelist_store": None, "options": None}
+
+
+def to_directory_name(name):
+    """ページ名をディレクトリ名に変換(1A-fetch-figma.js の toDirectoryName と同じ規則)"""
+    name = name.lower()
+    name = re.sub(r"[\s_]+", "-", name)
+    name = re.sub(r"[^\w\-]", "", name, flags=re.ASCII)
+    name = re.sub(r"--+", "-", name)
+    return name.strip("-")
+
+
+def load_pages(csv_file):
+    """urls.csv を読み込み、(page_name, {breakpoint: url}) のリストを返す"""
+    pages = []
+    with open(csv_file, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            page_name = (row.get("page_name") or "").strip()
+            if not page_name:
+                continue
+            urls = {bp: (row.get(f"{bp}_url") or "").strip() for bp in BREAKPOINTS}
+            pages.append((page_name, {bp: url for bp, url in urls.items() if url}))
+    return pages
+
+
+def find_page_inputs(json_dir, page_name, breakpoint):
+    """ページ・ブレークポイントの入力JSONと出力ディレクトリの組を返す(見つからなければ空)"""
+    json_dir = Path(json_dir)
+    for page_dir_name in dict.fromkeys([to_directory_name(page_name), page_name]):
+        page_dir = json_dir / page_dir_name
+        if not page_dir.is_dir():
+            continue
+
+        flat_file = page_dir / f"{breakpoint}.json"
+        if flat_file.is_file():
+            return [(flat_file, page_dir / breakpoint)]
+
+        nested_file = page_dir / breakpoint / "figma-data.json"
+        if nested_file.is_file():
+            return [(nested_file, nested_file.parent)]
+
+        section_files = sorted((page_dir / "sections").glob(f"*/{breakpoint}/figma-data.json"))
+        if section_files:
+            return [(path, path.parent) for path in section_files]
+    return []
+
+
+def build_jobs(pages, json_dir):
+    """処理対象のジョブと、入力JSONが見つからなかった (page_name, breakpoint) を返す"""
+    jobs = []
+    missing = []
+    for page_name, urls in pages:
+        for breakpoint in urls:
+            inputs = find_page_inputs(json_dir, page_name, breakpoint)
+            if not inputs:
+                missing.append((page_name, breakpoint))
+            for input_file, output_dir in inputs:
+                jobs.append({
+                    "index": len(jobs),
+                    "page": page_name,
+                    "breakpoint": breakpoint,
+                    "input": str(input_file),
+                    "output_dir": str(output_dir),
+                })
+    return jobs, missing
+
+
+def _init_batch_worker(options):
+    """ワーカープロセスの初期化(ホワイトリストはここで1回だけ読み込む)"""
+    _worker_state["whitelist"] = extract_figma.load_whitelist()
+    _worker_state["whitelist_store"] = WhitelistStore(extract_figma.WHITELIST_FILE, deferred=options["defer_whitelist"])
+    _worker_state["options"] = options
+
+
+def run_job(job):
+    """1ページ・1ブレークポイント分の2段階を実行し、処理時間と結果を返す"""
+    options = _worker_state["options"]
+    output_dir = Path(job["output_dir"])
+    output_dir.mkdir(parents=True, exist_ok=True)
+    extracted_file = output_dir / "extracted.md"
+
+    result = dict(job, status="ok", extract_seconds=0.0, structured_seconds=0.0, error=None, whitelist_additions={})
+    log = io.StringIO()
+    stage = "extract"
+    try:
+        with contextlib.redirect_stdout(log):
+            start = time.perf_counter()
+            results, _, _, all_elements = extract_figma.main(
+                return_results=True,
+                input_file_override=job["input"],
+                output_file_override=extracted_file,
+                stream=options["stream"],
+                overlaps=options["overlaps"],
+                whitelist=_worker_state["whitelist"],
+                whitelist_store=_worker_state["whitelist_store"],
+            )
+            result["extract_seconds"] = time.perf_counter() - start
+
+            # extracted.md は出力するが、構造化には抽出結果を渡す(丸め・省略は extracted.md と同じ)
+            stage = "structured"
+            start = time.perf_counter()
+            parser = extract_figma_structured.parser_from_results(results, all_elements, source=str(extracted_file))
+            extract_figma_structured.generate_structured_outputs(parser, output_dir / "structured_output")
+            result["structured_seconds"] = time.perf_counter() - start
+    except (Exception, SystemExit) as e:
+        result["status"] = "failed"
+        result["error"] = f"{stage}: {e}"
+        log.write(traceback.format_exc())
+
+    # deferred モードで溜めた追加分は親プロセスでまとめて保存する
+    additions = _worker_state["whitelist_store"].take_pending()
+    result["whitelist_additions"] = {node_type: sorted(props) for node_type, props in additions.items()}
+    (output_dir / JOB_LOG_FILE).write_text(log.getvalue(), encoding="utf-8")
+    return result
+
+
+def run_batch(jobs, workers, options):
+    """ジョブを上限付きのプロセスプールで実行し、ジョブ順の結果を返す"""
+    results = [None] * len(jobs)
+    if workers <= 1:
+        _init_batch_worker(options)
+        for job in jobs:
+            results[job["index"]] = report_job(run_job(job))
+        return results
+
+    with multiprocessing.Pool(workers, initializer=_init_batch_worker, initargs=(options,)) as pool:
+        for result in pool.imap_unordered(run_job, jobs):
+            results[result["index"]] = report_job(result)
+    return results
+
+
+def flush_whitelist_additions(results):
+    """全ジョブのホワイトリスト追加分をまとめて1回だけ保存"""
+    store = WhitelistStore(extract_figma.WHITELIST_FILE, deferred=True)
+    for result in results:
+        store.add(result["whitelist_additions"])
+    added = store.flush()
+    if added:
+        print(f"\n✅ ホワイトリストに追加しました({len(added)}件): {', '.join(added)}")
+    return added
+
+
+def report_job(result):
+    """完了したジョブを1行で表示"""
+    label = f"{result['page']} [{result['breakpoint']}] {result['input']}"
+    if result["status"] == "ok":
+        total = result["extract_seconds"] + result["structured_seconds"]
+        print(f"✅ {label} ({total:.2f}s)")
+    else:
+        print(f"❌ {label}: {result['error']} (詳細: {Path(result['output_dir']) / JOB_LOG_FILE})")
+    return result
+
+
+def summarize_pages(pages, results, missing):
+    """ページ別の処理時間の集計(CSVの順)"""
+    summary = {
+        page_name: {
+            "page": page_name, "jobs": 0, "failed": 0, "missing": [],
+            "extract_seconds": 0.0, "structured_seconds": 0.0,
+        }
+        for page_name, _ in pages
+    }
+    for result in results:
+        page = summary[result["page"]]
+        page["jobs"] += 1
+        page["failed"] += result["status"] != "ok"
+        page["extract_seconds"] += result["extract_seconds"]
+        page["structured_seconds"] += result["structured_seconds"]
+    for page_name, breakpoint in missing:
+        summary[page_name]["missing"].append(breakpoint)
+    return list(summary.values())
+
+
+def print_summary(page_summary, wall_seconds, workers):
+    """ページ別の処理時間を表示"""
+    print("\n⏱️ Batch summary")
+    print(f"| {'Page':<24} | {'Jobs':>4} | {'Extract':>8} | {'Structured':>10} | {'Total':>8} | Status |")
+    print(f"|{'-' * 26}|{'-' * 6}|{'-' * 10}|{'-' * 12}|{'-' * 10}|--------|")
+    for page in page_summary:
+        total = page["extract_seconds"] + page["structured_seconds"]
+        if page["failed"]:
+            status = f"❌ {page['failed']} failed"
+        elif page["missing"]:
+            status = f"⚠️ missing: {', '.join(page['missing'])}"
+        else:
+            status = "✅"
+        print(f"| {page['page']:<24} | {page['jobs']:>4} | {page['extract_seconds']:>7.2f}s | {page['structured_seconds']:>9.2f}s | {total:>7.2f}s | {status} |")
+    cpu_seconds = sum(page["extract_seconds"] + page["structured_seconds"] for page in page_summary)
+    print(f"\n   Wall time: {wall_seconds:.2f}s on {workers} workers (job time total: {cpu_seconds:.2f}s)")
+
+
+def main():
+    """メイン実行関数"""
+    try:
+        args, flags, options = extract_figma.parse_cli_args(sys.argv[1:], BATCH_VALUE_OPTIONS, BATCH_FLAG_OPTIONS)
+        workers = os.cpu_count() or 1
+        if "--workers" in options:
+            workers = extract_figma.parse_positive_int("--workers", options["--workers"])
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    summary_file = options.get("--summary")
+
+    if len(args) != 2:
+        print("Usage: python3 extract_figma_batch.py <urls.csv> <json_dir> [--workers N] [--stream] [--no-overlaps] [--summary=batch_summary.json] [--whitelist-per-run]")
+        sys.exit(1)
+
+    csv_file, json_dir = args
+    if not os.path.exists(csv_file):
+        print(f"Error: File not found: {csv_file}")
+        sys.exit(1)
+    if not os.path.isdir(json_dir):
+        print(f"Error: Directory not found: {json_dir}")
+        sys.exit(1)
+
+    pages = load_pages(csv_file)
+    jobs, missing = build_jobs(pages, json_dir)
+    workers = max(1, min(workers, len(jobs)))
+
+    print("🚀 Figma Batch Extractor 開始...")
+    print(f"📄 Pages: {len(pages)} ({csv_file})")
+    print(f"📦 Jobs: {len(jobs)} on {workers} workers")
+    for page_name, breakpoint in missing:
+        print(f"⚠️ JSONが見つかりません: {page_name} [{breakpoint}]")
+
+    job_options = {
+        "stream": "--stream" in flags,
+        "overlaps": "--no-overlaps" not in flags,
+        "defer_whitelist": "--whitelist-per-run" not in flags,
+    }
+    start = time.perf_counter()
+    results = run_batch(jobs, workers, job_options) if jobs else []
+    flush_whitelist_additions(results)
+    wall_seconds = time.perf_counter() - start
+
+    page_summary = summarize_pages(pages, results, missing)
+    print_summary(page_summary, wall_seconds, workers)
+
+    if summary_file:
+        with open(summary_file, "w", encoding="utf-8") as f:
+            json.dump({"wall_seconds": wall_seconds, "workers": workers, "pages": page_summary, "jobs": results}, f, indent=2, ensure_ascii=False)
+        print(f"   Summary: {summary_file}")
+
+    if any(result["status"] != "ok" for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Figma Design Diff
+=================
+2つの Figma JSON スナップショットを traverse_nodes の抽出結果で比較し、変更された要素を報告
+
+機能:
+1. 要素の対応付けはノードIDで行い、IDがない要素はパス(同名の兄弟は出現順)で対応付け
+2. 追加 / 削除 / 移動(座標・サイズ・親の変更)/ スタイル変更 を検出
+   (絶対座標は親要素からの相対位置で比較するため、セクションを動かしても子孫は移動扱いにならない)
+3. 重なり検出の結果(通常・装飾)の追加 / 解消 / 変化を検出
+4. 変更を含むセクション(ルート直下の要素)を一覧にして、再生成が必要な範囲を示す
+   (重なりの変化は、重なっている2要素それぞれのセクションに数える)
+5. どの処理も要素数に対して線形時間(IDの辞書引きのみ)
+
+使用方法:
+    python3 extract_figma_diff.py <old.json> <new.json> [design_diff.md] [--json=design_diff.json] [--no-overlaps]
+"""
+
+import json
+import sys
+import os
+from pathlib import Path
+
+import extract_figma
+from figma_elements import to_plain
+
+
+# 移動として扱うフィールド(座標・サイズ・階層)
+MOVE_FIELDS = {
+    "absoluteX", "absoluteY", "width", "height", "x", "y",
+    "relativeTransform", "size", "parent_id", "depth",
+}
+
+# 親要素からの相対位置で比較する絶対座標(x / y も absoluteBoundingBox の値)→ 親側の対応する座標
+ABSOLUTE_FIELDS = {"absoluteX": "absoluteX", "absoluteY": "absoluteY", "x": "absoluteX", "y": "absoluteY"}
+
+# 祖先の名前から決まるため比較しないフィールド
+IGNORED_FIELDS = {"id", "path", "parent_name"}
+
+# 座標・サイズの差がこれ未満なら変更なしとみなす(Markdown出力の丸めより細かい差)
+POSITION_TOLERANCE = 0.01
+
+# セクションとみなす深さ(ルート直下)
+SECTION_DEPTH = 1
+
+
+def element_keys(elements):
+    """要素ごとの対応付けキー(ID、IDがなければパス + 同じパス内の出現順)"""
+    keys = []
+    path_counts = {}
+    for element in elements:
+        element_id = element.get("id")
+        if element_id and not str(element_id).startswith("unknown_"):
+            keys.append(element_id)
+        else:
+            path = element.get("path")
+            occurrence = path_counts.get(path, 0)
+            path_counts[path] = occurrence + 1
+            keys.append(f"path:{path}#{occurrence}")
+    return keys
+
+
+def values_differ(field, old_value, new_value):
+    """フィールドの値が変わったかどうか(座標・サイズは微小な差を無視)"""
+    if old_value == new_value:
+        return False
+    if (
+        field in MOVE_FIELDS
+        and isinstance(old_value, (int, float)) and isinstance(new_value, (int, float))
+        and not isinstance(old_value, bool) and not isinstance(new_value, bool)
+    ):
+        return abs(old_value - new_value) >= POSITION_TOLERANCE
+    return True
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parent_origin(parent, field):
+    """座標を相対位置にするときの親の座標(同じフィールドがなければ絶対座標)"""
+    origin = parent.get(field)
+    return origin if is_number(origin) else parent.get(ABSOLUTE_FIELDS[field])
+
+
+def compare_elements(old, new, old_parent=None, new_parent=None):
+    """1要素の変更を (移動したフィールド, スタイルが変わったフィールド) で返す
+
+    新旧どちらにも親要素があれば、絶対座標は親からの相対位置が変わった場合だけ移動とする
+    (報告する値は絶対座標のまま)
+    """
+    moved = {}
+    restyled = {}
+    for field in dict.fromkeys(list(old.keys()) + list(new.keys())):
+        if field in IGNORED_FIELDS:
+            continue
+        old_value = old.get(field)
+        new_value = new.get(field)
+        if field in ABSOLUTE_FIELDS and old_parent is not None and new_parent is not None:
+            old_origin = parent_origin(old_parent, field)
+            new_origin = parent_origin(new_parent, field)
+            if all(is_number(value) for value in (old_value, new_value, old_origin, new_origin)):
+                if not values_differ(field, old_value - old_origin, new_value - new_origin):
+                    continue
+        if not values_differ(field, old_value, new_value):
+            continue
+        if field in MOVE_FIELDS:
+            moved[field] = (old_value, new_value)
+        else:
+            restyled[field] = (old_value, new_value)
+    return moved, restyled
+
+
+class SectionResolver:
+    """要素が属するセクション(ルート直下の祖先の (ID, 名前))を親IDをたどって求める(結果はメモ化)"""
+
+    def __init__(self, elements):
+        self.by_id = {element.get("id"): element for element in elements if element.get("id")}
+        self.memo = {}
+
+    def section_of_id(self, element_id):
+        """ID の要素が属するセクション(要素が見つからなければ None = ルート)"""
+        element = self.by_id.get(element_id)
+        return self.section_of(element) if element is not None else None
+
+    def section_of(self, element):
+        chain = []
+        current = element
+        section = None
+        while current is not None:
+            element_id = current.get("id")
+            if element_id in self.memo:
+                section = self.memo[element_id]
+                break
+            chain.append(element_id)
+            depth = current.get("depth") or 0
+            if depth <= SECTION_DEPTH:
+                section = (element_id, current.get("name", "Unknown")) if depth == SECTION_DEPTH else None
+                break
+            current = self.by_id.get(current.get("parent_id"))
+        for element_id in chain:
+            if element_id is not None:
+                self.memo[element_id] = section
+        return section
+
+
+def overlap_index(overlap_results):
+    """重なり検出の結果を (種類, 要素AのID, 要素BのID) → 重なり情報 の辞書にする"""
+    overlaps, decorative_overlaps = overlap_results
+    index = {}
+    for kind, items in (("normal", overlaps), ("decorative", decorative_overlaps)):
+        for item in items:
+            index[(kind, item["element_a_id"], item["element_b_id"])] = item
+    return index
+
+
+def diff_overlaps(old_results, new_results):
+    """重なりの追加・解消・変化(重なり量の変化)を返す"""
+    old_index = overlap_index(old_results)
+    new_index = overlap_index(new_results)
+    added = [dict(item, kind=key[0]) for key, item in new_index.items() if key not in old_index]
+    removed = [dict(item, kind=key[0]) for key, item in old_index.items() if key not in new_index]
+    changed = []
+    for key, new_item in new_index.items():
+        old_item = old_index.get(key)
+        if old_item is None:
+            continue
+        if (old_item["overlap_x"], old_item["overlap_y"]) != (new_item["overlap_x"], new_item["overlap_y"]):
+            changed.append({
+                "kind": key[0],
+                "element_a_name": new_item["element_a_name"],
+                "element_a_id": new_item["element_a_id"],
+                "element_b_name": new_item["element_b_name"],
+                "element_b_id": new_item["element_b_id"],
+                "old": {"overlap_x": old_item["overlap_x"], "overlap_y": old_item["overlap_y"]},
+                "new": {"overlap_x": new_item["overlap_x"], "overlap_y": new_item["overlap_y"]},
+            })
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def element_summary(key, element, section):
+    """レポート用の要素情報"""
+    return {
+        "key": key,
+        "id": element.get("id"),
+        "name": element.get("name", "Unknown"),
+        "type": element.get("type"),
+        "path": str(element["path"]) if element.get("path") is not None else None,
+        "section": section,
+    }
+
+
+def diff_snapshots(old_elements, new_elements, old_overlaps=None, new_overlaps=None):
+    """2つのスナップショットの all_elements(と重なり検出の結果)の差分を返す"""
+    old_by_key = dict(zip(element_keys(old_elements), old_elements))
+    new_keys = element_keys(new_elements)
+    old_sections = SectionResolver(old_elements)
+    new_sections = SectionResolver(new_elements)
+
+    added = []
+    moved = []
+    restyled = []
+    unchanged = 0
+    affected = {}
+
+    def touch(section, kind):
+        counts = affected.setdefault(section, {"added": 0, "removed": 0, "moved": 0, "restyled": 0, "overlaps": 0})
+        counts[kind] += 1
+
+    for key, new in zip(new_keys, new_elements):
+        section = new_sections.section_of(new)
+        old = old_by_key.pop(key, None)
+        if old is None:
+            added.append(element_summary(key, new, section))
+            touch(section, "added")
+            continue
+
+        moved_fields, restyled_fields = compare_elements(
+            old, new,
+            old_sections.by_id.get(old.get("parent_id")),
+            new_sections.by_id.get(new.get("parent_id")),
+        )
+        if moved_fields:
+            moved.append(dict(element_summary(key, new, section), changes=moved_fields))
+            touch(section, "moved")
+        if restyled_fields:
+            restyled.append(dict(element_summary(key, new, section), changes=restyled_fields))
+            touch(section, "restyled")
+        if not moved_fields and not restyled_fields:
+            unchanged += 1
+
+    # 対応が見つからなかった旧要素は削除
+    removed = []
+    for key, old in old_by_key.items():
+        section = old_sections.section_of(old)
+        removed.append(element_summary(key, old, section))
+        touch(section, "removed")
+
+    overlaps = None
+    if old_overlaps is not None and new_overlaps is not None:
+        overlaps = diff_overlaps(old_overlaps, new_overlaps)
+        # 重なっている2要素のセクション(解消した重なりは旧スナップショットで求める)
+        for status, resolver in (("added", new_sections), ("removed", old_sections), ("changed", new_sections)):
+            for item in overlaps[status]:
+                sections = list(dict.fromkeys(
+                    resolver.section_of_id(item[field]) for field in ("element_a_id", "element_b_id")
+                ))
+                item["sections"] = sections
+                for section in sections:
+                    touch(section, "overlaps")
+
+    return {
+        "added": added,
+        "removed": removed,
+        "moved": moved,
+        "restyled": restyled,
+        "unchanged": unchanged,
+        "overlaps": overlaps,
+        "affected_sections": affected,
+    }
+
+
+def extract_snapshot(input_file, whitelist, overlaps=True):
+    """スナップショット1つ分の all_elements と重なり検出の結果"""
+    root = extract_figma.load_document_root(input_file)
+    _, _, _, all_elements = extract_figma.traverse_nodes(root, whitelist=whitelist)
+    overlap_results = extract_figma.run_overlap_stage(all_elements, enabled=overlaps) if overlaps else None
+    return all_elements, overlap_results
+
+
+def format_change(value):
+    """変更値をMarkdownのセル用に整形"""
+    formatted = extract_figma.format_value_for_markdown(to_plain(value))
+    if formatted is None:
+        return "-"
+    text = str(formatted)
+    if len(text) > 60:
+        text = text[:57] + "..."
+    return text.replace("|", "\\|").replace("\n", " ")
+
+
+def section_label(section):
+    """セクションの表示名"""
+    return section[1] if section is not None else "(ルート)"
+
+
+def section_labels(overlap):
+    """重なりの2要素のセクションの表示名"""
+    return ", ".join(section_label(section) for section in overlap["sections"])
+
+
+def generate_diff_markdown(diff, old_file, new_file):
+    """差分レポートをMarkdown形式で出力"""
+    lines = []
+    lines.append("# Figma Design Diff")
+    lines.append("")
+    lines.append(f"Old: `{old_file}`")
+    lines.append(f"New: `{new_file}`")
+    lines.append("")
+
+    lines.append("## Summary")
+    lines.append("")
+    lines.append("| Change | Count |")
+    lines.append("|--------|-------|")
+    lines.append(f"| Added | {len(diff['added'])} |")
+    lines.append(f"| Removed | {len(diff['removed'])} |")
+    lines.append(f"| Moved | {len(diff['moved'])} |")
+    lines.append(f"| Restyled | {len(diff['restyled'])} |")
+    lines.append(f"| Unchanged | {diff['unchanged']} |")
+    if diff["overlaps"] is not None:
+        overlaps = diff["overlaps"]
+        lines.append(f"| Overlaps (added / resolved / changed) | {len(overlaps['added'])} / {len(overlaps['removed'])} / {len(overlaps['changed'])} |")
+    lines.append("")
+
+    lines.append("## Affected Sections (再生成が必要なセクション)")
+    lines.append("")
+    if diff["affected_sections"]:
+        lines.append("| Section | Added | Removed | Moved | Restyled | Overlaps |")
+        lines.append("|---------|-------|---------|-------|----------|----------|")
+        for section, counts in diff["affected_sections"].items():
+            lines.append(f"| {section_label(section)} | {counts['added']} | {counts['removed']} | {counts['moved']} | {counts['restyled']} | {counts['overlaps']} |")
+    else:
+        lines.append("変更はありません。")
+    lines.append("")
+
+    for title, items in (("Added", diff["added"]), ("Removed", diff["removed"])):
+        if not items:
+            continue
+        lines.append(f"## {title}")
+        lines.append("")
+        lines.append("| Name | Type | ID | Section | Path |")
+        lines.append("|------|------|----|---------|------|")
+        for item in items:
+            lines.append(f"| {item['name']} | {item['type'] or '-'} | {item['id'] or '-'} | {section_label(item['section'])} | {item['path'] or '-'} |")
+        lines.append("")
+
+    for title, items in (("Moved", diff["moved"]), ("Restyled", diff["restyled"])):
+        if not items:
+            continue
+        lines.append(f"## {title}")
+        lines.append("")
+        lines.append("| Name | ID | Section | Field | Old | New |")
+        lines.append("|------|----|---------|-------|-----|-----|")
+        for item in items:
+            for field, (old_value, new_value) in item["changes"].items():
+                lines.append(f"| {item['name']} | {item['id'] or '-'} | {section_label(item['section'])} | {field} | {format_change(old_value)} | {format_change(new_value)} |")
+        lines.append("")
+
+    if diff["overlaps"] is not None:
+        overlaps = diff["overlaps"]
+        if overlaps["added"] or overlaps["removed"] or overlaps["changed"]:
+            lines.append("## Layout Overlaps (変化)")
+            lines.append("")
+            lines.append("| Status | Kind | Element A | Element B | Section | Old (x, y) | New (x, y) |")
+            lines.append("|--------|------|-----------|-----------|---------|------------|------------|")
+            for item in overlaps["added"]:
+                lines.append(f"| 🆕 added | {item['kind']} | {item['element_a_name']} | {item['element_b_name']} | {section_labels(item)} | - | {item['overlap_x']}, {item['overlap_y']} |")
+            for item in overlaps["removed"]:
+                lines.append(f"| ✅ resolved | {item['kind']} | {item['element_a_name']} | {item['element_b_name']} | {section_labels(item)} | {item['overlap_x']}, {item['overlap_y']} | - |")
+            for item in overlaps["changed"]:
+                old, new = item["old"], item["new"]
+                lines.append(f"| 🔄 changed | {item['kind']} | {item['element_a_name']} | {item['element_b_name']} | {section_labels(item)} | {old['overlap_x']}, {old['overlap_y']} | {new['overlap_x']}, {new['overlap_y']} |")
+            lines.append("")
+
+    return "\n".join(lines)
+
+
+def diff_to_json(diff):
+    """JSON出力用に変換(変更値は [old, new] のリスト、セクションはリスト)"""
+    data = dict(diff)
+    for kind in ("moved", "restyled"):
+        data[kind] = [
+            dict(item, changes={field: [to_plain(old), to_plain(new)] for field, (old, new) in item["changes"].items()})
+            for item in diff[kind]
+        ]
+    data["affected_sections"] = [
+        dict(counts, section_id=section[0] if section else None, section=section_label(section))
+        for section, counts in diff["affected_sections"].items()
+    ]
+    for kind in ("added", "removed", "moved", "restyled"):
+        data[kind] = [dict(item, section=section_label(item["section"])) for item in data[kind]]
+    if diff["overlaps"] is not None:
+        data["overlaps"] = {
+            status: [dict(item, sections=[section_label(section) for section in item["sections"]]) for item in items]
+            for status, items in diff["overlaps"].items()
+        }
+    return data
+
+
+def main():
+    """メイン実行関数"""
+    try:
+        args, flags, options = extract_figma.parse_cli_args(sys.argv[1:], ("--json",), ("--no-overlaps",))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if len(args) not in (2, 3):
+        print("Usage: python3 extract_figma_diff.py <old.json> <new.json> [design_diff.md] [--json=design_diff.json] [--no-overlaps]")
+        sys.exit(1)
+
+    old_file, new_file = args[0], args[1]
+    for input_file in (old_file, new_file):
+        if not os.path.exists(input_file):
+            print(f"Error: File not found: {input_file}")
+            sys.exit(1)
+    output_file = args[2] if len(args) > 2 else Path(new_file).parent / "design_diff.md"
+    overlaps = "--no-overlaps" not in flags
+
+    print(f"Loading whitelist: {extract_figma.WHITELIST_FILE}")
+    whitelist = extract_figma.load_whitelist()
+
+    print(f"Reading (old): {old_file}")
+    old_elements, old_overlaps = extract_snapshot(old_file, whitelist, overlaps)
+    print(f"Reading (new): {new_file}")
+    new_elements, new_overlaps = extract_snapshot(new_file, whitelist, overlaps)
+
+    diff = diff_snapshots(old_elements, new_elements, old_overlaps, new_overlaps)
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(generate_diff_markdown(diff, old_file, new_file))
+    print(f"\n✅ Output: {output_file}")
+
+    if "--json" in options:
+        with open(options["--json"], "w", encoding="utf-8") as f:
+            json.dump(diff_to_json(diff), f, indent=2, ensure_ascii=False)
+        print(f"   JSON: {options['--json']}")
+
+    print(f"   Added: {len(diff['added'])}")
+    print(f"   Removed: {len(diff['removed'])}")
+    print(f"   Moved: {len(diff['moved'])}")
+    print(f"   Restyled: {len(diff['restyled'])}")
+    print(f"   Unchanged: {diff['unchanged']}")
+    if diff["overlaps"] is not None:
+        overlaps_diff = diff["overlaps"]
+        print(f"   🔴 Overlaps: {len(overlaps_diff['added'])} added, {len(overlaps_diff['removed'])} resolved, {len(overlaps_diff['changed'])} changed")
+    if diff["affected_sections"]:
+        print(f"   📦 Affected sections: {', '.join(section_label(section) for section in diff['affected_sections'])}")
+
+
+if __name__ == "__main__":
+    main()
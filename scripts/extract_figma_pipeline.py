@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Figma Pipeline
+==============
+extract_figma.py → extract_figma_structured.py の2段階を1プロセスで実行
+抽出結果はメモリ上のまま構造化処理に渡す(extracted.md は書き込まず、値には extracted.md と同じ丸め・省略を適用する)
+
+機能:
+1. extract_figma.main(return_results=True) で抽出
+2. 抽出結果から直接 DesignSystemExtractor / SectionDetector / StructuredOutputGenerator を実行
+3. --markdown 指定時のみ extracted.md(とサイドカー)も出力
+
+使用方法:
+    python3 extract_figma_pipeline.py <figma-data.json> [output_dir] [--markdown [--sidecar]] [--stream] [--no-overlaps] [--shape-report=shapes.json] [--svg-cache=svg_hash_cache.json] [--geometry=auto|numpy|python] [--workers N] [--split-depth D] [--incremental-cache=extract_cache.sqlite] [--stats=stats.json]
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import extract_figma
+import extract_figma_structured
+
+
+def run_pipeline(input_file, output_dir=None, markdown=False, **extract_options):
+    """抽出と構造化を1プロセスで実行し、構造化ファイルの出力ディレクトリを返す
+
+    extract_options は extract_figma.main() の引数(stream / overlaps / workers など)
+    """
+    output_dir = Path(output_dir) if output_dir else Path(input_file).parent
+    output_dir.mkdir(parents=True, exist_ok=True)
+    extracted_file = output_dir / "extracted.md" if markdown else None
+
+    results, warnings, unknown_props, all_elements = extract_figma.main(
+        return_results=True,
+        input_file_override=input_file,
+        output_file_override=extracted_file,
+        **extract_options,
+    )
+
+    print("\n🚀 Figma Structured Extractor 開始...")
+    print("🔄 抽出結果をメモリ上で受け渡し(丸め・省略は extracted.md と同じ)")
+    parser = extract_figma_structured.parser_from_results(results, all_elements, source=str(input_file))
+    return extract_figma_structured.generate_structured_outputs(parser, output_dir / "structured_output")
+
+
+def main():
+    """メイン実行関数"""
+    try:
+        args, flags, options = extract_figma.parse_cli_args(sys.argv[1:], flag_options=extract_figma.FLAG_OPTIONS + ("--markdown",))
+        extract_options = {
+            "stream": "--stream" in flags,
+            "overlaps": "--no-overlaps" not in flags,
+            "geometry": options.get("--geometry", "auto"),
+            "incremental_cache": options.get("--incremental-cache"),
+            "shape_report": options.get("--shape-report"),
+            "svg_cache": options.get("--svg-cache"),
+            "stats_file": options.get("--stats"),
+            "sidecar": "--sidecar" in flags,
+        }
+        if "--workers" in options:
+            extract_options["workers"] = extract_figma.parse_positive_int("--workers", options["--workers"])
+        if "--split-depth" in options:
+            extract_options["split_depth"] = extract_figma.parse_positive_int("--split-depth", options["--split-depth"])
+        # サイドカーは extracted.md と並べて書き出すため、extracted.md を出力しないときは使えない
+        if extract_options["sidecar"] and "--markdown" not in flags:
+            raise ValueError("--sidecar は --markdown と一緒に指定してください")
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if len(args) not in (1, 2):
+        print("Usage: python3 extract_figma_pipeline.py <figma-data.json> [output_dir] [--markdown [--sidecar]] [--stream] [--no-overlaps] [--shape-report=shapes.json] [--svg-cache=svg_hash_cache.json] [--geometry=auto|numpy|python] [--workers N] [--split-depth D] [--incremental-cache=extract_cache.sqlite] [--stats=stats.json]")
+        sys.exit(1)
+    if extract_options["geometry"] not in extract_figma.GEOMETRY_BACKENDS:
+        print(f"❌ --geometry は {' / '.join(extract_figma.GEOMETRY_BACKENDS)} のいずれかを指定してください")
+        sys.exit(1)
+
+    input_file = args[0]
+    if not os.path.exists(input_file):
+        print(f"Error: File not found: {input_file}")
+        sys.exit(1)
+
+    try:
+        run_pipeline(input_file, args[1] if len(args) > 1 else None, markdown="--markdown" in flags, **extract_options)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
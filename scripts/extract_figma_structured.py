@@ -11,7 +11,10 @@ extracted.md を解析して、関係性を保持したまま構造化された
 4. 関係性保持出力フォーマット
 
 使用方法:
-    python3 extract_figma_structured.py <extracted.md>
+    python3 extract_figma_structured.py <extracted.md> [--sidecar]
+
+    --sidecar: extracted.md と一致するサイドカー(extract_figma.py --sidecar の extracted.jsonl)があれば、
+               extracted.md を解析せずにサイドカーから読み込む(なければ extracted.md を解析する)
 """
 
 import re
@@ -23,6 +26,151 @@ from collections import defaultdict, Counter
 from typing import Dict, List, Tuple, Any, Optional
 import json
 
+from extract_figma import (
+    dynamic_table_keys,
+    format_layout_tree_item,
+    format_value_for_markdown,
+    iter_layout_tree,
+    parse_cli_args,
+)
+from figma_sidecar import read_sidecar, sidecar_path
+from figma_elements import define_element
+
+# extracted.md の各テーブルの1行(extract_figma.py と共通のコンパクトな要素表現)
+ParsedText = define_element("ParsedText", (
+    "characters", "name", "fontSize", "fontWeight", "absoluteX", "absoluteY", "color",
+    "lineHeight", "textAlign", "opacity",
+), "Texts (基本) の1行")
+
+ParsedFrame = define_element("ParsedFrame", (
+    "name", "type", "width", "height", "absoluteX", "absoluteY", "layoutMode", "itemSpacing",
+    "backgroundColor", "cornerRadius",
+), "Frames & Components (基本) の1行")
+
+ParsedRectangle = define_element("ParsedRectangle", (
+    "name", "depth", "parent_id", "absoluteX", "absoluteY", "width", "height", "fill", "stroke",
+    "strokeWeight", "cornerRadius", "layoutPositioning", "scrollBehavior", "blendMode",
+    "strokeAlign", "styles", "constraints", "effects", "interactions", "parent_name",
+    "cornerSmoothing", "is_image", "image_id",
+), "Rectangles の1行")
+
+ParsedVector = define_element("ParsedVector", (
+    "name", "depth", "parent_id", "absoluteX", "absoluteY", "width", "height", "fill", "stroke",
+    "strokeWeight", "strokeCap", "strokeJoin", "layoutPositioning", "scrollBehavior", "blendMode",
+    "strokeAlign", "styles", "constraints", "effects", "isMask", "maskType", "interactions",
+    "parent_name", "rotation", "booleanOperation", "fillOverrideTable",
+), "Vectors (Icons/Lines) の1行")
+
+ParsedLine = define_element("ParsedLine", (
+    "name", "depth", "parent_id", "absoluteX", "absoluteY", "width", "height", "fill", "stroke",
+    "strokeWeight", "layoutPositioning", "scrollBehavior", "rotation", "blendMode", "fillGeometry",
+    "strokeAlign", "strokeGeometry", "constraints", "relativeTransform", "size", "layoutAlign",
+    "layoutGrow", "layoutSizingHorizontal", "layoutSizingVertical", "effects", "interactions",
+    "parent_name",
+), "Lines の1行")
+
+ParsedEllipse = define_element("ParsedEllipse", (
+    "name", "depth", "parent_id", "absoluteX", "absoluteY", "width", "height", "fill", "stroke",
+    "strokeWeight", "layoutPositioning", "scrollBehavior", "blendMode", "fillGeometry",
+    "strokeAlign", "strokeGeometry", "constraints", "relativeTransform", "size", "effects",
+    "arcData", "interactions", "parent_name",
+), "Ellipses の1行")
+
+
+# extracted.md の `## ` 見出し → テーブルの種類
+TABLE_SECTIONS = {
+    "Texts (基本)": "texts",
+    "Frames & Components (基本)": "frames",
+    "Rectangles": "rectangles",
+    "Vectors (Icons/Lines)": "vectors",
+    "Lines": "lines",
+    "Ellipses": "ellipses",
+    "🔴 Layout Overlaps (要素の重なり検出)": "layout_overlaps",
+}
+HIERARCHY_SECTION = "📐 階層構造（Layout Tree）"
+# 動的カラムのテーブル(見出し, results のキー)。extracted.md での出力順
+DYNAMIC_TABLES = (
+    ("Rectangles", "rectangles"),
+    ("Vectors (Icons/Lines)", "vectors"),
+    ("Lines", "lines"),
+    ("Ellipses", "ellipses"),
+)
+HIERARCHY = "hierarchy"
+
+# テーブルヘッダー → フィールド名(記載のないヘッダーはそのままフィールド名として使う)
+HEADER_FIELDS = {
+    "Characters": "characters",
+    "Name": "name",
+    "Type": "type",
+    "Width": "width",
+    "Height": "height",
+    "AbsoluteX": "absoluteX",
+    "AbsoluteY": "absoluteY",
+    "Element A (前面)": "element_a_name",
+    "Element A (装飾)": "element_a_name",
+    "Element A ID": "element_a_id",
+    "Element B (背面)": "element_b_name",
+    "Element B (背景)": "element_b_name",
+    "Element B ID": "element_b_id",
+    "Y軸重なり (px)": "overlap_y",
+    "X軸重なり (px)": "overlap_x",
+    "推奨CSS実装方法": "css_suggestion",
+    "配置方法": "css_suggestion",
+}
+
+# 数値に変換するフィールド(記載のないフィールドは文字列のまま)
+_POSITION_TYPES = {"absoluteX": float, "absoluteY": float, "width": float, "height": float}
+COLUMN_TYPES = {
+    "texts": {"fontSize": float, "fontWeight": int, "absoluteX": float, "absoluteY": float, "lineHeight": float},
+    "frames": dict(_POSITION_TYPES, cornerRadius=float),
+    "rectangles": dict(_POSITION_TYPES, depth=int, strokeWeight=float, cornerRadius=float),
+    "vectors": dict(_POSITION_TYPES, depth=int, strokeWeight=float, rotation=float),
+    "lines": dict(_POSITION_TYPES, depth=int, strokeWeight=float, rotation=float),
+    "ellipses": dict(_POSITION_TYPES, depth=int, strokeWeight=float),
+    "layout_overlaps": {"overlap_y": float, "overlap_x": float},
+}
+
+# 色を表すフィールド(extract_figma.py の PAINT_CACHE の変換結果)
+COLOR_FIELDS = ("color", "backgroundColor", "fill", "stroke")
+
+TABLE_SEPARATOR = re.compile(r'^\|(\s*:?-+:?\s*\|)+\s*$')
+TABLE_CELL_DELIMITER = re.compile(r'(?<!\\)\|')
+HIERARCHY_ITEM = re.compile(r'- (.+?) \(([^)]+)\)')
+
+
+def split_table_row(line: str) -> List[str]:
+    """テーブルの1行をセルに分割(エスケープされた `\\|` はセル内の `|` として扱う)"""
+    inner = line.strip()[1:]
+    if inner.endswith('|') and not inner.endswith('\\|'):
+        inner = inner[:-1]
+    if '\\|' not in inner:
+        return [cell.strip() for cell in inner.split('|')]
+    return [cell.strip().replace('\\|', '|') for cell in TABLE_CELL_DELIMITER.split(inner)]
+
+
+def table_cell(value) -> str:
+    """動的カラムのテーブルのセルの文字列(extracted.md に書き出して解析した場合と同じ値)"""
+    formatted = format_value_for_markdown(value)
+    if formatted is None:
+        return '-'
+    if isinstance(value, str):
+        # extracted.md ではセル内の `|` をエスケープし、解析時に元に戻す
+        return value.replace("\n", " <br> ").strip()
+    return str(formatted).strip()
+
+
+def rounded(value) -> Optional[float]:
+    """基本テーブル(Texts / Frames)と同じく整数に丸めた値(値がない・0 の場合は None)"""
+    return float(round(value)) if value else None
+
+
+def summarize_svg_hashes(names_by_hash: Dict[str, List[str]]) -> List[Dict]:
+    """svgHash → 要素名のリスト から、ハッシュごとの使用数と例を作成"""
+    return [
+        {'hash': svg_hash, 'usage_count': len(names), 'example_names': ', '.join(names[:3])}
+        for svg_hash, names in names_by_hash.items()
+    ]
+
 
 class ExtractedMarkdownParser:
     """extracted.mdファイルを解析するクラス"""
@@ -39,404 +187,242 @@ class ExtractedMarkdownParser:
         self.layout_overlaps = []
         self.svg_hashes = []
         self.hierarchy = {}
+        # 読み込み元(parser_from_results で作成した場合は抽出元の JSON)
+        self.source = file_path
 
     def parse(self):
         """ファイルを解析して各セクションのデータを抽出"""
         with open(self.file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # 各セクションを抽出
-        self._extract_texts(content)
-        self._extract_frames(content)
-        self._extract_rectangles(content)
-        self._extract_vectors(content)
-        self._extract_lines(content)
-        self._extract_ellipses(content)
-        self._extract_layout_overlaps(content)
-        self._extract_svg_hashes(content)
-        self._extract_hierarchy(content)
-
-    def _extract_texts(self, content: str):
-        """テキスト要素を抽出"""
-        # ## Texts (基本) セクションを探す
-        pattern = r'## Texts \(基本\)(.*?)(?=##|$)'
-        match = re.search(pattern, content, re.DOTALL)
-        if not match:
-            return
-
-        section_content = match.group(1)
-        lines = section_content.strip().split('\n')
-
-        # テーブルの解析
-        header_found = False
-        for line in lines:
-            if '|' not in line:
-                continue
-            if 'Characters' in line and 'Name' in line:
-                header_found = True
-                continue
-            if not header_found or '---' in line:
-                continue
-
-            # データ行の解析
-            cols = [col.strip() for col in line.split('|')[1:-1]]
-            if len(cols) >= 9:
-                text_data = {
-                    'characters': cols[0],
-                    'name': cols[1],
-                    'fontSize': self._safe_float(cols[2]),
-                    'fontWeight': self._safe_int(cols[3]),
-                    'absoluteX': self._safe_float(cols[4]),
-                    'absoluteY': self._safe_float(cols[5]),
-                    'color': cols[6],
-                    'lineHeight': self._safe_float(cols[7]),
-                    'textAlign': cols[8],
-                    'opacity': cols[9] if len(cols) > 9 else '-'
-                }
-                self.texts.append(text_data)
-
-    def _extract_frames(self, content: str):
-        """フレーム要素を抽出"""
-        pattern = r'## Frames & Components \(基本\)(.*?)(?=##|$)'
-        match = re.search(pattern, content, re.DOTALL)
-        if not match:
-            return
-
-        section_content = match.group(1)
-        lines = section_content.strip().split('\n')
-
-        header_found = False
-        for line in lines:
-            if '|' not in line:
-                continue
-            if 'Name' in line and 'Type' in line:
-                header_found = True
-                continue
-            if not header_found or '---' in line:
-                continue
-
-            cols = [col.strip() for col in line.split('|')[1:-1]]
-            if len(cols) >= 8:  # 最低限のカラム数に調整
-                frame_data = {
-                    'name': cols[0],
-                    'type': cols[1],
-                    'width': self._safe_float(cols[2]),
-                    'height': self._safe_float(cols[3]),
-                    'absoluteX': self._safe_float(cols[4]),
-                    'absoluteY': self._safe_float(cols[5]),
-                    'layoutMode': cols[6] if len(cols) > 6 else None,
-                    'itemSpacing': cols[7] if len(cols) > 7 else None,
-                    'backgroundColor': cols[8] if len(cols) > 8 and cols[8] != 'None' else None,
-                    'cornerRadius': self._safe_float(cols[9]) if len(cols) > 9 else None
-                }
-                self.frames.append(frame_data)
-
-    def _extract_rectangles(self, content: str):
-        """矩形要素を抽出"""
-        pattern = r'## Rectangles\n\n(.*?)(?=\n## |\n\Z)'
-        match = re.search(pattern, content, re.DOTALL)
-        if not match:
-            return
-
-        section_content = match.group(1)
-        lines = section_content.strip().split('\n')
-
-        header_found = False
-        for line in lines:
-            if '|' not in line:
-                continue
-            if 'name' in line and 'depth' in line:
-                header_found = True
-                continue
-            if not header_found or '---' in line:
-                continue
-
-            cols = [col.strip() for col in line.split('|')[1:-1]]
-            if len(cols) >= 20:  # 最低限必要なカラム数に調整
-                rect_data = {
-                    'name': cols[0],
-                    'depth': self._safe_int(cols[1]),
-                    'parent_id': cols[2],
-                    'absoluteX': self._safe_float(cols[3]),
-                    'absoluteY': self._safe_float(cols[4]),
-                    'width': self._safe_float(cols[5]),
-                    'height': self._safe_float(cols[6]),
-                    'fill': cols[7],
-                    'stroke': cols[8],
-                    'strokeWeight': self._safe_float(cols[9]),
-                    'cornerRadius': self._safe_float(cols[10]) if len(cols) > 10 else None,  # cornerRadius追加
-                    'layoutPositioning': cols[11] if len(cols) > 11 else None,
-                    'scrollBehavior': cols[12] if len(cols) > 12 else None,
-                    'blendMode': cols[13] if len(cols) > 13 else None,
-                    'strokeAlign': cols[14] if len(cols) > 14 else None,
-                    'styles': cols[15] if len(cols) > 15 else None,
-                    'constraints': cols[16] if len(cols) > 16 else None,
-                    'effects': cols[17] if len(cols) > 17 else None,
-                    'interactions': cols[18] if len(cols) > 18 else None,
-                    'parent_name': cols[19] if len(cols) > 19 else None,
-                    'cornerSmoothing': cols[20] if len(cols) > 20 else None  # cornerSmoothing追加
-                }
-
-                # 画像要素（RECTANGLEでnameがimage*）の特別処理
-                if rect_data.get('name', '').startswith('image '):
-                    rect_data['is_image'] = True
-                    rect_data['image_id'] = rect_data.get('name', '').replace('image ', '')
-                else:
-                    rect_data['is_image'] = False
-
-                self.rectangles.append(rect_data)
-
-    def _extract_vectors(self, content: str):
-        """ベクター要素を抽出"""
-        pattern = r'## Vectors \(Icons/Lines\)\n\n(.*?)(?=\n## |\n\Z)'
-        match = re.search(pattern, content, re.DOTALL)
-        if not match:
-            return
-
-        section_content = match.group(1)
-        lines = section_content.strip().split('\n')
+            self.parse_lines(f)
+
+    def load_sidecar(self) -> bool:
+        """extracted.md と一致するサイドカー(extracted.jsonl)があれば読み込む(使えなければ False)"""
+        data = read_sidecar(sidecar_path(self.file_path), markdown_file=self.file_path)
+        if data is None:
+            return False
+        self.load_results(data['results'], data['all_elements'], (data['overlaps'], data['decorative_overlaps']))
+        return True
+
+    def parse_lines(self, lines):
+        """extracted.md の行を1回だけ走査し、`## ` 見出しごとにテーブル/階層構造のデコーダーへ振り分ける
+
+        保持するのは現在のセクション・テーブルヘッダー・階層のパスだけ(ファイル全体は読み込まない)
+        """
+        names_by_hash = defaultdict(list)
+        section = None
+        header = None
+        current_path = []
+        skipped_rows = 0
 
-        header_found = False
         for line in lines:
-            if '|' not in line:
+            line = line.rstrip('\n')
+            if line.startswith('## '):
+                title = line[3:].strip()
+                section = TABLE_SECTIONS.get(title, HIERARCHY if title == HIERARCHY_SECTION else None)
+                header = None
                 continue
-            if 'name' in line and 'depth' in line:
-                header_found = True
+            if section is None:
                 continue
-            if not header_found or '---' in line:
-                continue
-
-            cols = [col.strip() for col in line.split('|')[1:-1]]
-            if len(cols) >= 25:  # 実際のカラム数に合わせて調整
-                vector_data = {
-                    'name': cols[0],
-                    'depth': self._safe_int(cols[1]),
-                    'parent_id': cols[2],
-                    'absoluteX': self._safe_float(cols[3]),
-                    'absoluteY': self._safe_float(cols[4]),
-                    'width': self._safe_float(cols[5]),
-                    'height': self._safe_float(cols[6]),
-                    'fill': cols[7],
-                    'stroke': cols[8],
-                    'strokeWeight': self._safe_float(cols[9]),
-                    'strokeCap': cols[10] if len(cols) > 10 else None,
-                    'strokeJoin': cols[11] if len(cols) > 11 else None,
-                    'layoutPositioning': cols[12] if len(cols) > 12 else None,
-                    'scrollBehavior': cols[13] if len(cols) > 13 else None,
-                    'blendMode': cols[14] if len(cols) > 14 else None,
-                    'strokeAlign': cols[15] if len(cols) > 15 else None,
-                    'styles': cols[16] if len(cols) > 16 else None,
-                    'constraints': cols[17] if len(cols) > 17 else None,
-                    'effects': cols[18] if len(cols) > 18 else None,
-                    'isMask': cols[19] if len(cols) > 19 else None,
-                    'maskType': cols[20] if len(cols) > 20 else None,
-                    'interactions': cols[21] if len(cols) > 21 else None,
-                    'parent_name': cols[22] if len(cols) > 22 else None,
-                    'rotation': self._safe_float(cols[23]) if len(cols) > 23 else None,
-                    'booleanOperation': cols[24] if len(cols) > 24 else None,
-                    'fillOverrideTable': cols[25] if len(cols) > 25 else None
-                }
-                self.vectors.append(vector_data)
 
-    def _extract_lines(self, content: str):
-        """線要素を抽出"""
-        pattern = r'## Lines\n\n(.*?)(?=\n## |\n\Z)'
-        match = re.search(pattern, content, re.DOTALL)
-        if not match:
-            return
-
-        section_content = match.group(1)
-        lines = section_content.strip().split('\n')
-
-        header_found = False
-        for line in lines:
-            if '|' not in line:
+            if section == HIERARCHY:
+                self._add_hierarchy_line(line, current_path)
                 continue
-            if 'name' in line and 'depth' in line:
-                header_found = True
-                continue
-            if not header_found or '---' in line:
-                continue
-
-            cols = [col.strip() for col in line.split('|')[1:-1]]
-            if len(cols) >= 27:
-                line_data = {
-                    'name': cols[0],
-                    'depth': self._safe_int(cols[1]),
-                    'parent_id': cols[2],
-                    'absoluteX': self._safe_float(cols[3]),
-                    'absoluteY': self._safe_float(cols[4]),
-                    'width': self._safe_float(cols[5]),
-                    'height': self._safe_float(cols[6]),
-                    'fill': cols[7],
-                    'stroke': cols[8],
-                    'strokeWeight': self._safe_float(cols[9]),
-                    'layoutPositioning': cols[10],
-                    'scrollBehavior': cols[11],
-                    'rotation': self._safe_float(cols[12]),
-                    'blendMode': cols[13],
-                    'fillGeometry': cols[14],
-                    'strokeAlign': cols[15],
-                    'strokeGeometry': cols[16],
-                    'constraints': cols[17],
-                    'relativeTransform': cols[18],
-                    'size': cols[19],
-                    'layoutAlign': cols[20],
-                    'layoutGrow': cols[21],
-                    'layoutSizingHorizontal': cols[22],
-                    'layoutSizingVertical': cols[23],
-                    'effects': cols[24],
-                    'interactions': cols[25],
-                    'parent_name': cols[26]
-                }
-                self.lines.append(line_data)
-
-    def _extract_ellipses(self, content: str):
-        """楕円要素を抽出"""
-        pattern = r'## Ellipses\n\n(.*?)(?=\n## |\n\Z)'
-        match = re.search(pattern, content, re.DOTALL)
-        if not match:
-            return
-
-        section_content = match.group(1)
-        lines = section_content.strip().split('\n')
 
-        header_found = False
-        for line in lines:
-            if '|' not in line:
-                continue
-            if 'name' in line and 'depth' in line:
-                header_found = True
+            if not line.startswith('|'):
+                # テーブルの終わり(### 小見出しの後に別のテーブルが続く場合がある)
+                header = None
                 continue
-            if not header_found or '---' in line:
-                continue
-
-            cols = [col.strip() for col in line.split('|')[1:-1]]
-            if len(cols) >= 23:
-                ellipse_data = {
-                    'name': cols[0],
-                    'depth': self._safe_int(cols[1]),
-                    'parent_id': cols[2],
-                    'absoluteX': self._safe_float(cols[3]),
-                    'absoluteY': self._safe_float(cols[4]),
-                    'width': self._safe_float(cols[5]),
-                    'height': self._safe_float(cols[6]),
-                    'fill': cols[7],
-                    'stroke': cols[8],
-                    'strokeWeight': self._safe_float(cols[9]),
-                    'layoutPositioning': cols[10],
-                    'scrollBehavior': cols[11],
-                    'blendMode': cols[12],
-                    'fillGeometry': cols[13],
-                    'strokeAlign': cols[14],
-                    'strokeGeometry': cols[15],
-                    'constraints': cols[16],
-                    'relativeTransform': cols[17],
-                    'size': cols[18],
-                    'effects': cols[19],
-                    'arcData': cols[20],
-                    'interactions': cols[21],
-                    'parent_name': cols[22]
-                }
-                self.ellipses.append(ellipse_data)
-
-    def _extract_layout_overlaps(self, content: str):
-        """Layout Overlaps セクション抽出"""
-        pattern = r'## Layout Overlaps \(要素の重なり検出と推奨CSS提案\)\n\n(.*?)(?=\n## |\n\Z)'
-        match = re.search(pattern, content, re.DOTALL)
-        if not match:
-            return
-
-        section_content = match.group(1)
-        lines = section_content.strip().split('\n')
-
-        header_found = False
-        for line in lines:
-            if '|' not in line:
+            cells = split_table_row(line)
+            if header is None:
+                header = [HEADER_FIELDS.get(cell, cell) for cell in cells]
                 continue
-            if 'Parent' in line and 'Child' in line:
-                header_found = True
+            if TABLE_SEPARATOR.match(line):
                 continue
-            if not header_found or '---' in line:
+            if len(cells) != len(header):
+                skipped_rows += 1
                 continue
 
-            cols = [col.strip() for col in line.split('|')[1:-1]]
-            if len(cols) >= 6:
-                overlap_data = {
-                    'parent': cols[0],
-                    'parent_id': cols[1],
-                    'child': cols[2],
-                    'child_id': cols[3],
-                    'overlap_y': self._safe_float(cols[4]),
-                    'overlap_height': self._safe_float(cols[5]),
-                    'css_suggestion': cols[6] if len(cols) > 6 else ''
-                }
-                self.layout_overlaps.append(overlap_data)
-
-    def _extract_svg_hashes(self, content: str):
-        """SVG hashes セクション抽出"""
-        pattern = r'## SVG hashes \(アイコン識別用\)\n\n(.*?)(?=\n## |\n\Z)'
-        match = re.search(pattern, content, re.DOTALL)
-        if not match:
+            row = dict(zip(header, cells))
+            self._add_row(section, row)
+            if section == 'vectors' and row.get('svgHash', '-') != '-':
+                names_by_hash[row['svgHash']].append(row.get('name', ''))
+
+        self.svg_hashes = summarize_svg_hashes(names_by_hash)
+        if skipped_rows:
+            print(f"⚠️ カラム数がヘッダーと一致しない行をスキップしました: {skipped_rows}行")
+
+    def _add_row(self, section: str, row: Dict[str, str]):
+        """テーブルの1行(ヘッダー名 → セルの文字列)を型変換して追加"""
+        for field, convert in COLUMN_TYPES.get(section, {}).items():
+            if field in row:
+                row[field] = self._safe_float(row[field]) if convert is float else self._safe_int(row[field])
+        self._append_row(section, row)
+
+    def _append_row(self, section: str, row: Dict[str, Any]):
+        """型変換済みのテーブルの1行を追加"""
+        # 色は少数の値が繰り返し現れるため、同じ文字列オブジェクトを共有する
+        for field in COLOR_FIELDS:
+            if isinstance(row.get(field), str):
+                row[field] = sys.intern(row[field])
+
+        if section == 'texts':
+            self.texts.append(ParsedText.from_dict(row))
+        elif section == 'frames':
+            if row.get('backgroundColor') == 'None':
+                row['backgroundColor'] = None
+            self.frames.append(ParsedFrame.from_dict(row))
+        elif section == 'rectangles':
+            # 画像要素（RECTANGLEでnameがimage*）の特別処理
+            row['is_image'] = row.get('name', '').startswith('image ')
+            if row['is_image']:
+                row['image_id'] = row['name'].replace('image ', '')
+            self.rectangles.append(ParsedRectangle.from_dict(row))
+        elif section == 'vectors':
+            self.vectors.append(ParsedVector.from_dict(row))
+        elif section == 'lines':
+            self.lines.append(ParsedLine.from_dict(row))
+        elif section == 'ellipses':
+            self.ellipses.append(ParsedEllipse.from_dict(row))
+        elif section == 'layout_overlaps':
+            self.layout_overlaps.append(row)
+
+    def _add_hierarchy_line(self, line: str, current_path: List[str]):
+        """Layout Tree の1行を階層構造に追加(current_path はその時点のパス)"""
+        if not line.strip():
             return
 
-        section_content = match.group(1)
-        lines = section_content.strip().split('\n')
-
-        header_found = False
-        for line in lines:
-            if '|' not in line:
-                continue
-            if 'Hash' in line and 'Usage Count' in line:
-                header_found = True
+        # インデントレベルを計算
+        indent_level = (len(line) - len(line.lstrip())) // 2
+
+        # 要素名を抽出 ("- element_name (TYPE)" 形式)
+        element_match = HIERARCHY_ITEM.search(line)
+        if element_match:
+            name = element_match.group(1)
+            element_type = element_match.group(2)
+
+            # パスを調整
+            del current_path[indent_level:]
+            current_path.append(name)
+
+            self.hierarchy['/'.join(current_path)] = {
+                'name': name,
+                'type': element_type,
+                'level': indent_level,
+                'parent': '/'.join(current_path[:-1]) if len(current_path) > 1 else None,
+                'raw_line': line.strip()
+            }
+
+    def load_results(self, results: Dict, all_elements: List, overlap_results: Tuple[List, List]):
+        """extract_figma.py の抽出結果(results / all_elements / 重なり検出結果)から各データを直接設定
+
+        extracted.md の行は作らないが、値には extracted.md と同じ丸め・省略・型変換を適用する
+        (構造化出力は extracted.md を解析した場合と一致する)。ただし extracted.md の行を壊すセル
+        (`|` や改行を含む名前など)は、解析ではその行がスキップされるが、ここではそのまま読み込む
+        """
+        for t in results['texts']:
+            self._append_row('texts', self._text_row(t))
+        for f in results['frames']:
+            self._append_row('frames', self._frame_row(f))
+
+        names_by_hash = defaultdict(list)
+        for _, section in DYNAMIC_TABLES:
+            items = results[section]
+            if not items:
                 continue
-            if not header_found or '---' in line:
-                continue
-
-            cols = [col.strip() for col in line.split('|')[1:-1]]
-            if len(cols) >= 3:
-                svg_data = {
-                    'hash': cols[0],
-                    'usage_count': self._safe_int(cols[1]),
-                    'example_names': cols[2]
-                }
-                self.svg_hashes.append(svg_data)
-
-    def _extract_hierarchy(self, content: str):
-        """階層構造を抽出"""
-        pattern = r'## 📐 階層構造（Layout Tree）\n\n(.*?)(?=\n## |\n\Z)'
-        match = re.search(pattern, content, re.DOTALL)
-        if not match:
-            return
-
-        section_content = match.group(1)
-        lines = section_content.strip().split('\n')
+            keys = dynamic_table_keys(items)
+            fields = [HEADER_FIELDS.get(key, key) for key in keys]
+            types = COLUMN_TYPES[section]
+            for item in items:
+                row = {}
+                for key, field in zip(keys, fields):
+                    convert = types.get(field)
+                    value = item.get(key)
+                    row[field] = table_cell(value) if convert is None else self._convert_value(value, convert)
+                self._append_row(section, row)
+                if section == 'vectors' and row.get('svgHash', '-') != '-':
+                    names_by_hash[row['svgHash']].append(row.get('name', ''))
+        self.svg_hashes = summarize_svg_hashes(names_by_hash)
+
+        if all_elements:
+            overlaps, decorative_overlaps = overlap_results
+            for overlap in overlaps:
+                self._append_row('layout_overlaps', self._overlap_row(overlap, True))
+            for overlap in decorative_overlaps:
+                self._append_row('layout_overlaps', self._overlap_row(overlap, False))
 
         current_path = []
-        for line in lines:
-            if not line.strip():
-                continue
+        for elem, indent in iter_layout_tree(all_elements):
+            name = elem.get('name', 'Unknown')
+            element_type = elem.get('type', 'Unknown')
+            del current_path[indent:]
+            current_path.append(name)
+            self.hierarchy['/'.join(current_path)] = {
+                'name': name,
+                'type': 'Text' if element_type == 'TEXT' else element_type,
+                'level': indent,
+                'parent': '/'.join(current_path[:-1]) if len(current_path) > 1 else None,
+                'raw_line': format_layout_tree_item(elem).strip()
+            }
+
+    def _text_row(self, t: Dict) -> Dict[str, Any]:
+        """Texts (基本) の1行(extract_figma.iter_texts_table と同じ丸め・省略)"""
+        chars = t['characters'][:50] + "..." if len(t['characters']) > 50 else t['characters']
+        font_weight = t['fontWeight']
+        line_height = t.get('lineHeight')
+        opacity = t.get('opacity', 1)
+        return {
+            'characters': chars.strip(),
+            'name': str(t['name']).strip(),
+            'fontSize': rounded(t['fontSize']),
+            # 整数以外の fontWeight は extracted.md の解析でも読み取れない
+            'fontWeight': font_weight if isinstance(font_weight, int) and font_weight else None,
+            'absoluteX': rounded(t.get('absoluteX')),
+            'absoluteY': rounded(t.get('absoluteY')),
+            'color': str(t['color']),
+            'lineHeight': float(round(line_height)) if line_height is not None else None,
+            'textAlign': str(t.get('textAlign', '-')),
+            'opacity': str(round(opacity, 1)) if opacity != 1 else '-',
+        }
 
-            # インデントレベルを計算
-            indent_level = (len(line) - len(line.lstrip())) // 2
-
-            # 要素名を抽出 ("- element_name (TYPE)" 形式)
-            element_match = re.search(r'- (.+?) \(([^)]+)\)', line)
-            if element_match:
-                name = element_match.group(1)
-                element_type = element_match.group(2)
-
-                # パスを調整
-                current_path = current_path[:indent_level]
-                current_path.append(name)
-
-                self.hierarchy['/'.join(current_path)] = {
-                    'name': name,
-                    'type': element_type,
-                    'level': indent_level,
-                    'parent': '/'.join(current_path[:-1]) if len(current_path) > 1 else None,
-                    'raw_line': line.strip()
-                }
+    def _frame_row(self, f: Dict) -> Dict[str, Any]:
+        """Frames & Components (基本) の1行(extract_figma.iter_frames_table と同じ丸め)"""
+        return {
+            'name': str(f['name']).strip(),
+            'type': str(f['type']),
+            'width': rounded(f['width']),
+            'height': rounded(f['height']),
+            'absoluteX': rounded(f.get('absoluteX')),
+            'absoluteY': rounded(f.get('absoluteY')),
+            'layoutMode': str(f['layoutMode']),
+            'itemSpacing': str(round(f['itemSpacing'])) if f['itemSpacing'] else '-',
+            'backgroundColor': str(f['backgroundColor']),
+            'cornerRadius': rounded(f['cornerRadius']),
+        }
+
+    def _overlap_row(self, overlap: Dict, with_distance: bool) -> Dict[str, Any]:
+        """Layout Overlaps の1行(装飾要素の重なりには重なり量の列がない)"""
+        row = {
+            'element_a_name': str(overlap['element_a_name']).strip(),
+            'element_a_id': str(overlap['element_a_id']).strip(),
+            'element_b_name': str(overlap['element_b_name']).strip(),
+            'element_b_id': str(overlap['element_b_id']).strip(),
+        }
+        if with_distance:
+            row['overlap_y'] = self._convert_value(overlap['overlap_y'], float)
+            row['overlap_x'] = self._convert_value(overlap['overlap_x'], float)
+        row['css_suggestion'] = str(overlap['css_suggestion']).strip()
+        return row
+
+    def _convert_value(self, value: Any, convert: type) -> Optional[float]:
+        """COLUMN_TYPES の型に変換(extracted.md のセルを _add_row で変換した場合と同じ値)"""
+        if isinstance(value, str):
+            cell = table_cell(value)
+            return self._safe_float(cell) if convert is float else self._safe_int(cell)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        if convert is float:
+            return float(value)
+        return value if isinstance(value, int) else None
 
     def _safe_float(self, value: str) -> Optional[float]:
         """文字列を安全にfloatに変換"""
@@ -505,15 +491,11 @@ class DesignSystemExtractor:
 
     def extract_color_system(self) -> Dict:
         """カラーシステムを抽出"""
-        colors = defaultdict(int)
-
-        for text in self.parser.texts:
-            if text.get('color'):
-                colors[text['color']] += 1
-
-        for frame in self.parser.frames:
-            if frame.get('backgroundColor') and frame['backgroundColor'] != 'None':
-                colors[frame['backgroundColor']] += 1
+        colors = Counter(text['color'] for text in self.parser.texts if text.get('color'))
+        colors.update(
+            frame['backgroundColor'] for frame in self.parser.frames
+            if frame.get('backgroundColor') and frame['backgroundColor'] != 'None'
+        )
 
         # 使用回数順でソート
         color_system = {}
@@ -856,83 +838,111 @@ class StructuredOutputGenerator:
         return "\n".join(lines)
 
 
-def main():
-    """メイン実行関数"""
-    if len(sys.argv) != 2:
-        print("Usage: python3 extract_figma_structured.py <extracted.md>")
-        sys.exit(1)
+def parser_from_results(results, all_elements, source="(in-memory)"):
+    """extract_figma.main(return_results=True) の結果から、extracted.md を経由せずにパーサーを作成"""
+    parser = ExtractedMarkdownParser(source)
+    parser.load_results(results, all_elements, (results.get('overlaps', []), results.get('decorative_overlaps', [])))
+    return parser
+
+
+def generate_structured_outputs(parser, output_dir):
+    """解析済みのデータから構造化ファイルを生成し、出力ディレクトリを返す"""
+    print(f"   テキスト: {len(parser.texts)}")
+    print(f"   フレーム: {len(parser.frames)}")
+    print(f"   階層要素: {len(parser.hierarchy)}")
+
+    # 2. デザインシステム抽出
+    print("🎨 デザインシステム抽出中...")
+    design_extractor = DesignSystemExtractor(parser)
+    design_system = {
+        'typography': design_extractor.extract_typography_system(),
+        'layouts': design_extractor.extract_layout_system(),
+        'colors': design_extractor.extract_color_system()
+    }
+
+    # 3. セクション検出
+    print("📊 セクション検出中...")
+    section_detector = SectionDetector(parser)
+    sections = section_detector.detect_sections_by_coordinates()
+
+    # 4. 出力ディレクトリ作成
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"📁 出力先: {output_dir}")
+
+    # 5. 構造化ファイル生成
+    print("📝 構造化ファイル生成中...")
+    generator = StructuredOutputGenerator(parser, design_system, sections)
+
+    # デザインシステムファイル
+    design_system_content = generator.generate_design_system_file()
+    (output_dir / "design_system.md").write_text(design_system_content, encoding="utf-8")
+    print("✅ design_system.md")
+
+    # セクション別ファイル
+    sections_content = generator.generate_sections_file()
+    (output_dir / "structured_sections.md").write_text(sections_content, encoding="utf-8")
+    print("✅ structured_sections.md")
+
+    # 関係性マップ
+    relationship_content = generator.generate_relationship_map()
+    (output_dir / "relationship_map.md").write_text(relationship_content, encoding="utf-8")
+    print("✅ relationship_map.md")
+
+    print("\n🎉 Structured Extraction 完了!")
+    print(f"   検出セクション数: {len(sections)}")
+    print(f"   デザインパターン: {len(design_system['typography']) + len(design_system['layouts'])}")
+    print(f"   階層要素数: {len(parser.hierarchy)}")
+
+    # ファイルサイズ表示
+    for filename in ["design_system.md", "structured_sections.md", "relationship_map.md"]:
+        filepath = output_dir / filename
+        if filepath.exists():
+            size = filepath.stat().st_size
+            print(f"     {filename}: {size:,} bytes")
+
+    return output_dir
 
-    input_file = sys.argv[1]
-    if not os.path.exists(input_file):
-        print(f"Error: File not found: {input_file}")
-        sys.exit(1)
 
+def run_structured_extraction(input_file, sidecar=False):
+    """extracted.md から構造化ファイルを生成し、出力ディレクトリを返す(バッチ処理からも呼び出す)
+
+    sidecar=True の場合、extracted.md と一致するサイドカーがあればそちらから読み込む
+    """
     print("🚀 Figma Structured Extractor 開始...")
     print(f"📄 Input: {input_file}")
 
-    try:
-        # 1. extracted.md を解析
+    # 1. extracted.md を解析(サイドカーを使える場合は解析しない)
+    parser = ExtractedMarkdownParser(input_file)
+    if sidecar and parser.load_sidecar():
+        print(f"🔄 サイドカーから読み込み: {sidecar_path(input_file)}")
+    else:
         print("🔄 extracted.md 解析中...")
-        parser = ExtractedMarkdownParser(input_file)
         parser.parse()
 
-        print(f"✅ 解析完了")
-        print(f"   テキスト: {len(parser.texts)}")
-        print(f"   フレーム: {len(parser.frames)}")
-        print(f"   階層要素: {len(parser.hierarchy)}")
-
-        # 2. デザインシステム抽出
-        print("🎨 デザインシステム抽出中...")
-        design_extractor = DesignSystemExtractor(parser)
-        design_system = {
-            'typography': design_extractor.extract_typography_system(),
-            'layouts': design_extractor.extract_layout_system(),
-            'colors': design_extractor.extract_color_system()
-        }
+    print(f"✅ 解析完了 ({Path(parser.source).name})")
+    return generate_structured_outputs(parser, Path(input_file).parent / "structured_output")
+
+
+def main():
+    """メイン実行関数"""
+    try:
+        args, flags, _ = parse_cli_args(sys.argv[1:], value_options=(), flag_options=("--sidecar",))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if len(args) != 1:
+        print("Usage: python3 extract_figma_structured.py <extracted.md> [--sidecar]")
+        sys.exit(1)
 
-        # 3. セクション検出
-        print("📊 セクション検出中...")
-        section_detector = SectionDetector(parser)
-        sections = section_detector.detect_sections_by_coordinates()
-
-        # 4. 出力ディレクトリ作成
-        input_path = Path(input_file)
-        output_dir = input_path.parent / "structured_output"
-        output_dir.mkdir(exist_ok=True)
-
-        print(f"📁 出力先: {output_dir}")
-
-        # 5. 構造化ファイル生成
-        print("📝 構造化ファイル生成中...")
-        generator = StructuredOutputGenerator(parser, design_system, sections)
-
-        # デザインシステムファイル
-        design_system_content = generator.generate_design_system_file()
-        (output_dir / "design_system.md").write_text(design_system_content, encoding="utf-8")
-        print("✅ design_system.md")
-
-        # セクション別ファイル
-        sections_content = generator.generate_sections_file()
-        (output_dir / "structured_sections.md").write_text(sections_content, encoding="utf-8")
-        print("✅ structured_sections.md")
-
-        # 関係性マップ
-        relationship_content = generator.generate_relationship_map()
-        (output_dir / "relationship_map.md").write_text(relationship_content, encoding="utf-8")
-        print("✅ relationship_map.md")
-
-        print("\n🎉 Structured Extraction 完了!")
-        print(f"   検出セクション数: {len(sections)}")
-        print(f"   デザインパターン: {len(design_system['typography']) + len(design_system['layouts'])}")
-        print(f"   階層要素数: {len(parser.hierarchy)}")
-
-        # ファイルサイズ表示
-        for filename in ["design_system.md", "structured_sections.md", "relationship_map.md"]:
-            filepath = output_dir / filename
-            if filepath.exists():
-                size = filepath.stat().st_size
-                print(f"     {filename}: {size:,} bytes")
+    input_file = args[0]
+    if not os.path.exists(input_file):
+        print(f"Error: File not found: {input_file}")
+        sys.exit(1)
 
+    try:
+        run_structured_extraction(input_file, sidecar="--sidecar" in flags)
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
@@ -941,4 +951,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Figma Elements
+==============
+抽出した要素のコンパクトな表現(extract_figma.py / extract_figma_structured.py 共通)
+
+構成:
+1. CompactElement: キー構成(要素間で共有)+ 値のタプルだけを持つ __slots__ クラス
+2. Element: フィールドが決まっている要素の基底(値が None のフィールドは保持しない)
+3. TextElement / FrameElement / DecorativeElement: extract_figma.py の固定カラムの要素
+4. DynamicElement: ホワイトリストでキーが決まる要素(矩形・ベクター等)
+5. define_element(): 任意のフィールド構成の Element サブクラスを作る
+6. NodePath: 親への参照 + 自分の名前だけを持つパス(文字列は必要になったときに組み立てる)
+
+どの要素も dict と同じ読み出しAPI(get / [] / in / keys / items)を持つため、
+既存の dict 前提のコードはそのまま動く。JSON化などで dict が必要な場合は to_dict() を使う。
+
+使用方法:
+    text = TextElement(id="1:2", name="Title", characters="Hello")
+    text.get("fontSize")  # → None(フィールドとしては存在する)
+    rect = DynamicElement({"name": "bg", "width": 100})
+"""
+
+import sys
+from collections.abc import Mapping
+
+
+class _Shape:
+    """要素のキー構成(同じ構成の要素間で共有)"""
+
+    __slots__ = ("keys", "index", "owner")
+
+    def __init__(self, keys, owner):
+        self.keys = keys
+        self.index = {key: i for i, key in enumerate(keys)}
+        # このキー構成を登録した要素クラス(pickle から戻すときに同じ共有オブジェクトを引くため)
+        self.owner = owner
+
+    def __reduce__(self):
+        return (_restore_shape, (self.owner, self.keys))
+
+
+def _restore_shape(owner, keys):
+    return owner._get_shape(keys)
+
+
+class CompactElement(Mapping):
+    """キー構成 + 値のタプルで要素を保持する基底クラス
+
+    キー構成(_Shape)はクラスごとに共有し、要素ごとに持つのは値のタプルだけ。
+    pickle では同じキー構成は1回だけ書き込まれ、要素は __slots__ の値として C 実装のまま復元される
+    """
+
+    __slots__ = ("_shape", "_values")
+    _shapes = {}
+
+    @classmethod
+    def _get_shape(cls, keys):
+        shape = cls._shapes.get(keys)
+        if shape is None:
+            cls._check_keys(keys)
+            shape = cls._shapes[keys] = _Shape(keys, cls)
+        return shape
+
+    @classmethod
+    def _check_keys(cls, keys):
+        """新しいキー構成の検証(サブクラスで上書き)"""
+
+    def __getitem__(self, key):
+        i = self._shape.index.get(key)
+        if i is None:
+            raise KeyError(key)
+        return self._values[i]
+
+    def get(self, key, default=None):
+        i = self._shape.index.get(key)
+        if i is None:
+            return default
+        return self._values[i]
+
+    def __contains__(self, key):
+        return key in self._shape.index
+
+    def __iter__(self):
+        return iter(self._shape.keys)
+
+    def __len__(self):
+        return len(self._values)
+
+    def keys(self):
+        return self._shape.keys
+
+    def _set(self, key, value):
+        """値を設定(キーがなければ末尾に追加)"""
+        i = self._shape.index.get(key)
+        if i is None:
+            self._shape = self._get_shape(self._shape.keys + (key,))
+            self._values = self._values + (value,)
+        else:
+            self._values = self._values[:i] + (value,) + self._values[i + 1:]
+
+    def _delete(self, key):
+        """値を削除"""
+        i = self._shape.index.get(key)
+        if i is not None:
+            keys = self._shape.keys
+            self._shape = self._get_shape(keys[:i] + keys[i + 1:])
+            self._values = self._values[:i] + self._values[i + 1:]
+
+    def to_dict(self):
+        """通常の dict に変換"""
+        return dict(self.items())
+
+    def to_compact_dict(self):
+        """保持している値だけの dict に変換(Element では None のフィールドを含まない)"""
+        return dict(zip(self._shape.keys, self._values))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Element(CompactElement):
+    """フィールド固定の要素の基底クラス
+
+    値が None のフィールドは保持しないが、FIELDS に含まれるキーは常に「存在する」扱いで
+    None を返す(dict で値が None のキーと同じ)。keys() の順序は FIELDS の順
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+    _FIELD_SET = frozenset()
+
+    def __init__(self, **fields):
+        keys = tuple(key for key, value in fields.items() if value is not None)
+        self._shape = self._get_shape(keys)
+        self._values = tuple(value for value in fields.values() if value is not None)
+
+    @classmethod
+    def from_dict(cls, data):
+        """dict から要素を作成(FIELDS にないキーは無視)"""
+        field_set = cls._FIELD_SET
+        return cls(**{key: value for key, value in data.items() if key in field_set})
+
+    @classmethod
+    def _check_keys(cls, keys):
+        unknown = [key for key in keys if key not in cls._FIELD_SET]
+        if unknown:
+            raise TypeError(f"{cls.__name__} has no field '{unknown[0]}'")
+
+    def __getitem__(self, key):
+        i = self._shape.index.get(key)
+        if i is not None:
+            return self._values[i]
+        if key in self._FIELD_SET:
+            return None
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._FIELD_SET:
+            raise KeyError(f"{type(self).__name__} has no field '{key}'")
+        if value is None:
+            self._delete(key)
+        else:
+            self._set(key, value)
+
+    def get(self, key, default=None):
+        i = self._shape.index.get(key)
+        if i is not None:
+            return self._values[i]
+        if key in self._FIELD_SET:
+            return None
+        return default
+
+    def __contains__(self, key):
+        return key in self._FIELD_SET
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def keys(self):
+        return self.FIELDS
+
+
+def define_element(name, fields, doc=None, module=None):
+    """フィールド構成から Element のサブクラスを作成
+
+    module は pickle(並列抽出でのプロセス間受け渡し)で参照されるモジュール名。省略時は呼び出し元
+    """
+    fields = tuple(fields)
+    if module is None:
+        module = sys._getframe(1).f_globals.get("__name__", __name__)
+    return type(name, (Element,), {
+        "__module__": module,
+        "__slots__": (),
+        "__doc__": doc or f"{name}({', '.join(fields)})",
+        "FIELDS": fields,
+        "_FIELD_SET": frozenset(fields),
+        "_shapes": {},
+    })
+
+
+TextElement = define_element("TextElement", (
+    "id", "name", "type", "path", "depth", "parent_id", "parent_name",
+    "absoluteX", "absoluteY", "characters", "fontSize", "fontWeight", "fontFamily",
+    "lineHeight", "lineHeightUnit", "letterSpacing", "textAlign", "color", "opacity",
+    "width", "height", "hyperlink", "hasMixedStyles", "layoutAlign", "layoutGrow",
+    "layoutSizingHorizontal", "layoutSizingVertical", "layoutPositioning", "visible", "blendMode",
+), "テキスト要素")
+
+FrameElement = define_element("FrameElement", (
+    "id", "name", "type", "path", "depth", "parent_id", "parent_name",
+    "absoluteX", "absoluteY", "width", "height", "x", "y",
+    "paddingTop", "paddingRight", "paddingBottom", "paddingLeft",
+    "itemSpacing", "counterAxisSpacing", "cornerRadius", "rectangleCornerRadii",
+    "backgroundColor", "borderColor", "strokeWeight", "layoutMode", "layoutWrap",
+    "overflowDirection", "overflowScrolling", "primaryAxisAlignItems", "counterAxisAlignItems",
+    "counterAxisAlignContent", "layoutSizingHorizontal", "layoutSizingVertical",
+    "primaryAxisSizingMode", "counterAxisSizingMode", "minWidth", "maxWidth", "minHeight", "maxHeight",
+    "layoutAlign", "layoutGrow", "layoutPositioning", "visible", "clipsContent", "strokeAlign",
+    "individualStrokeWeights", "constraints", "cornerSmoothing", "blendMode", "opacity",
+    "effects", "componentProperties", "overrides", "exportSettings",
+), "フレーム/コンポーネント要素")
+
+DecorativeElement = define_element("DecorativeElement", (
+    "name", "path", "depth", "parent_id", "type", "height", "width", "color", "strokeWeight",
+    "parent_name", "parent_path", "parent_gap", "css_gap", "css_bottom",
+), "装飾要素(擬似要素候補)")
+
+
+class DynamicElement(CompactElement):
+    """キーが要素ごとに異なる要素(ホワイトリストで抽出した矩形・ベクター等)
+
+    値が None のキーも保持し、キーの順序は元の dict と同じ(動的テーブルのカラム順に使われる)
+    """
+
+    __slots__ = ()
+    _shapes = {}
+
+    def __init__(self, fields):
+        self._shape = self._get_shape(tuple(fields))
+        self._values = tuple(fields.values())
+
+    def __setitem__(self, key, value):
+        self._set(key, value)
+
+
+class NodePath:
+    """要素のパス("親/子/孫")を親の NodePath への参照と自分の名前で表す
+
+    要素ごとに完全なパス文字列を持つと深さに比例したメモリ・時間がかかるため、
+    文字列は str() / Markdown 出力などで必要になったときだけ組み立てる(キャッシュしない)。
+    ハッシュは作成時に親のハッシュと名前から1回だけ計算し、比較は名前と親を順にたどって行う
+    (どちらも文字列を組み立てない。文字列とは等しくならない)
+    """
+
+    __slots__ = ("parent", "name", "_hash")
+
+    def __init__(self, parent, name):
+        # parent: NodePath / 文字列のパス(走査の起点に指定された場合)/ None(ルート)
+        self.parent = parent or None
+        self.name = name
+        self._hash = hash((self.parent, name))
+
+    def __str__(self):
+        names = []
+        node = self
+        while isinstance(node, NodePath):
+            names.append(node.name)
+            node = node.parent
+        if node is not None:
+            names.append(node)
+        names.reverse()
+        return "/".join(names)
+
+    def __repr__(self):
+        return f"NodePath({str(self)!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, NodePath):
+            return NotImplemented
+        node = self
+        while isinstance(node, NodePath) and isinstance(other, NodePath):
+            if node is other:
+                return True
+            if node._hash != other._hash or node.name != other.name:
+                return False
+            node = node.parent
+            other = other.parent
+        return node == other
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (NodePath, (self.parent, self.name))
+
+
+def to_plain(value):
+    """要素(およびそのリスト・dict)を通常の dict / list に変換(JSON出力用)"""
+    if isinstance(value, CompactElement):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, NodePath):
+        return str(value)
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    return value
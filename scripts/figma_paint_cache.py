@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Figma Paint Cache
+=================
+fills / strokes / effects の CSS 変換結果のキャッシュ
+
+同じ塗り・線・エフェクトは数万ノードで繰り返し使われるため、値(キー順を保ったシリアライズ)を
+キーにして変換は1回だけ行い、以降は同じ(intern 済みの)文字列オブジェクトを返す
+
+使用方法:
+    cache = PaintCache()
+    css = cache.convert("fills", node["fills"], convert_fills)
+    print(cache.hit_rate())
+"""
+
+import marshal
+import sys
+
+
+# 参照(FLAG_REF)を使わない marshal 形式。同じ内容なら常に同じバイト列になる
+MARSHAL_VERSION = 2
+# これを超えたらキャッシュを空にする(バッチ処理で1プロセスが多数のファイルを処理する場合の上限)
+MAX_ENTRIES = 65536
+
+_MISSING = object()
+
+
+class PaintCache:
+    """(種類, 値) → 変換結果 のキャッシュと、ヒット数・ミス数"""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.entries = {}
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def convert(self, kind, value, converter):
+        """value を converter で変換した結果を返す(同じ値は2回目以降キャッシュから)"""
+        try:
+            key = (kind, marshal.dumps(value, MARSHAL_VERSION))
+        except ValueError:
+            # JSON 由来でない値を含む場合はキャッシュしない
+            return converter(value)
+
+        result = self.entries.get(key, _MISSING)
+        if result is not _MISSING:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = converter(value)
+        if isinstance(result, str):
+            result = sys.intern(result)
+        if len(self.entries) >= self.max_entries:
+            self.entries.clear()
+        self.entries[key] = result
+        return result
+
+    def reset_stats(self):
+        """ヒット数・ミス数だけを0に戻す(変換結果は残す)"""
+        self.hits = 0
+        self.misses = 0
+
+    def add_stats(self, hits, misses):
+        """別プロセス(並列抽出のワーカー)のヒット数・ミス数を加算"""
+        self.hits += hits
+        self.misses += misses
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Figma Run Stats
+===============
+extract_figma.py の実行統計(--stats)
+
+記録する内容:
+1. フェーズごとの経過時間(wall)と CPU 時間(このプロセス分)
+2. ノードタイプごとの処理数と、extract_node_info(タイプ別の抽出処理)にかかった時間
+3. 書き込んだファイルのバイト数
+4. その他の集計値(キャッシュのヒット率など)
+
+--stats を指定しない場合は RunStats を作らず、走査では計測なしの関数をそのまま呼ぶ(追加コストなし)
+
+使用方法:
+    run_stats = RunStats()
+    with measure(run_stats, "load"):
+        ...
+    handler = run_stats.timed_handler(extract_node_info)
+    run_stats.write("stats.json")
+"""
+
+import contextlib
+import json
+import os
+import time
+
+
+STATS_VERSION = 1
+
+_NO_MEASURE = contextlib.nullcontext()
+
+
+def measure(run_stats, phase):
+    """フェーズの計測(run_stats が None なら何もしない)"""
+    if run_stats is None:
+        return _NO_MEASURE
+    return run_stats.phase(phase)
+
+
+class RunStats:
+    """1回の抽出の統計"""
+
+    def __init__(self):
+        self.phases = {}
+        # node_type → [処理数, 秒]
+        self.node_types = {}
+        self.bytes_written = {}
+        self.info = {}
+        self._handlers = {}
+        self._started = (time.perf_counter(), time.process_time())
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """with ブロックの経過時間・CPU時間をフェーズ name に加算"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.phases.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+            entry["wall"] += time.perf_counter() - wall
+            entry["cpu"] += time.process_time() - cpu
+
+    def timed_handler(self, handler):
+        """handler(node, ...) をノードタイプごとに計測するラッパーを返す(handler ごとに1回だけ作る)"""
+        timed = self._handlers.get(handler)
+        if timed is not None:
+            return timed
+
+        node_types = self.node_types
+        perf_counter = time.perf_counter
+
+        def timed(node, *args):
+            start = perf_counter()
+            try:
+                return handler(node, *args)
+            finally:
+                elapsed = perf_counter() - start
+                node_type = node.get("type", "")
+                entry = node_types.get(node_type)
+                if entry is None:
+                    node_types[node_type] = [1, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+
+        self._handlers[handler] = timed
+        return timed
+
+    def merge_node_types(self, node_types):
+        """別プロセス(並列抽出のワーカー)のノードタイプ別の集計を加算"""
+        for node_type, (count, seconds) in node_types.items():
+            entry = self.node_types.setdefault(node_type, [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+
+    def record_file(self, label, path):
+        """書き込んだファイルのバイト数を記録"""
+        self.bytes_written[label] = os.path.getsize(path)
+
+    def to_dict(self):
+        wall, cpu = self._started
+        return {
+            "version": STATS_VERSION,
+            **self.info,
+            "total": {"wall": time.perf_counter() - wall, "cpu": time.process_time() - cpu},
+            "phases": self.phases,
+            "node_types": {
+                node_type: {"count": count, "seconds": seconds}
+                for node_type, (count, seconds) in sorted(self.node_types.items(), key=lambda item: item[1][1], reverse=True)
+            },
+            "bytes_written": self.bytes_written,
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Figma Extracted Sidecar
+=======================
+extract_figma.py --sidecar 指定時に、抽出結果(results / all_elements / 重なり検出結果)を
+extracted.md と並べて JSON Lines 形式(extracted.jsonl)で保存・読み込みする
+
+extracted.md は人とAI向けに値を丸め・省略しているが、このファイルは抽出時の値をそのまま持つ
+(他のツール向けの出力。extract_figma_structured.py は --sidecar 指定時のみ、extracted.md と一致する
+ サイドカーを ExtractedMarkdownParser.load_sidecar で読み込む。構造化出力には extracted.md と
+ 同じ丸め・省略を適用するため、結果は extracted.md を解析した場合と同じになる。
+ 書き込みも読み込みも extracted.md より遅いため、既定では使わない)
+
+形式(1行 = 1レコード = [kind, payload] の JSON 配列):
+    ["header", {"schema": "figma-extracted", "version": 1, "source": ..., "counts": {...}}]
+    ["texts" | "frames" | "rectangles" | "vectors" | "lines" | "ellipses", {要素}]  # all_elements の順
+    ["decoratives" | "parent_gaps", {要素}]
+    ["overlaps" | "decorative_overlaps", {重なり}]
+    ["warnings", "..."]
+    ["unknown_props", {node_type: [prop, ...]}]
+    ["end", {"records": N, "markdown": extracted.md の blake2b}]
+
+    - 要素は1件ずつ書き込むため、全体を1つの文字列に組み立てない
+    - end レコードがない(途中で切れた)・バージョンが違う・extracted.md と一致しない場合は使用しない
+
+使用方法:
+    write_sidecar(sidecar_path(output_file), results, warnings, unknown_props, all_elements, overlap_results, input_file, digest)
+    data = read_sidecar(sidecar_path("extracted.md"), markdown_file="extracted.md")  # 使えなければ None
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from figma_elements import CompactElement, DecorativeElement, DynamicElement, FrameElement, TextElement
+
+
+SIDECAR_SCHEMA = "figma-extracted"
+SIDECAR_VERSION = 1
+SIDECAR_SUFFIX = ".jsonl"
+DIGEST_SIZE = 16
+
+# all_elements に含まれる要素の種類(results のキー)
+ELEMENT_KINDS = ("texts", "frames", "rectangles", "vectors", "lines", "ellipses")
+# all_elements に含まれない要素の種類
+EXTRA_KINDS = ("decoratives", "parent_gaps")
+OVERLAP_KINDS = ("overlaps", "decorative_overlaps")
+# 読み込み時に復元する要素のクラス(抽出時と同じ表現に戻す。記載のない種類は dict のまま)
+ELEMENT_CLASSES = {
+    "texts": TextElement.from_dict,
+    "frames": FrameElement.from_dict,
+    "rectangles": DynamicElement,
+    "vectors": DynamicElement,
+    "lines": DynamicElement,
+    "ellipses": DynamicElement,
+    "decoratives": DecorativeElement.from_dict,
+}
+
+
+def sidecar_path(markdown_file):
+    """extracted.md に対応するサイドカーのパス(extracted.jsonl)"""
+    return Path(markdown_file).with_suffix(SIDECAR_SUFFIX)
+
+
+def markdown_hasher():
+    """extracted.md の内容のハッシュ(サイドカーとの対応確認用)。逐次書き込みながら update する"""
+    return hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+
+def markdown_file_digest(markdown_file, chunk_size=1 << 20):
+    """extracted.md のファイルの内容のハッシュ(全体を読み込まずにチャンク単位で計算)"""
+    digest = markdown_hasher()
+    with open(markdown_file, "r", encoding="utf-8") as f:
+        for chunk in iter(lambda: f.read(chunk_size), ""):
+            digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def markdown_digest(markdown):
+    """extracted.md の内容のハッシュ(16進文字列)"""
+    if isinstance(markdown, str):
+        markdown = markdown.encode("utf-8")
+    digest = markdown_hasher()
+    digest.update(markdown)
+    return digest.hexdigest()
+
+
+# json.dumps() はオプションを指定すると呼び出しごとにエンコーダーを作るため、1つを使い回す
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _record(kind, payload):
+    if isinstance(payload, CompactElement):
+        payload = payload.to_compact_dict()
+    return _ENCODER.encode([kind, payload]) + "\n"
+
+
+def write_sidecar(path, results, warnings, unknown_props, all_elements, overlap_results, source, digest):
+    """抽出結果をレコード単位で書き込む(一時ファイル + rename)"""
+    path = Path(path)
+    kind_by_element = {id(element): kind for kind in ELEMENT_KINDS for element in results[kind]}
+    overlaps, decorative_overlaps = overlap_results
+    header = {
+        "schema": SIDECAR_SCHEMA,
+        "version": SIDECAR_VERSION,
+        "source": str(source),
+        "counts": {kind: len(results[kind]) for kind in ELEMENT_KINDS + EXTRA_KINDS},
+    }
+
+    records = 0
+    tmp_file = path.with_name(path.name + ".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(_record("header", header))
+        for element in all_elements:
+            f.write(_record(kind_by_element[id(element)], element))
+            records += 1
+        for kind in EXTRA_KINDS:
+            for element in results[kind]:
+                f.write(_record(kind, element))
+                records += 1
+        for kind, items in zip(OVERLAP_KINDS, (overlaps, decorative_overlaps)):
+            for item in items:
+                f.write(_record(kind, item))
+                records += 1
+        for warning in warnings:
+            f.write(_record("warnings", warning))
+            records += 1
+        if unknown_props:
+            f.write(_record("unknown_props", {node_type: sorted(props) for node_type, props in unknown_props.items()}))
+            records += 1
+        f.write(_record("end", {"records": records, "markdown": digest}))
+    tmp_file.replace(path)
+    return path
+
+
+def read_sidecar(path, markdown_file=None):
+    """サイドカーを読み込む(存在しない・壊れている・markdown_file と一致しない場合は None)
+
+    戻り値: {"header", "results", "all_elements", "overlaps", "decorative_overlaps", "warnings", "unknown_props"}
+    """
+    path = Path(path)
+    if not path.is_file():
+        return None
+
+    data = {
+        "header": None,
+        "results": {kind: [] for kind in ELEMENT_KINDS + EXTRA_KINDS},
+        "all_elements": [],
+        "overlaps": [],
+        "decorative_overlaps": [],
+        "warnings": [],
+        "unknown_props": {},
+    }
+    results = data["results"]
+    footer = None
+    records = 0
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                kind, payload = json.loads(line)
+                if footer is not None:
+                    raise ValueError("end レコードの後にデータがあります")
+                if kind == "header":
+                    if payload.get("schema") != SIDECAR_SCHEMA or payload.get("version") != SIDECAR_VERSION:
+                        print(f"ℹ️ 対応していないサイドカーの形式のため使用しません: {path}")
+                        return None
+                    data["header"] = payload
+                    continue
+                if data["header"] is None:
+                    raise ValueError("header レコードがありません")
+                if kind == "end":
+                    footer = payload
+                    continue
+                records += 1
+                if kind in ELEMENT_CLASSES:
+                    payload = ELEMENT_CLASSES[kind](payload)
+                if kind in ELEMENT_KINDS:
+                    results[kind].append(payload)
+                    data["all_elements"].append(payload)
+                elif kind in results:
+                    results[kind].append(payload)
+                elif kind in OVERLAP_KINDS or kind == "warnings":
+                    data[kind].append(payload)
+                elif kind == "unknown_props":
+                    data["unknown_props"] = payload
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        print(f"⚠️ サイドカーを読み込めませんでした({e}): {path}")
+        return None
+
+    if footer is None or footer.get("records") != records:
+        print(f"⚠️ サイドカーが途中で切れているため使用しません: {path}")
+        return None
+    if markdown_file is not None:
+        markdown_file = Path(markdown_file)
+        if not markdown_file.is_file() or markdown_file_digest(markdown_file) != footer.get("markdown"):
+            print(f"ℹ️ サイドカーが {markdown_file.name} と一致しないため使用しません: {path}")
+            return None
+    return data
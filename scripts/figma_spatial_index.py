@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Figma Spatial Index
+===================
+要素の矩形同士の交差ペアを列挙するための空間インデックス
+
+アルゴリズム:
+1. Y方向のスイープライン(上端の昇順に要素を追加、下端を過ぎたら除去)
+2. アクティブな要素のX区間を区間木(静的な骨格 + 動的な登録)で管理
+3. 交差ペアを O((n + k) log n) で列挙(k = 交差ペア数)。距離による打ち切りはなし
+
+使用方法:
+    pairs = find_intersecting_pairs(boxes)  # boxes は上端の昇順
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+
+
+class _IntervalNode:
+    """区間木のノード(center を含む区間を左端順・右端順の2つのリストで保持)"""
+
+    __slots__ = ("center", "left", "right", "by_left", "by_right")
+
+    def __init__(self, center):
+        self.center = center
+        self.left = None
+        self.right = None
+        self.by_left = []
+        self.by_right = []
+
+
+class IntervalTree:
+    """座標が事前にわかっている区間の挿入・削除・検索を行う区間木"""
+
+    def __init__(self, coordinates):
+        self.root = self._build(sorted(set(coordinates)))
+        # 左端でソートした登録済み区間(区間内に左端を持つものの範囲検索用)
+        self.lefts = []
+
+    def _build(self, coords):
+        """中央値を center とする平衡な骨格を構築"""
+        if not coords:
+            return None
+        root = None
+        # 再帰を避けて (座標範囲, 親, 左右) を積む
+        stack = [(0, len(coords), None, None)]
+        while stack:
+            start, end, parent, side = stack.pop()
+            if start >= end:
+                continue
+            mid = (start + end) // 2
+            node = _IntervalNode(coords[mid])
+            if parent is None:
+                root = node
+            elif side == "left":
+                parent.left = node
+            else:
+                parent.right = node
+            stack.append((start, mid, node, "left"))
+            stack.append((mid + 1, end, node, "right"))
+        return root
+
+    def _find_node(self, left, right):
+        """区間を保持すべきノード(区間が center を含む最上位ノード)"""
+        node = self.root
+        while node is not None:
+            if right < node.center:
+                node = node.left
+            elif left > node.center:
+                node = node.right
+            else:
+                return node
+        raise ValueError(f"Interval ({left}, {right}) is outside of the tree coordinates")
+
+    def insert(self, left, right, key):
+        """区間を登録"""
+        node = self._find_node(left, right)
+        insort(node.by_left, (left, key))
+        insort(node.by_right, (right, key))
+        insort(self.lefts, (left, key))
+
+    def remove(self, left, right, key):
+        """区間を削除"""
+        node = self._find_node(left, right)
+        del node.by_left[bisect_left(node.by_left, (left, key))]
+        del node.by_right[bisect_left(node.by_right, (right, key))]
+        del self.lefts[bisect_left(self.lefts, (left, key))]
+
+    def overlapping(self, query_left, query_right):
+        """開区間として重なる登録済み区間のキーを返す(left < query_right かつ right > query_left)"""
+        found = []
+
+        # 1. query_left を内部に含む区間(left <= query_left < right)
+        node = self.root
+        while node is not None:
+            if query_left < node.center:
+                # center を含む区間は right >= center > query_left
+                for left, key in node.by_left:
+                    if left > query_left:
+                        break
+                    found.append(key)
+                node = node.left
+            else:
+                # center を含む区間は left <= center <= query_left
+                by_right = node.by_right
+                for i in range(len(by_right) - 1, -1, -1):
+                    right, key = by_right[i]
+                    if right <= query_left:
+                        break
+                    found.append(key)
+                if query_left == node.center:
+                    break
+                node = node.right
+
+        # 2. 左端が (query_left, query_right) にある区間
+        lefts = self.lefts
+        start = bisect_right(lefts, (query_left, float("inf")))
+        for i in range(start, len(lefts)):
+            left, key = lefts[i]
+            if left >= query_right:
+                break
+            found.append(key)
+
+        return found
+
+
+def find_intersecting_pairs(boxes):
+    """交差する矩形のペア (i, j) を i < j の順で列挙
+
+    Args:
+        boxes: (left, top, right, bottom) のリスト。top の昇順に並んでいること
+
+    Returns:
+        bottom_i > top_j かつ X方向に開区間として重なる (i, j) のリスト (i < j, 辞書順)
+    """
+    # 区間木には左右を正規化した区間を登録(幅が負の異常データ対策)
+    spans = [(min(left, right), max(left, right)) for left, top, right, bottom in boxes]
+    tree = IntervalTree([x for span in spans for x in span])
+
+    pairs = []
+    active = []  # (bottom, index) のヒープ
+    for j, (left, top, right, bottom) in enumerate(boxes):
+        # 下端が現在の上端以下の要素はもう交差しない
+        while active and active[0][0] <= top:
+            _, i = heapq.heappop(active)
+            tree.remove(spans[i][0], spans[i][1], i)
+
+        for i in tree.overlapping(spans[j][0], spans[j][1]):
+            # 幅0の区間の境界一致などを元の判定式で再確認
+            if boxes[i][2] > left and boxes[i][0] < right:
+                pairs.append((i, j))
+
+        tree.insert(spans[j][0], spans[j][1], j)
+        heapq.heappush(active, (bottom, j))
+
+    pairs.sort()
+    return pairs
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Figma Subtree Cache
+===================
+サブツリー単位の抽出結果をディスクにキャッシュし、変更のない部分を再抽出せずに再利用する
+
+機能:
+1. Merkle 形式のサブツリーハッシュを、キャッシュの単位(表示ノード数が一定以上のサブツリー)にだけ計算
+   (単位に含まれる小さいサブツリーはノードごとに処理せず、marshal で一度にシリアライズする)
+2. キャッシュキー = サブツリーハッシュ + 親から受け取る文脈(ノードの ID(id がなければ位置から決めた ID)・
+   パス・深さ・親ID/名前・親の layoutMode・parent_info)+ 環境(ホワイトリスト・抽出コード)の指紋
+3. キャッシュの各エントリは「セグメント」と「子サブツリーのキー」の列なので、
+   変更があったサブツリーも、その中の変更のない子サブツリーは再利用できる
+4. エントリは SQLite に単位ごとに保存し、使うものだけを読み込む。
+   保存時は新しいエントリの追加と、今回使わなかったエントリの削除だけを行う(ファイル全体を書き直さない)
+
+注意: エントリは pickle 形式のため、自分で作成したファイルだけを指定すること
+
+使用方法:
+    hashes, sizes = subtree_hashes(root, min_subtree=64)
+    cache = SubtreeCache("extract_cache.sqlite", environment_fingerprint(whitelist, [__file__]))
+    key = cache.key(hashes[id(node)], context)
+"""
+
+import contextlib
+import gc
+import hashlib
+import json
+import marshal
+import pickle
+import sqlite3
+from pathlib import Path
+
+
+CACHE_VERSION = 2
+KEY_SIZE = 16
+# 参照(FLAG_REF)を使わない marshal 形式。同じ内容なら常に同じバイト列になる
+MARSHAL_VERSION = 2
+
+
+def serialize_properties(own):
+    """ノード自身のプロパティをバイト列に変換(キー順を保つ。json.dumps より数倍速い)"""
+    try:
+        return marshal.dumps(own, MARSHAL_VERSION)
+    except ValueError:
+        # JSON 由来でない値を含む場合
+        return pickle.dumps(own, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def subtree_hashes(root, min_subtree=1):
+    """サブツリーハッシュと、表示されるノード数を返す(どちらも id(node) がキー)
+
+    ハッシュを計算するのはルートと、表示ノード数が min_subtree 以上のノード(キャッシュの単位)だけ。
+    単位のハッシュ = ノード自身のプロパティ + 子ごとに「単位なら子のハッシュ、それ以外は子のサブツリー全体」
+    プロパティのキー順も抽出結果(キー構成)に影響するため、キー順を保ったままシリアライズする
+    """
+    sizes = {}
+    units = []
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        children = node.get("children") or ()
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children)
+            continue
+
+        size = 0
+        if node.get("visible", True):
+            size = 1
+            for child in children:
+                size += sizes[id(child)]
+        sizes[id(node)] = size
+        if size >= min_subtree or node is root:
+            units.append(node)
+
+    # 後順なので、子の単位のハッシュは親より先に計算される
+    hashes = {}
+    for node in units:
+        digest = hashlib.blake2b(digest_size=KEY_SIZE)
+        digest.update(serialize_properties({key: value for key, value in node.items() if key != "children"}))
+        for child in node.get("children") or ():
+            child_hash = hashes.get(id(child))
+            if child_hash is None:
+                digest.update(b"N")
+                digest.update(serialize_properties(child))
+            else:
+                digest.update(b"U")
+                digest.update(child_hash)
+        hashes[id(node)] = digest.digest()
+    return hashes, sizes
+
+
+@contextlib.contextmanager
+def gc_paused():
+    """大量のオブジェクトを作る間、循環参照の GC を止める(大きいドキュメントでは GC が pickle.loads より時間がかかる)"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def environment_fingerprint(whitelist, source_files):
+    """抽出結果に影響する環境(ホワイトリストの内容・抽出コード)の指紋"""
+    digest = hashlib.blake2b(digest_size=KEY_SIZE)
+    digest.update(json.dumps(whitelist or {}, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    for source_file in source_files:
+        digest.update(Path(source_file).read_bytes())
+    return digest.hexdigest()
+
+
+class SubtreeCache:
+    """サブツリーのキャッシュキー → パーツ列 [("seg", segment) | ("ref", 子のキー)]
+
+    エントリは SQLite の units テーブルに1行ずつ保存し、get / expand で必要になったときに読み込む
+    """
+
+    def __init__(self, cache_file, fingerprint):
+        self.cache_file = Path(cache_file)
+        self.fingerprint = fingerprint
+        # 今回読み込んだ・作成したエントリ
+        self.entries = {}
+        self._new = {}
+        # ファイルに保存されているエントリのキー
+        self._stored = set()
+        self._db = None
+        self._reset = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """キャッシュファイルを開く(バージョン・指紋が違う、または壊れていれば空から始める)"""
+        try:
+            self._db = sqlite3.connect(self.cache_file)
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS units (key TEXT PRIMARY KEY, parts BLOB)")
+            meta = dict(self._db.execute("SELECT name, value FROM meta"))
+            stored = {key for key, in self._db.execute("SELECT key FROM units")}
+        except sqlite3.DatabaseError:
+            print(f"⚠️ 差分抽出キャッシュを読み込めませんでした: {self.cache_file}")
+            self.close()
+            self._reset = True
+            return
+        if meta.get("version") != str(CACHE_VERSION) or meta.get("fingerprint") != self.fingerprint:
+            if meta.get("version") == str(CACHE_VERSION):
+                print("ℹ️ ホワイトリストまたは抽出コードが変わったため、差分抽出キャッシュを使用しません")
+            self._reset = True
+            return
+        self._stored = stored
+
+    def key(self, subtree_hash, context):
+        """サブツリーハッシュと親から受け取る文脈からキャッシュキーを作成"""
+        digest = hashlib.blake2b(subtree_hash, digest_size=KEY_SIZE)
+        digest.update(json.dumps(context, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _read(self, key):
+        """エントリを返す(未読み込みならファイルから読み込む。なければ None)"""
+        parts = self.entries.get(key)
+        if parts is None and key in self._stored:
+            row = self._db.execute("SELECT parts FROM units WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                parts = self.entries[key] = pickle.loads(row[0])
+        return parts
+
+    def get(self, key):
+        """キャッシュ済みのパーツ列(なければ None)"""
+        parts = self._read(key)
+        if parts is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return parts
+
+    def put(self, key, parts):
+        self.entries[key] = parts
+        self._new[key] = parts
+
+    def expand(self, root_key):
+        """ルートのキーからセグメントを前順に展開し、使ったキーを返す"""
+        segments = []
+        used = set()
+        stack = [("ref", root_key)]
+        while stack:
+            kind, value = stack.pop()
+            if kind == "seg":
+                segments.append(value)
+            else:
+                used.add(value)
+                stack.extend(reversed(self._read(value)))
+        return segments, used
+
+    def save(self, used):
+        """新しいエントリを追加し、今回使わなかったエントリを削除する(変更がなければ何もしない)"""
+        stale = self._stored - used
+        if not self._new and not stale and not self._reset:
+            self.close()
+            return
+        if self._db is None:
+            # SQLite として開けないファイルは作り直す
+            self.cache_file.unlink(missing_ok=True)
+            self._db = sqlite3.connect(self.cache_file)
+            self._db.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)")
+            self._db.execute("CREATE TABLE units (key TEXT PRIMARY KEY, parts BLOB)")
+        with self._db:
+            if self._reset:
+                self._db.execute("DELETE FROM units")
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                    [("version", str(CACHE_VERSION)), ("fingerprint", self.fingerprint)],
+                )
+            self._db.executemany("DELETE FROM units WHERE key = ?", ((key,) for key in stale))
+            self._db.executemany(
+                "INSERT OR REPLACE INTO units (key, parts) VALUES (?, ?)",
+                ((key, pickle.dumps(parts, protocol=pickle.HIGHEST_PROTOCOL)) for key, parts in self._new.items() if key in used),
+            )
+        self._stored = (self._stored - stale) | (self._new.keys() & used)
+        self._new = {}
+        self._reset = False
+        self.close()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
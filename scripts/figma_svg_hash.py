@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Figma SVG Hash
+==============
+ベクターノードのジオメトリ(fillGeometry / vectorNetwork)からアイコン識別用のハッシュ値を生成
+
+機能:
+1. 正規化文字列の生成(fillGeometry は json.dumps を使わない高速パス)
+2. BLAKE2b による 64bit(16桁)のハッシュ値
+3. 短いハッシュ値が一致した場合はジオメトリ全体を比較し、衝突時は 128bit(32桁)に拡張
+4. ジオメトリのダイジェスト → ハッシュ値の割り当てをディスクに保存(実行・ファイルをまたいで同じ値を維持)
+   - 衝突で拡張・連番にした値を次の実行でも同じにするためのもので、高速化にはならない
+     (ダイジェストの計算に正規化文字列が必要なため、キャッシュにあっても正規化は毎回行う)
+
+使用方法:
+    registry = SvgHashRegistry(cache_file="svg_hash_cache.json")
+    svg_hash = registry.hash_node(node)
+    registry.save()
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from figma_whitelist_store import write_json_atomic
+
+
+SVG_HASH_LENGTH = 16
+FULL_HASH_LENGTH = 32
+CACHE_VERSION = 1
+
+# 高速パスで扱う fillGeometry の要素キー
+_FILL_GEOMETRY_KEYS = {"path", "windingRule", "overrideID"}
+
+
+def _canonical_fill_geometry(fill_geometry):
+    """fillGeometry を正規化文字列に変換(想定外の形なら None)"""
+    parts = ["F"]
+    for entry in fill_geometry:
+        if not isinstance(entry, dict) or not entry.keys() <= _FILL_GEOMETRY_KEYS:
+            return None
+        path = entry.get("path", "")
+        winding_rule = entry.get("windingRule", "")
+        override_id = entry.get("overrideID")
+        if not isinstance(path, str) or not isinstance(winding_rule, str):
+            return None
+        if override_id is not None and (isinstance(override_id, bool) or not isinstance(override_id, int)):
+            return None
+        # 区切り文字を含む値は曖昧になるため汎用パスに回す
+        if "\t" in path or "\n" in path or "\t" in winding_rule or "\n" in winding_rule:
+            return None
+        parts.append(f"{winding_rule}\t{'' if override_id is None else override_id}\t{path}")
+    return "\n".join(parts)
+
+
+def canonical_geometry(node):
+    """ノードのジオメトリを正規化文字列に変換(ジオメトリがなければ None)"""
+    fill_geometry = node.get("fillGeometry")
+    if fill_geometry:
+        if isinstance(fill_geometry, list):
+            canonical = _canonical_fill_geometry(fill_geometry)
+            if canonical is not None:
+                return canonical
+        try:
+            return "J" + json.dumps(fill_geometry, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None
+
+    vector_network = node.get("vectorNetwork")
+    if vector_network:
+        try:
+            return "V" + json.dumps(vector_network, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None
+
+    return None
+
+
+def geometry_digest(canonical):
+    """正規化文字列の 128bit ダイジェスト(16進32桁)"""
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=FULL_HASH_LENGTH // 2).hexdigest()
+
+
+class SvgHashRegistry:
+    """ジオメトリ → svgHash の割り当てを管理(衝突チェック・ディスクキャッシュ)"""
+
+    def __init__(self, cache_file=None):
+        self.cache_file = Path(cache_file) if cache_file else None
+        # 正規化文字列 → svgHash(この実行中に見たジオメトリ)
+        self.by_geometry = {}
+        # svgHash → 正規化文字列(この実行)または ダイジェスト(キャッシュ由来)
+        self.by_hash = {}
+        # ダイジェスト → svgHash(ディスクに保存する割り当て。キーの計算には正規化文字列全体が必要)
+        self.fingerprints = {}
+        self.collisions = 0
+        self.cache_hits = 0
+        self._dirty = False
+        if self.cache_file:
+            self.load()
+
+    def load(self):
+        """キャッシュファイルから割り当てを読み込む(壊れていれば無視)"""
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️ SVGハッシュキャッシュを読み込めませんでした: {self.cache_file}")
+            return
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return
+        for digest, svg_hash in data.get("hashes", {}).items():
+            self.fingerprints[digest] = svg_hash
+            self.by_hash.setdefault(svg_hash, ("digest", digest))
+
+    def save(self):
+        """割り当てをキャッシュファイルに保存(変更がなければ何もしない)"""
+        if not self.cache_file or not self._dirty:
+            return
+        data = {"version": CACHE_VERSION, "hashes": dict(sorted(self.fingerprints.items()))}
+        # 同時に実行しても一時ファイルが衝突しないよう mkstemp + os.replace で書き込む
+        write_json_atomic(self.cache_file, data)
+        self._dirty = False
+
+    def hash_node(self, node):
+        """ベクターノードの svgHash を返す(ジオメトリがなければ None)"""
+        canonical = canonical_geometry(node)
+        if canonical is None:
+            return None
+        return self.hash_canonical(canonical)
+
+    def hash_canonical(self, canonical):
+        """正規化文字列の svgHash を返す(別プロセスで集めたジオメトリの統合にも使う)"""
+        svg_hash = self.by_geometry.get(canonical)
+        if svg_hash is None:
+            svg_hash = self._assign(canonical)
+            self.by_geometry[canonical] = svg_hash
+        return svg_hash
+
+    def _assign(self, canonical):
+        """新しいジオメトリにハッシュ値を割り当てる(保存済みの割り当てがあればそれを使う)"""
+        digest = geometry_digest(canonical)
+
+        cached = self.fingerprints.get(digest)
+        if cached is not None:
+            self.cache_hits += 1
+            self.by_hash[cached] = canonical
+            return cached
+
+        # 短いハッシュ → 全桁 → 連番 の順に、別ジオメトリと衝突しない値を選ぶ
+        candidates = [digest[:SVG_HASH_LENGTH], digest]
+        suffix = 2
+        while True:
+            for svg_hash in candidates:
+                owner = self.by_hash.get(svg_hash)
+                if owner is None:
+                    self.by_hash[svg_hash] = canonical
+                    self.fingerprints[digest] = svg_hash
+                    self._dirty = True
+                    return svg_hash
+                if owner == canonical or owner == ("digest", digest):
+                    return svg_hash
+                self.collisions += 1
+            candidates = [f"{digest}-{suffix}"]
+            suffix += 1
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Figma Whitelist Store
+=====================
+figma_properties.json(プロパティのホワイトリスト)を複数プロセスから安全に更新する
+
+機能:
+1. ファイルロック(<whitelist>.lock)で同時更新を直列化
+2. 保存時はディスク上の最新の内容を読み直し、追加されたプロパティだけをマージ
+   (他のプロセスが追加したプロパティを上書きで失わない)
+3. 一時ファイルへの書き込み + rename によるアトミックな置き換え(途中で切れたファイルを残さない)
+4. deferred モード: 追加分をメモリに溜めて、バッチの最後に1回だけ書き込む
+
+使用方法:
+    store = WhitelistStore(WHITELIST_FILE)
+    added = store.add(unknown_props)          # すぐにマージして保存
+
+    store = WhitelistStore(WHITELIST_FILE, deferred=True)
+    store.add(unknown_props)                  # メモリに記録のみ
+    added = store.flush()                     # まとめて1回だけ保存
+"""
+
+import contextlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+def merge_properties(whitelist, additions):
+    """追加プロパティ {node_type: props} を whitelist にマージし、追加された "type.prop" のリストを返す"""
+    added = []
+
+    for node_type, props in additions.items():
+        if node_type not in whitelist:
+            whitelist[node_type] = {
+                "description": f"自動追加: {node_type}",
+                "properties": []
+            }
+
+        existing = set(whitelist[node_type].get("properties", []))
+        new_props = set(props) - existing
+
+        if new_props:
+            whitelist[node_type]["properties"] = list(existing | new_props)
+            for prop in new_props:
+                added.append(f"{node_type}.{prop}")
+
+    return added
+
+
+@contextlib.contextmanager
+def file_lock(lock_file):
+    """ロックファイルによる排他ロック(POSIX: fcntl.flock / Windows: msvcrt.locking)"""
+    with open(lock_file, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_json_atomic(path, data):
+    """同じディレクトリの一時ファイルに書き込んでから rename で置き換える"""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
+
+
+class WhitelistStore:
+    """ホワイトリストファイルへの追加を管理(ロック・マージ・アトミック書き込み)"""
+
+    def __init__(self, path, deferred=False):
+        self.path = Path(path)
+        self.lock_file = self.path.with_name(self.path.name + ".lock")
+        self.deferred = deferred
+        # deferred モードで溜めている追加分(node_type → props、最初に現れた順)
+        self.pending = {}
+
+    def load(self):
+        """ホワイトリストを読み込む(置き換えはアトミックなのでロック不要)"""
+        if not self.path.exists():
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def add(self, additions):
+        """追加プロパティを記録(deferred でなければすぐに保存し、追加された "type.prop" を返す)"""
+        for node_type, props in additions.items():
+            self.pending.setdefault(node_type, set()).update(props)
+        if self.deferred:
+            return []
+        return self.flush()
+
+    def take_pending(self):
+        """溜めている追加分を取り出して空にする(ワーカーから親プロセスへ渡す場合)"""
+        pending = self.pending
+        self.pending = {}
+        return pending
+
+    def flush(self):
+        """溜めている追加分をロックしてディスク上の最新の内容にマージし、保存する"""
+        if not self.pending:
+            return []
+        with file_lock(self.lock_file):
+            whitelist = self.load()
+            added = merge_properties(whitelist, self.pending)
+            if added:
+                whitelist.setdefault("_meta", {})["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
+                write_json_atomic(self.path, whitelist)
+        self.pending = {}
+        return added